@@ -0,0 +1,224 @@
+"""
+Pre-upload optimization of the static assets in public/
+
+Each asset is replaced by a metadata-stripped copy when that is smaller:
+  - PNG/JPEG re-encoded without EXIF/ICC data. The EXIF orientation is
+    applied to the pixels and colors are converted to sRGB first, so the
+    image looks the same without the metadata; alpha is kept.
+  - SVG without comments/<metadata>/XML declaration
+
+No .br/.gz/WebP/AVIF variants are produced: Vercel compresses responses
+itself and nothing in the site references alternative image files, so they
+would only be uploaded and never served.
+
+Outputs are cached in .vercel/asset-cache/<source sha>-<settings>/, so an
+asset whose content hasn't changed is never processed again. Pillow is
+optional: without it images are deployed as they are.
+
+Usage:
+    python asset_optimizer.py       # optimize and print the size report
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+import deploy_vercel
+
+OPTIMIZER_VERSION = 2
+CACHE_DIR = os.path.join(".vercel", "asset-cache")
+ASSET_ROOT = "public/"
+RASTER = {'.png', '.jpg', '.jpeg'}
+OPTIMIZABLE = RASTER | {'.svg'}
+MIN_SAVING = 0.05       # keep a stripped copy only if it is at least 5% smaller
+
+_SVG_JUNK = re.compile(rb'<!--.*?-->|<metadata\b.*?</metadata>|<\?xml[^>]*\?>\s*', re.S)
+
+def settings_key():
+    """Short hash of everything that changes the outputs for the same input"""
+    settings = [OPTIMIZER_VERSION, Image is not None]
+    return hashlib.sha1(json.dumps(settings).encode()).hexdigest()[:8]
+
+def _smaller(data, original_size):
+    return len(data) <= original_size * (1 - MIN_SAVING)
+
+def strip_svg(data):
+    return _SVG_JUNK.sub(b'', data).strip()
+
+def _save(image, fmt, **params):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+def _to_srgb(image):
+    """
+    (image, icc_profile): the image converted to sRGB with no profile left
+    to embed, or unchanged with its profile when it can't be converted
+    (no littlecms, or a mode it can't handle) - the profile is then kept.
+    """
+    icc = image.info.get('icc_profile')
+    if not icc:
+        return image, None
+    try:
+        from PIL import ImageCms
+    except ImportError:
+        return image, icc
+    try:
+        converted = ImageCms.profileToProfile(
+            image, ImageCms.ImageCmsProfile(io.BytesIO(icc)), ImageCms.createProfile('sRGB'),
+            outputMode='RGB' if image.mode == 'CMYK' else image.mode)
+    except (OSError, ValueError, ImageCms.PyCMSError):
+        return image, icc
+    return converted, None
+
+def strip_image(data):
+    """A PNG/JPEG re-encoded without metadata, or None if that isn't smaller"""
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        fmt = source.format
+        # Bake the orientation into the pixels before the EXIF tag is dropped
+        image = ImageOps.exif_transpose(source) or source
+        image, icc = _to_srgb(image)
+        params = {"icc_profile": icc} if icc else {}
+        # Re-encoding without exif/info drops the metadata. Same mode, so
+        # LA/RGBA/P keep their alpha (P's transparency comes along in info)
+        if fmt == 'JPEG':
+            from PIL import JpegImagePlugin
+            # The source quantization, i.e. quality='keep' (which only
+            # accepts an untouched JPEG, not a transposed/converted copy)
+            stripped = _save(image, 'JPEG', qtables=source.quantization,
+                             subsampling=JpegImagePlugin.get_sampling(source),
+                             optimize=True, **params)
+        else:
+            if 'transparency' in image.info:
+                params["transparency"] = image.info['transparency']
+            stripped = _save(image, 'PNG', optimize=True, **params)
+    return stripped if _smaller(stripped, len(data)) else None
+
+class AssetResult:
+    """What the optimizer did with one source asset"""
+
+    def __init__(self, relative_path, size, cached=False):
+        self.relative_path = relative_path
+        self.size = size
+        self.cached = cached
+        self.replacement = None         # (cache file, size) of the stripped original
+
+    @property
+    def saved(self):
+        return self.size - self.replacement[1] if self.replacement else 0
+
+class AssetOptimizer:
+    """Optimizes public/ assets into a content-addressed cache"""
+
+    def __init__(self, project_dir, cache_dir=None):
+        self.project_dir = Path(project_dir)
+        self.cache_root = Path(cache_dir) if cache_dir else self.project_dir / CACHE_DIR
+        self.settings = settings_key()
+
+    def _process(self, file_info, out_dir):
+        """Write the optimized asset into out_dir; returns the output index"""
+        suffix = Path(file_info['relative_path']).suffix.lower()
+        data = Path(file_info['file_path']).read_bytes()
+        original = None
+        if suffix == '.svg':
+            stripped = strip_svg(data)
+            original = stripped if _smaller(stripped, len(data)) else None
+        elif suffix in RASTER and Image is not None:
+            original = strip_image(data)
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        index = {"original": None}
+        if original is not None:
+            (out_dir / "original").write_bytes(original)
+            index["original"] = {"size": len(original),
+                                 "sha": deploy_vercel.get_file_sha1(out_dir / "original")}
+        (out_dir / "index.json").write_text(json.dumps(index, indent=1), encoding='utf-8')
+        return index
+
+    def optimize(self, files_data):
+        """
+        Returns (files to deploy, [AssetResult]). The deploy list is files_data
+        with optimized originals swapped in, in the deploy_vercel file format.
+        """
+        deploy_files = []
+        results = []
+        for file_info in files_data:
+            relative_path = file_info['relative_path']
+            suffix = Path(relative_path).suffix.lower()
+            if not relative_path.startswith(ASSET_ROOT) or suffix not in OPTIMIZABLE:
+                deploy_files.append(file_info)
+                continue
+
+            out_dir = self.cache_root / f"{file_info['sha']}-{self.settings}"
+            index_path = out_dir / "index.json"
+            cached = index_path.exists()
+            if cached:
+                index = json.loads(index_path.read_text(encoding='utf-8'))
+            else:
+                tmp_dir = out_dir.with_suffix(".tmp")
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                index = self._process(file_info, tmp_dir)
+                shutil.rmtree(out_dir, ignore_errors=True)
+                os.replace(tmp_dir, out_dir)
+
+            result = AssetResult(relative_path, file_info['size'], cached=cached)
+            if index["original"]:
+                replacement = out_dir / "original"
+                result.replacement = (replacement, index["original"]["size"])
+                deploy_files.append({**file_info, "file_path": str(replacement),
+                                     "sha": index["original"]["sha"],
+                                     "size": index["original"]["size"], "uploaded": False})
+            else:
+                deploy_files.append(file_info)
+            results.append(result)
+        return deploy_files, results
+
+    def prune(self, files_data):
+        """Remove cache entries for assets that no longer exist in this form"""
+        keep = {f"{f['sha']}-{self.settings}" for f in files_data}
+        if self.cache_root.exists():
+            for entry in self.cache_root.iterdir():
+                if entry.name not in keep:
+                    shutil.rmtree(entry, ignore_errors=True)
+
+def print_report(results):
+    print("\n" + "=" * 70)
+    print("ASSET OPTIMIZATION")
+    print("=" * 70)
+    total_before = total_after = 0
+    for r in results:
+        after = r.size - r.saved
+        total_before += r.size
+        total_after += after
+        note = " (cached)" if r.cached else ""
+        print(f"  {r.relative_path:<40} {r.size:>9,} B -> {after:>9,} B{note}")
+    processed = sum(1 for r in results if not r.cached)
+    print(f"\n  assets: {len(results)} ({processed} processed, {len(results) - processed} cached)")
+    print(f"  originals: {total_before:,} B -> {total_after:,} B "
+          f"(saved {total_before - total_after:,} B)")
+    if Image is None:
+        print("  not installed: Pillow (images deployed unchanged)")
+
+def main():
+    project_dir = Path(__file__).parent
+    all_files = deploy_vercel.get_all_files(project_dir)
+    manifest = deploy_vercel.DeployManifest(project_dir / deploy_vercel.MANIFEST_PATH)
+    files_data, _ = deploy_vercel.hash_files(all_files, manifest)
+    manifest.save()
+
+    optimizer = AssetOptimizer(project_dir)
+    _, results = optimizer.optimize(files_data)
+    optimizer.prune(files_data)
+    print_report(results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+One-command deploy pipeline: commit -> GitHub -> build/optimize -> Vercel
+-> live URL -> performance budget
+
+Stages declare their dependencies and run as soon as those finish, so
+independent work overlaps (the GitHub repo check runs alongside the local
+Next.js build; the build waits for the commit, so its output can never be
+staged). A stage with an input hash is skipped when the hash matches
+its last successful run, recorded in .vercel/pipeline-state.json. Every
+stage is timed and a report is printed at the end.
+
+The site is deployed one way per run, so two deployments never race:
+    --via git    push to GitHub; Vercel's Git integration deploys the commit
+    --via rest   upload via the REST API (needs VERCEL_TOKEN; no push)
+The default is rest when VERCEL_TOKEN is set, git otherwise.
+
+Usage:
+    python deploy_pipeline.py [--via git|rest] [--no-build] [--no-watch] [--no-budget]
+                              [--save-baseline] [--force]
+
+Environment:
+    GITHUB_TOKEN   --via git: create the repo if missing and authenticate the
+                   HTTPS push (optional when git already has credentials)
+    VERCEL_TOKEN   REST deploys; also lets the watcher use the Vercel API
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import requests
+
+import deploy_vercel
+from asset_optimizer import AssetOptimizer, print_report, settings_key
+from deployment_watcher import DeploymentWatcher
+from github_client import GitHubClient, GitHubError
+from perf_budget import run_audit
+from url_probe import BRANCH
+
+REPO_NAME = "ai-video-website"
+GITHUB_OWNER = "algotcha-project"
+STATE_PATH = os.path.join(".vercel", "pipeline-state.json")
+# Files that affect `next build`
+BUILD_INPUTS = ('app/', 'public/', 'package.json', 'package-lock.json',
+                'next.config.js', 'tsconfig.json')
+
+OK = "ok"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+class StageError(Exception):
+    """Raised by a stage to fail the pipeline with a readable message"""
+
+def run(args, cwd, check=True, env=None):
+    """Run a command (argument list, no shell) and return stripped stdout"""
+    if env:
+        env = {**os.environ, **env}
+    result = subprocess.run(args, cwd=cwd, capture_output=True, text=True, env=env)
+    if check and result.returncode != 0:
+        raise StageError(f"{' '.join(args)}: {(result.stderr or result.stdout).strip()[:500]}")
+    return result.stdout.strip()
+
+def digest(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+class Stage:
+    """
+    A named step. ``func(ctx)`` does the work and returns a short detail
+    string; ``inputs(ctx)`` (optional) returns a content hash, and the stage
+    is skipped when it equals the hash of the last successful run.
+    """
+
+    def __init__(self, name, func, deps=(), inputs=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.inputs = inputs
+        self.status = None
+        self.detail = ""
+        self.seconds = 0.0
+
+class Pipeline:
+    """Runs stages concurrently in dependency order with hash-based skipping"""
+
+    def __init__(self, project_dir, stages, force=False, workers=4):
+        self.project_dir = Path(project_dir)
+        self.stages = {s.name: s for s in stages}
+        self.force = force
+        self.workers = workers
+        self.state_path = self.project_dir / STATE_PATH
+        self.state = {}
+        if self.state_path.exists():
+            try:
+                self.state = json.loads(self.state_path.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                self.state = {}
+        self.ctx = {"project_dir": self.project_dir, "sources_lock": threading.Lock()}
+        self._lock = threading.Lock()
+
+    def _run_stage(self, stage):
+        started = time.perf_counter()
+        try:
+            input_hash = stage.inputs(self.ctx) if stage.inputs else None
+            if input_hash and not self.force and self.state.get(stage.name) == input_hash:
+                stage.status, stage.detail = SKIPPED, "inputs unchanged"
+            else:
+                stage.detail = stage.func(self.ctx) or ""
+                stage.status = SKIPPED if stage.detail.startswith("skipped") else OK
+                if input_hash and stage.status == OK:
+                    with self._lock:
+                        self.state[stage.name] = input_hash
+        except StageError as e:
+            stage.status, stage.detail = FAILED, str(e)
+        except Exception as e:
+            stage.status, stage.detail = FAILED, f"{type(e).__name__}: {e}"
+        stage.seconds = time.perf_counter() - started
+        icon = {OK: "✓", SKIPPED: "↷", FAILED: "✗"}[stage.status]
+        print(f"{icon} {stage.name:<12} {stage.seconds:6.1f}s  {stage.detail}")
+        return stage
+
+    def run(self):
+        started = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    deps = [self.stages[d] for d in stage.deps]
+                    if any(d.status == FAILED for d in deps):
+                        stage.status, stage.detail = FAILED, "dependency failed"
+                        print(f"✗ {stage.name:<12} {'':>7}  {stage.detail}")
+                        del pending[name]
+                    elif all(d.status in (OK, SKIPPED) for d in deps):
+                        running[pool.submit(self._run_stage, stage)] = stage
+                        del pending[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+        self.total = time.perf_counter() - started
+        self._save_state()
+        return all(s.status in (OK, SKIPPED) for s in self.stages.values())
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(self.state, indent=1, sort_keys=True),
+                                   encoding='utf-8')
+
+    def report(self):
+        print("\n" + "=" * 60)
+        print("STAGE TIMINGS")
+        print("=" * 60)
+        for stage in self.stages.values():
+            print(f"  {stage.name:<12} {stage.status or '-':<8} {stage.seconds:6.1f}s")
+        busy = sum(s.seconds for s in self.stages.values())
+        print(f"  {'total':<12} {'':<8} {self.total:6.1f}s wall ({busy:.1f}s of stage time)")
+
+# --- Stages ---
+
+def source_files(ctx):
+    """Hashed project files (shared by the build and deploy stages, computed once)"""
+    with ctx["sources_lock"]:
+        if "files_data" not in ctx:
+            project_dir = ctx["project_dir"]
+            all_files = deploy_vercel.get_all_files(project_dir)
+            manifest = deploy_vercel.DeployManifest(project_dir / deploy_vercel.MANIFEST_PATH)
+            manifest.prune(rel for _, rel in all_files)
+            ctx["files_data"], _ = deploy_vercel.hash_files(all_files, manifest)
+            ctx["manifest"] = manifest
+            manifest.save()
+        return ctx["files_data"]
+
+def build_inputs(ctx):
+    files = [f for f in source_files(ctx) if f['relative_path'].startswith(BUILD_INPUTS)]
+    return digest(*sorted(f"{f['relative_path']}:{f['sha']}" for f in files))
+
+def deploy_inputs(ctx):
+    return digest(settings_key(),
+                  *sorted(f"{f['relative_path']}:{f['sha']}" for f in source_files(ctx)))
+
+def stage_commit(ctx):
+    cwd = ctx["project_dir"]
+    if not (cwd / ".git").exists():
+        run(["git", "init"], cwd)
+    run(["git", "add", "-A"], cwd)
+    if not run(["git", "status", "--porcelain"], cwd):
+        ctx["head"] = run(["git", "rev-parse", "HEAD"], cwd)
+        return "skipped: nothing to commit"
+    run(["git", "commit", "-m", "Update AI Video website"], cwd)
+    ctx["head"] = run(["git", "rev-parse", "HEAD"], cwd)
+    return f"committed {ctx['head'][:8]}"
+
+def git_auth_env():
+    """
+    Git config (via environment, so the token stays out of argv and error
+    messages) sending GITHUB_TOKEN as basic auth on HTTPS requests
+    """
+    token = os.environ.get('GITHUB_TOKEN')
+    if not token:
+        return None
+    credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.https://github.com/.extraheader",
+        "GIT_CONFIG_VALUE_0": f"AUTHORIZATION: basic {credentials}",
+    }
+
+def stage_github_repo(ctx):
+    if ctx.get("via") == "rest":
+        return "skipped: deploying via the REST API (no push)"
+    client = GitHubClient()
+    try:
+        info = client.setup(GITHUB_OWNER, REPO_NAME, branch=BRANCH, create=True,
+                            description="AI Video website")
+    except (GitHubError, requests.RequestException) as e:
+        raise StageError(str(e))
+    ctx["repo"] = info
+    revalidated = client.stats["not_modified"]
+    return (f"{info.owner}/{info.name} ({info.default_branch}@{(info.head_sha or '-')[:8]}), "
+            f"{client.stats['requests']} requests, {revalidated} not modified")
+
+def stage_build(ctx):
+    if ctx.get("no_build"):
+        return "skipped: --no-build"
+    npm = shutil.which("npm")
+    if npm is None:
+        return "skipped: npm not found (Vercel builds remotely)"
+    cwd = ctx["project_dir"]
+    if not (cwd / "node_modules").exists():
+        run([npm, "ci"], cwd)
+    run([npm, "run", "build"], cwd)
+    return "next build"
+
+def stage_push(ctx):
+    if ctx.get("via") == "rest":
+        return "skipped: deploying via the REST API (--via git to push)"
+    cwd = ctx["project_dir"]
+    info = ctx["repo"]
+    head = ctx.get("head") or run(["git", "rev-parse", "HEAD"], cwd)
+    # The branch head came with the GitHub setup round, no ls-remote needed
+    if info.head_sha == head:
+        return "skipped: GitHub is up to date"
+    if run(["git", "remote", "get-url", "origin"], cwd, check=False) == "":
+        run(["git", "remote", "add", "origin", info.clone_url], cwd)
+    ctx["push_started"] = time.time()
+    run(["git", "push", "-u", "origin", f"HEAD:{info.default_branch}"], cwd, env=git_auth_env())
+    ctx["head"] = head
+    ctx["pushed"] = True
+    return f"pushed {head[:8]} to {info.default_branch}"
+
+def stage_optimize(ctx):
+    files_data = source_files(ctx)
+    optimizer = AssetOptimizer(ctx["project_dir"])
+    ctx["deploy_files"], results = optimizer.optimize(files_data)
+    optimizer.prune(files_data)
+    print_report(results)
+    saved = sum(r.saved for r in results)
+    processed = sum(1 for r in results if not r.cached)
+    return f"{len(results)} assets ({processed} processed), {saved:,} B saved"
+
+def stage_deploy(ctx):
+    if ctx.get("via") != "rest":
+        return "skipped: Git integration deploys the push"
+    token = os.environ.get('VERCEL_TOKEN')
+    if not token:
+        raise StageError("--via rest needs VERCEL_TOKEN")
+    files_data = ctx.get("deploy_files") or source_files(ctx)
+    session = deploy_vercel.make_session(token)
+    missing, url = deploy_vercel.find_missing_shas(files_data, session)
+    if url is None:
+        failed = deploy_vercel.upload_missing_files(files_data, missing, token, session)
+        if failed:
+            raise StageError(f"{len(failed)} files could not be uploaded")
+        url = deploy_vercel.create_deployment(files_data, token, session=session)
+        if not url:
+            raise StageError("deployment was not created")
+    ctx["manifest"].mark_uploaded({f['sha'] for f in files_data})
+    ctx["manifest"].save()
+    ctx["deployment_url"] = f"https://{url}"
+    return f"{len(missing)} blobs uploaded"
+
+def stage_watch(ctx):
+    if ctx.get("no_watch"):
+        return "skipped: --no-watch"
+    # Wait for this run's deployment: the latest one is usually still the previous
+    if ctx.get("via") == "rest":
+        if not ctx.get("deployment_url"):
+            return "skipped: nothing deployed"
+        watcher = DeploymentWatcher(max_wait=600, verbose=False,
+                                    deployment=ctx["deployment_url"])
+    else:
+        if not ctx.get("pushed"):
+            return "skipped: nothing pushed"
+        watcher = DeploymentWatcher(max_wait=600, verbose=False,
+                                    sha=ctx["head"], since=ctx["push_started"])
+    url = watcher.watch()
+    observed, _ = watcher.phase_timings()
+    phases = ", ".join(f"{state} {seconds:.0f}s" for state, seconds in observed)
+    if not url:
+        raise StageError(f"not live ({watcher.state}): {phases}")
+    ctx["live_url"] = url
+    return f"{url} ({phases})"
+
+def stage_budget(ctx):
+    if ctx.get("no_budget"):
+        return "skipped: --no-budget"
+    if not ctx.get("live_url"):
+        return "skipped: no live URL"
+    # The baseline only moves on request, or growth under the limit would ratchet it up
+    audits, violations = run_audit(ctx["live_url"], save_baseline=ctx.get("save_baseline", False),
+                                   verbose=False)
+    if violations:
+        raise StageError("; ".join(violations[:5]) + (" ..." if len(violations) > 5 else ""))
+    return ", ".join(f"{a.path} {a.total_bytes:,} B/{a.requests} req" for a in audits)
+
+def build_pipeline(project_dir, force=False):
+    return Pipeline(project_dir, [
+        Stage("commit", stage_commit),
+        Stage("github_repo", stage_github_repo),
+        # After the commit: node_modules/ and .next/ must not be staged
+        Stage("build", stage_build, deps=("commit",), inputs=build_inputs),
+        Stage("push", stage_push, deps=("commit", "github_repo")),
+        Stage("optimize", stage_optimize),
+        Stage("deploy", stage_deploy, deps=("build", "optimize"), inputs=deploy_inputs),
+        Stage("watch", stage_watch, deps=("push", "deploy")),
+        Stage("budget", stage_budget, deps=("watch",)),
+    ], force=force)
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy the site to GitHub + Vercel")
+    parser.add_argument("--via", choices=("git", "rest"),
+                        default="rest" if os.environ.get('VERCEL_TOKEN') else "git",
+                        help="Deploy through the Git integration (push) or the REST API")
+    parser.add_argument("--no-build", action="store_true", help="Skip the local next build")
+    parser.add_argument("--no-watch", action="store_true", help="Don't wait for the live URL")
+    parser.add_argument("--no-budget", action="store_true", help="Skip the performance budget check")
+    parser.add_argument("--force", action="store_true", help="Ignore cached input hashes")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Record the budget audit as the new regression baseline if it passes")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🚀 Deploy pipeline")
+    print("=" * 60)
+
+    pipeline = build_pipeline(Path(__file__).parent, force=args.force)
+    pipeline.ctx.update(via=args.via, no_build=args.no_build, no_watch=args.no_watch,
+                        no_budget=args.no_budget, save_baseline=args.save_baseline)
+    ok = pipeline.run()
+    pipeline.report()
+
+    live_url = pipeline.ctx.get("live_url")
+    if live_url:
+        print(f"\n🌐 Your site is live at: {live_url}")
+    if not ok:
+        print("\n❌ Pipeline failed")
+    return ok
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
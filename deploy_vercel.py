@@ -4,70 +4,222 @@ Deploys the project to Vercel using their REST API
 """
 import os
 import json
+import time
+import fnmatch
 import hashlib
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import zipfile
+from requests.adapters import HTTPAdapter
+
+UPLOAD_WORKERS = 8
+UPLOAD_RETRIES = 3
+HASH_CHUNK = 64 * 1024
+MANIFEST_PATH = os.path.join(".vercel", "deploy-manifest.json")
+IGNORE_FILES = ('.vercelignore', '.gitignore')
 
 def get_file_sha1(file_path):
-    """Calculate SHA1 hash of a file"""
+    """
+    Calculate SHA1 hash of a file, reading it in fixed-size chunks into one
+    reused buffer (memory stays flat however large the file is)
+    """
     sha1 = hashlib.sha1()
-    with open(file_path, 'rb') as f:
-        while chunk := f.read(8192):
-            sha1.update(chunk)
+    buffer = bytearray(HASH_CHUNK)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            sha1.update(view[:read])
     return sha1.hexdigest()
 
-def upload_file_to_vercel(file_path, token):
-    """Upload a single file to Vercel"""
+def make_session(token, pool_size=UPLOAD_WORKERS):
+    """Create a pooled session with auth headers (one keep-alive pool for all requests)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+def upload_file_to_vercel(file_path, token, sha1_hash=None,
+                          session=None, retries=UPLOAD_RETRIES):
+    """Upload a single file to Vercel, retrying transient failures"""
     url = "https://api.vercel.com/v2/files"
-    
+    session = session or make_session(token, pool_size=1)
+
+    if sha1_hash is None:
+        sha1_hash = get_file_sha1(file_path)
+
+    # A plain file object as the body is streamed in small blocks, never read whole
     with open(file_path, 'rb') as f:
-        file_content = f.read()
-    
-    sha1_hash = get_file_sha1(file_path)
-    file_size = len(file_content)
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Length": str(file_size),
-        "x-vercel-digest": sha1_hash
-    }
-    
-    response = requests.post(url, headers=headers, data=file_content)
-    
-    if response.status_code == 200:
-        return {"sha": sha1_hash, "size": file_size}
-    else:
-        print(f"Error uploading {file_path}: {response.status_code} - {response.text}")
-        return None
+        file_size = os.fstat(f.fileno()).st_size
+
+        headers = {
+            "Content-Length": str(file_size),
+            "x-vercel-digest": sha1_hash
+        }
+
+        for attempt in range(1, retries + 1):
+            try:
+                f.seek(0)
+                response = session.post(url, headers=headers, data=f, timeout=120)
+                if response.status_code == 200:
+                    return {"sha": sha1_hash, "size": file_size}
+                # Client errors (except rate limiting) won't succeed on retry
+                if response.status_code < 500 and response.status_code != 429:
+                    print(f"Error uploading {file_path}: {response.status_code} - {response.text}")
+                    return None
+                error = f"{response.status_code} - {response.text[:200]}"
+            except requests.RequestException as e:
+                error = str(e)
+
+            if attempt < retries:
+                time.sleep(2 ** attempt)
+
+    print(f"Error uploading {file_path} after {retries} attempts: {error}")
+    return None
+
+def load_ignore_patterns(directory):
+    """
+    Read .vercelignore and .gitignore from the project root.
+    Returns list of (pattern, negated, dir_only, anchored) tuples.
+    """
+    patterns = []
+    for name in IGNORE_FILES:
+        path = Path(directory) / name
+        if not path.exists():
+            continue
+        for line in path.read_text(encoding='utf-8', errors='replace').splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            patterns.append((line.lstrip('/'), negated, dir_only, anchored))
+    return patterns
+
+def is_ignored(relative_path, is_dir, patterns):
+    """gitignore-style match (last matching pattern wins, '!' re-includes)"""
+    name = relative_path.rsplit('/', 1)[-1]
+    ignored = False
+    for pattern, negated, dir_only, anchored in patterns:
+        if dir_only and not is_dir:
+            continue
+        target = relative_path if anchored else name
+        if fnmatch.fnmatchcase(target, pattern) or (
+                anchored and fnmatch.fnmatchcase(relative_path, pattern + '/*')):
+            ignored = not negated
+    return ignored
 
 def get_all_files(directory):
-    """Get all files in directory (excluding node_modules, .next, etc.)"""
+    """Get all files in directory (excluding node_modules, .next and ignore-file matches)"""
     ignore_dirs = {'.next', 'node_modules', '.git', '.vercel', '__pycache__'}
     ignore_files = {'.DS_Store', '*.log'}
-    
+    patterns = load_ignore_patterns(directory)
+
     files = []
     for root, dirs, filenames in os.walk(directory):
+        rel_root = Path(root).relative_to(directory).as_posix()
+        rel_root = '' if rel_root == '.' else rel_root + '/'
+
         # Filter out ignored directories
-        dirs[:] = [d for d in dirs if d not in ignore_dirs]
-        
+        dirs[:] = [
+            d for d in dirs
+            if d not in ignore_dirs and not is_ignored(rel_root + d, True, patterns)
+        ]
+
         for filename in filenames:
-            file_path = Path(root) / filename
-            relative_path = file_path.relative_to(directory)
-            files.append((str(file_path), str(relative_path).replace('\\', '/')))
-    
+            if any(fnmatch.fnmatchcase(filename, pat) for pat in ignore_files):
+                continue
+            relative_path = rel_root + filename
+            if is_ignored(relative_path, False, patterns):
+                continue
+            files.append((str(Path(root) / filename), relative_path))
+
     return files
 
-def create_deployment(files_data, token, project_name="ai-video-website"):
-    """Create a deployment on Vercel"""
-    url = "https://api.vercel.com/v13/deployments"
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
-    # Prepare file list for deployment
+class DeployManifest:
+    """
+    Persistent per-file SHA cache for incremental deploys.
+    Entries are keyed by relative path and validated by (size, mtime, inode),
+    so unchanged files are never re-hashed. 'uploaded' records that the blob
+    was part of a successful deployment.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                self.entries = {}
+
+    def lookup(self, relative_path, st):
+        entry = self.entries.get(relative_path)
+        if (entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns
+                and entry['inode'] == st.st_ino):
+            return entry
+        return None
+
+    def record(self, relative_path, st, sha):
+        self.entries[relative_path] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "inode": st.st_ino,
+            "sha": sha,
+            "uploaded": False,
+        }
+
+    def mark_uploaded(self, shas):
+        for entry in self.entries.values():
+            if entry['sha'] in shas:
+                entry['uploaded'] = True
+
+    def prune(self, relative_paths):
+        """Drop entries for files that no longer exist"""
+        keep = set(relative_paths)
+        self.entries = {k: v for k, v in self.entries.items() if k in keep}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+def hash_files(all_files, manifest=None):
+    """
+    Hash every file (reusing manifest SHAs for unchanged files).
+    Returns (list of {file_path, relative_path, sha, size, uploaded}, hashed_count)
+    """
+    files_data = []
+    hashed = 0
+    for file_path, relative_path in all_files:
+        st = os.stat(file_path)
+        entry = manifest.lookup(relative_path, st) if manifest is not None else None
+        if entry is None:
+            sha = get_file_sha1(file_path)
+            hashed += 1
+            if manifest is not None:
+                manifest.record(relative_path, st, sha)
+                entry = manifest.entries[relative_path]
+        else:
+            sha = entry['sha']
+        files_data.append({
+            "file_path": file_path,
+            "relative_path": relative_path,
+            "sha": sha,
+            "size": st.st_size,
+            "uploaded": bool(entry and entry.get('uploaded')),
+        })
+    return files_data, hashed
+
+def _post_deployment(files_data, session, project_name):
     file_list = []
     for file_info in files_data:
         if file_info:
@@ -76,7 +228,7 @@ def create_deployment(files_data, token, project_name="ai-video-website"):
                 "sha": file_info['sha'],
                 "size": file_info['size']
             })
-    
+
     payload = {
         "name": project_name,
         "files": file_list,
@@ -84,9 +236,63 @@ def create_deployment(files_data, token, project_name="ai-video-website"):
             "framework": "nextjs"
         }
     }
-    
-    response = requests.post(url, headers=headers, json=payload)
-    
+
+    return session.post("https://api.vercel.com/v13/deployments", json=payload, timeout=60)
+
+def find_missing_shas(files_data, session, project_name="ai-video-website"):
+    """
+    Ask Vercel which blobs it doesn't have yet.
+    Creating a deployment with unknown SHAs fails with a 'missing_files' error
+    listing them; if nothing is missing the deployment is created right away.
+    Returns (missing_shas, deployment_url).
+    """
+    response = _post_deployment(files_data, session, project_name)
+    if response.status_code in [200, 201]:
+        return set(), response.json().get('url', '')
+
+    try:
+        error = response.json().get('error', {})
+    except ValueError:
+        error = {}
+    if error.get('code') == 'missing_files':
+        return set(error.get('missing', [])), None
+
+    # Unknown error: upload everything not recorded as uploaded by an earlier deploy
+    print(f"⚠ Could not query missing files: {response.status_code} - {response.text[:200]}")
+    return {f['sha'] for f in files_data if not f.get('uploaded')}, None
+
+def upload_missing_files(files_data, missing, token, session, workers=UPLOAD_WORKERS):
+    """
+    Upload each missing blob once (files with identical content share a SHA)
+    using a bounded worker pool. Returns list of SHAs that failed.
+    """
+    by_sha = {}
+    for file_info in files_data:
+        if file_info['sha'] in missing:
+            by_sha.setdefault(file_info['sha'], file_info)
+
+    failed = []
+    total = len(by_sha)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(upload_file_to_vercel, info['file_path'], token,
+                        info['sha'], session): info
+            for info in by_sha.values()
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            info = futures[future]
+            if future.result():
+                print(f"  [{i}/{total}] ✓ {info['relative_path']}")
+            else:
+                print(f"  [{i}/{total}] ✗ {info['relative_path']}")
+                failed.append(info['sha'])
+    return failed
+
+def create_deployment(files_data, token, project_name="ai-video-website", session=None):
+    """Create a deployment on Vercel"""
+    session = session or make_session(token, pool_size=1)
+    response = _post_deployment(files_data, session, project_name)
+
     if response.status_code in [200, 201]:
         data = response.json()
         return data.get('url', '')
@@ -98,7 +304,7 @@ def main():
     print("=" * 60)
     print("Vercel Deployment Script")
     print("=" * 60)
-    
+
     # Get Vercel token
     token = os.environ.get('VERCEL_TOKEN')
     if not token:
@@ -111,34 +317,42 @@ def main():
         print("\nOr run this script with:")
         print("   $env:VERCEL_TOKEN='your_token'; python deploy_vercel.py")
         return
-    
+
     project_dir = Path(__file__).parent
     print(f"\n📁 Project directory: {project_dir}")
-    
+
     # Get all files
     print("\n📦 Collecting files...")
     all_files = get_all_files(project_dir)
-    print(f"Found {len(all_files)} files")
-    
-    # Upload files
-    print("\n⬆️  Uploading files to Vercel...")
-    files_data = []
-    for i, (file_path, relative_path) in enumerate(all_files, 1):
-        print(f"  [{i}/{len(all_files)}] Uploading {relative_path}...", end=' ')
-        file_info = upload_file_to_vercel(file_path, token)
-        if file_info:
-            file_info['relative_path'] = relative_path
-            files_data.append(file_info)
-            print("✓")
-        else:
-            print("✗")
+    manifest = DeployManifest(project_dir / MANIFEST_PATH)
+    manifest.prune(rel for _, rel in all_files)
+    files_data, hashed = hash_files(all_files, manifest)
+    manifest.save()
+    unique = len({f['sha'] for f in files_data})
+    print(f"Found {len(files_data)} files ({unique} unique blobs, {hashed} re-hashed)")
+
+    session = make_session(token)
+
+    # Only upload blobs Vercel doesn't already have
+    print("\n🔍 Checking which files Vercel already has...")
+    missing, deployment_url = find_missing_shas(files_data, session)
+
+    if deployment_url is None:
+        print(f"\n⬆️  Uploading {len(missing)} missing blobs to Vercel...")
+        failed = upload_missing_files(files_data, missing, token, session)
+        if failed:
+            print(f"\n❌ {len(failed)} files could not be uploaded, aborting deployment.")
             return
-    
-    # Create deployment
-    print("\n🚀 Creating deployment...")
-    deployment_url = create_deployment(files_data, token)
-    
+
+        # Create deployment
+        print("\n🚀 Creating deployment...")
+        deployment_url = create_deployment(files_data, token, session=session)
+    else:
+        print("All files already uploaded.")
+
     if deployment_url:
+        manifest.mark_uploaded({f['sha'] for f in files_data})
+        manifest.save()
         print(f"\n✅ Deployment successful!")
         print(f"🌐 Your site is live at: https://{deployment_url}")
     else:
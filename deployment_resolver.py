@@ -0,0 +1,249 @@
+"""
+Resolve the live deployment URL and state without a browser.
+
+Asks the Vercel REST deployments API first (needs VERCEL_TOKEN) and falls
+back to the GitHub deployments API, which Vercel's Git integration keeps
+up to date (public repos need no token; GITHUB_TOKEN raises rate limits).
+
+By default the latest deployment is returned. Right after a push or a REST
+deploy that is usually still the previous one, so callers waiting for a
+new deployment pass ``sha`` (the pushed commit), ``deployment`` (the URL
+or id returned by the REST API) and/or ``since`` (deployments created
+earlier are ignored) to ``resolve``.
+
+Both API base URLs can be overridden with VERCEL_API_URL / GITHUB_API_URL
+(or constructor arguments), e.g. to point at a local stub server in tests.
+"""
+import os
+import random
+import time
+from datetime import datetime
+import requests
+
+REPO_NAME = "ai-video-website"
+GITHUB_REPO = "algotcha-project/ai-video-website"
+
+VERCEL_API_URL = os.environ.get('VERCEL_API_URL', 'https://api.vercel.com')
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+
+# Vercel deployment states
+READY = "READY"
+ERROR = "ERROR"
+CANCELED = "CANCELED"
+BUILDING = "BUILDING"
+QUEUED = "QUEUED"
+FINAL_STATES = {READY, ERROR, CANCELED}
+
+# GitHub deployment status -> Vercel state
+GITHUB_STATES = {
+    "success": READY,
+    "failure": ERROR,
+    "error": ERROR,
+    "inactive": CANCELED,
+    "in_progress": BUILDING,
+    "pending": QUEUED,
+    "queued": QUEUED,
+}
+
+class Deployment:
+    """A deployment as reported by Vercel or GitHub"""
+
+    def __init__(self, url, state, source, deployment_id="", created_at=None,
+                 building_at=None, ready_at=None):
+        self.url = url
+        self.state = state
+        self.source = source
+        self.deployment_id = deployment_id
+        self.created_at = created_at
+        self.building_at = building_at      # epoch ms (Vercel only)
+        self.ready_at = ready_at            # epoch ms (Vercel only)
+
+    @property
+    def is_final(self):
+        return self.state in FINAL_STATES
+
+    def __repr__(self):
+        return f"Deployment({self.url}, {self.state}, via {self.source})"
+
+def backoff_delays(initial=1.0, factor=2.0, maximum=15.0, jitter=0.5):
+    """
+    Endless exponential backoff: initial, initial*factor, ... capped at maximum.
+    Each delay is shortened by up to ``jitter`` (a fraction) at random so
+    concurrent pollers don't line up.
+    """
+    delay = initial
+    while True:
+        yield delay * (1 - jitter * random.random())
+        delay = min(delay * factor, maximum)
+
+def _epoch(created_at):
+    """Creation time as epoch seconds (Vercel reports ms, GitHub an ISO string)"""
+    if created_at is None:
+        return None
+    if isinstance(created_at, str):
+        return datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp()
+    return created_at / 1000
+
+def _with_scheme(url):
+    if url and not url.startswith('http'):
+        return f"https://{url}"
+    return url
+
+class DeploymentResolver:
+    """Looks up the latest deployment of the project via REST APIs"""
+
+    def __init__(self, project=REPO_NAME, github_repo=GITHUB_REPO,
+                 vercel_token=None, github_token=None, team_id=None,
+                 vercel_api=None, github_api=None, session=None, timeout=10):
+        self.project = project
+        self.github_repo = github_repo
+        self.vercel_token = vercel_token if vercel_token is not None else os.environ.get('VERCEL_TOKEN')
+        self.github_token = github_token if github_token is not None else os.environ.get('GITHUB_TOKEN')
+        self.team_id = team_id if team_id is not None else os.environ.get('VERCEL_TEAM_ID')
+        self.vercel_api = (vercel_api or VERCEL_API_URL).rstrip('/')
+        self.github_api = (github_api or GITHUB_API_URL).rstrip('/')
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def _vercel_get(self, path, params):
+        if self.team_id:
+            params["teamId"] = self.team_id
+        try:
+            response = self.session.get(
+                f"{self.vercel_api}{path}",
+                params=params,
+                headers={"Authorization": f"Bearer {self.vercel_token}"},
+                timeout=self.timeout,
+            )
+            if response.status_code == 404:
+                return None
+            if response.status_code != 200:
+                print(f"Vercel API: {response.status_code} - {response.text[:200]}")
+                return None
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Vercel API error: {e}")
+            return None
+
+    def from_vercel(self, sha=None, deployment=None, since=None):
+        """
+        Latest deployment from the Vercel API (None without a token, on error
+        or when no deployment matches): the given ``deployment`` (URL or id),
+        else the latest one of commit ``sha`` created after ``since``.
+        """
+        if not self.vercel_token:
+            return None
+        if deployment:
+            found = self._vercel_get(f"/v13/deployments/{deployment.split('://')[-1]}", {})
+        else:
+            params = {"projectId": self.project, "limit": 20 if sha else 1}
+            if since:
+                params["since"] = int(since * 1000)
+            data = self._vercel_get("/v6/deployments", params)
+            candidates = (data or {}).get('deployments', [])
+            if sha:
+                candidates = [d for d in candidates
+                              if (d.get('meta') or {}).get('githubCommitSha') == sha]
+            found = candidates[0] if candidates else None
+        if not found:
+            return None
+        created_at = found.get('created') or found.get('createdAt')
+        if since and created_at and _epoch(created_at) < since:
+            return None
+        return Deployment(
+            url=_with_scheme(found.get('url', '')),
+            state=found.get('state') or found.get('readyState') or QUEUED,
+            source="vercel",
+            deployment_id=found.get('uid') or found.get('id', ''),
+            created_at=created_at,
+            building_at=found.get('buildingAt'),
+            ready_at=found.get('ready'),
+        )
+
+    def from_github(self, sha=None, since=None):
+        """Latest deployment (of commit ``sha``, created after ``since``) from the GitHub deployments API"""
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.github_token:
+            headers["Authorization"] = f"Bearer {self.github_token}"
+        base = f"{self.github_api}/repos/{self.github_repo}/deployments"
+        try:
+            params = {"per_page": 1}
+            if sha:
+                params["sha"] = sha
+            response = self.session.get(base, params=params,
+                                        headers=headers, timeout=self.timeout)
+            if response.status_code != 200:
+                print(f"GitHub API: {response.status_code} - {response.text[:200]}")
+                return None
+            deployments = response.json()
+            if not deployments:
+                return None
+            latest = deployments[0]
+            if since and _epoch(latest.get('created_at')) < since:
+                return None
+
+            response = self.session.get(f"{base}/{latest['id']}/statuses",
+                                        params={"per_page": 1},
+                                        headers=headers, timeout=self.timeout)
+            statuses = response.json() if response.status_code == 200 else []
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"GitHub API error: {e}")
+            return None
+
+        status = statuses[0] if statuses else {}
+        url = status.get('environment_url') or status.get('target_url') or ''
+        return Deployment(
+            url=_with_scheme(url),
+            state=GITHUB_STATES.get(status.get('state', 'pending'), QUEUED),
+            source="github",
+            deployment_id=str(latest.get('id', '')),
+            created_at=latest.get('created_at'),
+        )
+
+    def resolve(self, sha=None, deployment=None, since=None):
+        """
+        Latest deployment from Vercel, falling back to GitHub (see
+        ``from_vercel``; a specific ``deployment`` can only come from Vercel)
+        """
+        found = self.from_vercel(sha=sha, deployment=deployment, since=since)
+        if found is None and not deployment:
+            found = self.from_github(sha=sha, since=since)
+        return found
+
+    def wait_until_final(self, max_wait=300, delays=None, **filters):
+        """
+        Poll with backoff until the deployment is READY/ERROR/CANCELED (or
+        max_wait passes); ``filters`` are passed on to ``resolve``
+        """
+        deadline = time.monotonic() + max_wait
+        delays = delays or backoff_delays()
+        deployment = self.resolve(**filters)
+        while deployment is None or not deployment.is_final:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(next(delays), remaining))
+            deployment = self.resolve(**filters)
+        return deployment
+
+def main():
+    print("=" * 70)
+    print("RESOLVING DEPLOYMENT URL")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    deployment = DeploymentResolver().resolve()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if deployment and deployment.url:
+        print(f"\nURL:    {deployment.url}")
+        print(f"State:  {deployment.state}")
+        print(f"Source: {deployment.source} ({elapsed_ms:.0f} ms)")
+        return deployment.url
+
+    print(f"\nNo deployment found ({elapsed_ms:.0f} ms).")
+    print("Set VERCEL_TOKEN for the Vercel API, or check https://vercel.com/dashboard")
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Follow a deployment until it is READY or ERROR, then confirm the live URL.
+
+Replaces the fixed 15/30/60 second sleep loops: the deployment state is
+polled with exponential backoff and jitter (1s, 2s, 4s ... capped at 15s),
+the watcher exits the moment the state becomes final, and the URL is
+confirmed with one concurrent probe. Without API access (no deployment
+found) it falls back to probing the candidate URLs on the same schedule.
+
+To wait for a new deployment rather than whatever is latest, give the
+pushed commit (``sha``), the deployment created over REST (``deployment``)
+and/or ``since``: until a matching deployment is registered the watcher
+keeps polling, and only that deployment's own URL is confirmed, so the
+previous READY deployment is never mistaken for the new one.
+
+Usage:
+    python deployment_watcher.py [max_wait_seconds] [commit_sha]
+"""
+import sys
+import time
+
+from deployment_resolver import (DeploymentResolver, backoff_delays,
+                                 READY, ERROR, CANCELED, REPO_NAME)
+from url_probe import UrlProbe, candidate_urls
+
+class DeploymentWatcher:
+    """Polls the deployment state with backoff and records phase timings"""
+
+    def __init__(self, resolver=None, probe=None, candidates=None, max_wait=300,
+                 delays=None, verbose=True, sha=None, deployment=None, since=None):
+        self.resolver = resolver or DeploymentResolver(project=REPO_NAME)
+        self.filters = {"sha": sha, "deployment": deployment, "since": since}
+        self.targeted = any(v is not None for v in self.filters.values())
+        # Failures must not be cached between polls
+        self.probe = probe or UrlProbe(negative_ttl=0)
+        self.candidates = candidates if candidates is not None else candidate_urls()
+        self.max_wait = max_wait
+        self.delays = delays or backoff_delays()
+        self.verbose = verbose
+        self.deployment = None
+        self.state = None
+        self.url = None
+        self.polls = 0
+        self.phases = []        # [(state, seconds since start)] on every state change
+        self.started = None
+        self.finished = None
+
+    def _log(self, message):
+        if self.verbose:
+            print(f"[{time.monotonic() - self.started:6.1f}s] {message}")
+
+    def _transition(self, state):
+        if state != self.state:
+            self.state = state
+            self.phases.append((state, time.monotonic() - self.started))
+            self._log(f"state: {state}")
+
+    def _confirm(self, deployment):
+        """First live URL among the aliases and the deployment URL itself"""
+        if self.targeted:
+            # The aliases may still serve (or never switch from) the previous deployment
+            if deployment.url:
+                self.probe.first_live([deployment.url], verbose=self.verbose)
+            return deployment.url
+        urls = list(self.candidates)
+        if deployment and deployment.url:
+            urls.append(deployment.url)
+        result = self.probe.first_live(urls, verbose=self.verbose)
+        if result:
+            return result.url
+        # READY per the API but not reachable anonymously (e.g. deployment protection)
+        return deployment.url if deployment else None
+
+    def watch(self):
+        """Block until the deployment is final (or max_wait passes); returns the live URL or None"""
+        self.started = time.monotonic()
+        deadline = self.started + self.max_wait
+
+        while True:
+            self.polls += 1
+            self.deployment = self.resolver.resolve(**self.filters)
+
+            if self.deployment is not None:
+                self._transition(self.deployment.state)
+                if self.deployment.is_final:
+                    if self.deployment.state == READY:
+                        self.url = self._confirm(self.deployment)
+                    break
+            elif self.targeted:
+                # Not registered yet (a live alias would be the previous deployment)
+                self._transition("PENDING")
+            else:
+                # No API information: the site answering is the only signal
+                self._transition("UNKNOWN")
+                result = self.probe.first_live(self.candidates, verbose=False)
+                if result:
+                    self._transition(READY)
+                    self.url = result.url
+                    break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._log("timeout")
+                break
+            time.sleep(min(next(self.delays), remaining))
+
+        self.finished = time.monotonic()
+        return self.url
+
+    def phase_timings(self):
+        """[(phase, seconds)] as observed by the watcher, plus Vercel's own timestamps if known"""
+        end = (self.finished or time.monotonic()) - self.started
+        observed = []
+        for i, (state, at) in enumerate(self.phases):
+            until = self.phases[i + 1][1] if i + 1 < len(self.phases) else end
+            observed.append((state, until - at))
+
+        reported = []
+        d = self.deployment
+        if d is not None and d.created_at and d.building_at:
+            reported.append(("queued", (d.building_at - d.created_at) / 1000))
+            if d.ready_at:
+                reported.append(("build", (d.ready_at - d.building_at) / 1000))
+        return observed, reported
+
+    def print_report(self):
+        observed, reported = self.phase_timings()
+        total = (self.finished or time.monotonic()) - self.started
+        print("\n" + "=" * 70)
+        print("DEPLOYMENT TIMINGS")
+        print("=" * 70)
+        for phase, seconds in observed:
+            print(f"  {phase:<10} {seconds:7.1f}s  (observed)")
+        for phase, seconds in reported:
+            print(f"  {phase:<10} {seconds:7.1f}s  (reported by Vercel)")
+        print(f"  {'total':<10} {total:7.1f}s  ({self.polls} polls)")
+
+def watch_deployment(max_wait=300, candidates=None, verbose=True, **filters):
+    """Watch, print the phase report and return the watcher (``filters``: sha/deployment/since)"""
+    watcher = DeploymentWatcher(candidates=candidates, max_wait=max_wait, verbose=verbose,
+                                **filters)
+    watcher.watch()
+    if verbose:
+        watcher.print_report()
+    return watcher
+
+def main():
+    max_wait = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    sha = sys.argv[2] if len(sys.argv) > 2 else None
+    print("=" * 70)
+    print("WATCHING DEPLOYMENT")
+    print("=" * 70)
+
+    watcher = watch_deployment(max_wait=max_wait, sha=sha)
+    if watcher.url:
+        print(f"\nLive URL: {watcher.url}")
+        return watcher.url
+
+    if watcher.state in (ERROR, CANCELED):
+        print(f"\nDeployment {watcher.state}. Build logs: https://vercel.com/dashboard")
+    else:
+        print("\nDeployment not confirmed yet. Check https://vercel.com/dashboard")
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,24 @@
 """
 Final check for deployment URL
 """
-import requests
-import time
+from deployment_watcher import DeploymentWatcher
+from url_probe import candidate_urls, default_probe
 
 REPO_NAME = "ai-video-website"
 USERNAME = "algotcha-project"
 
 # Common Vercel URL patterns
-possible_urls = [
-    f"https://{REPO_NAME}.vercel.app",
-    f"https://{REPO_NAME}-{USERNAME}.vercel.app",
-    f"https://{REPO_NAME}-{USERNAME}.vercel.app",
-    f"https://{REPO_NAME}-git-master-{USERNAME}.vercel.app",
-]
+possible_urls = candidate_urls(REPO_NAME, USERNAME)
 
 def check_url(url):
     """Check if URL is live and contains our content"""
-    try:
-        response = requests.get(url, timeout=10, allow_redirects=True)
-        if response.status_code == 200:
-            content = response.text.lower()
-            # Check for Ukrainian content or AI video keywords
-            if any(keyword in content for keyword in ['відео', 'фотографій', 'ai-відео', 'замовлення', 'весілля']):
-                return True, url
-            # Also check for English keywords from our site
-            if any(keyword in content for keyword in ['ai video', 'photographs', 'custom', 'order']):
-                return True, url
-    except:
-        pass
-    return False, None
+    result = default_probe().probe(url)
+    return result.live, (url if result.live else None)
+
+def check_all():
+    """Probe all candidates concurrently; first live URL or None"""
+    result = default_probe().first_live(possible_urls)
+    return result.url if result else None
 
 def main():
     print("=" * 70)
@@ -38,34 +27,29 @@ def main():
     print()
     
     print("Checking possible URLs...")
-    for url in possible_urls:
-        print(f"Checking: {url}")
-        is_live, final_url = check_url(url)
-        if is_live:
-            print("\n" + "=" * 70)
-            print("SUCCESS! FOUND LIVE SITE")
-            print("=" * 70)
-            print(f"\nYour live website:")
-            print(f"  {final_url}")
-            print()
-            return final_url
+    final_url = check_all()
+    if final_url:
+        print("\n" + "=" * 70)
+        print("SUCCESS! FOUND LIVE SITE")
+        print("=" * 70)
+        print(f"\nYour live website:")
+        print(f"  {final_url}")
+        print()
+        return final_url
     
     print("\nURLs not found yet. Deployment might still be in progress.")
-    print("Waiting 60 seconds and checking again...")
-    time.sleep(60)
-    
-    print("\nRe-checking...")
-    for url in possible_urls:
-        print(f"Checking: {url}")
-        is_live, final_url = check_url(url)
-        if is_live:
-            print("\n" + "=" * 70)
-            print("SUCCESS! FOUND LIVE SITE")
-            print("=" * 70)
-            print(f"\nYour live website:")
-            print(f"  {final_url}")
-            print()
-            return final_url
+    print("Watching the deployment until it is READY or ERROR...")
+    watcher = DeploymentWatcher(candidates=possible_urls, max_wait=180)
+    final_url = watcher.watch()
+    watcher.print_report()
+    if final_url:
+        print("\n" + "=" * 70)
+        print("SUCCESS! FOUND LIVE SITE")
+        print("=" * 70)
+        print(f"\nYour live website:")
+        print(f"  {final_url}")
+        print()
+        return final_url
     
     print("\n" + "=" * 70)
     print("DEPLOYMENT MAY STILL BE IN PROGRESS")
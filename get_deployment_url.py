@@ -1,93 +1,41 @@
 """
 Get the live Vercel deployment URL
 """
-import requests
-import time
-import subprocess
-import json
+from deployment_resolver import DeploymentResolver, READY
 
 GITHUB_REPO = "algotcha-project/ai-video-website"
 REPO_NAME = "ai-video-website"
 
-def check_vercel_deployment():
-    """Check Vercel deployment status and get URL"""
+def check_vercel_deployment(resolver=None):
+    """Check deployment status via the Vercel/GitHub APIs and return the URL once READY"""
     print("Checking Vercel deployment status...")
     print("=" * 70)
-    
-    # Try to get deployment info from Vercel API
-    # First, let's try to find the project URL through GitHub Pages or Vercel
-    
-    # Check if there's a way to get it from Vercel dashboard
-    # Since we don't have Vercel token, let's try checking the repo for deployment info
-    
     print(f"Repository: https://github.com/{GITHUB_REPO}")
-    print()
-    print("Checking deployment status...")
-    
-    # Try to get from Vercel API (might need auth)
-    # For now, let's construct the likely URL
-    # Vercel URLs are typically: project-name-username.vercel.app
-    
-    possible_urls = [
-        f"https://{REPO_NAME}.vercel.app",
-        f"https://{REPO_NAME}-algotcha-project.vercel.app",
-        f"https://{REPO_NAME}-git-master-algotcha-project.vercel.app",
-    ]
-    
-    print("\nTrying to verify deployment URLs...")
-    for url in possible_urls:
-        try:
-            response = requests.get(url, timeout=5, allow_redirects=True)
-            if response.status_code == 200:
-                print(f"\n✅ FOUND LIVE SITE!")
-                print(f"🌐 URL: {url}")
-                return url
-            elif response.status_code in [301, 302, 307, 308]:
-                final_url = response.url
-                print(f"✅ Found redirect to: {final_url}")
-                return final_url
-        except:
-            continue
-    
-    # If direct check doesn't work, try to get from Vercel API using GitHub token
-    print("\nAttempting to get deployment info from Vercel...")
-    
-    # Try checking Vercel's public API
-    try:
-        # Vercel might expose project info
-        api_url = f"https://api.vercel.com/v9/projects/{REPO_NAME}"
-        # This won't work without auth, but let's try
-        response = requests.get(api_url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if 'url' in data:
-                url = data['url']
-                print(f"\n✅ FOUND DEPLOYMENT!")
-                print(f"🌐 URL: https://{url}")
-                return f"https://{url}"
-    except:
-        pass
-    
+
+    resolver = resolver or DeploymentResolver(project=REPO_NAME, github_repo=GITHUB_REPO)
+    deployment = resolver.resolve()
+    if deployment is None:
+        print("No deployment found yet.")
+        return None
+
+    print(f"State: {deployment.state} (via {deployment.source})")
+    if deployment.state == READY and deployment.url:
+        print(f"\n✅ FOUND LIVE SITE!")
+        print(f"🌐 URL: {deployment.url}")
+        return deployment.url
     return None
 
 def wait_for_deployment(max_wait=180):
-    """Wait for deployment to complete and check periodically"""
+    """Wait for deployment to complete"""
     print("Waiting for deployment to complete...")
-    print("This may take 2-3 minutes...")
     print()
-    
-    start_time = time.time()
-    check_interval = 10  # Check every 10 seconds
-    
-    while time.time() - start_time < max_wait:
-        url = check_vercel_deployment()
-        if url:
-            return url
-        
-        elapsed = int(time.time() - start_time)
-        print(f"Still deploying... ({elapsed}s / {max_wait}s)")
-        time.sleep(check_interval)
-    
+
+    resolver = DeploymentResolver(project=REPO_NAME, github_repo=GITHUB_REPO)
+    deployment = resolver.wait_until_final(max_wait=max_wait)
+    if deployment and deployment.state == READY and deployment.url:
+        return deployment.url
+    if deployment:
+        print(f"Deployment finished as {deployment.state}")
     return None
 
 def main():
@@ -0,0 +1,186 @@
+"""
+Small GitHub REST client for the deploy tooling
+
+- one pooled requests.Session with timeouts for every call
+- ETag-conditional GETs: responses are cached in .vercel/github-cache.json
+  and revalidated with If-None-Match, so an unchanged resource costs a
+  304 (which GitHub doesn't count against the rate limit) instead of a
+  full response, across runs
+- setup() issues the independent lookups (identity, repository, default
+  branch head) concurrently
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+CACHE_PATH = Path(__file__).parent / ".vercel" / "github-cache.json"
+TIMEOUT = 10
+
+class GitHubError(Exception):
+    """Non-success response from the GitHub API"""
+
+    def __init__(self, status, message):
+        super().__init__(f"GitHub API {status}: {message}")
+        self.status = status
+
+class RepoInfo:
+    """What the deploy pipeline needs to know about the repository"""
+
+    def __init__(self, owner, name, exists, clone_url=None, default_branch="main",
+                 head_sha=None, login=None):
+        self.owner = owner
+        self.name = name
+        self.exists = exists
+        self.clone_url = clone_url or f"https://github.com/{owner}/{name}.git"
+        self.default_branch = default_branch
+        self.head_sha = head_sha        # tip of the default branch on GitHub
+        self.login = login              # authenticated user (None without a token)
+
+    def __repr__(self):
+        state = f"{self.default_branch}@{(self.head_sha or '-')[:8]}" if self.exists else "missing"
+        return f"RepoInfo({self.owner}/{self.name}: {state})"
+
+class GitHubClient:
+    """GitHub API calls over a shared session with a persistent ETag cache"""
+
+    def __init__(self, token=None, api=None, cache_path=CACHE_PATH, session=None, timeout=TIMEOUT):
+        self.token = token if token is not None else os.environ.get('GITHUB_TOKEN')
+        self.api = (api or GITHUB_API_URL).rstrip('/')
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=8))
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        if self.token:
+            self.session.headers["Authorization"] = f"Bearer {self.token}"
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.cache_path and self.cache_path.exists():
+            try:
+                self._cache = json.loads(self.cache_path.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                self._cache = {}
+        self.stats = {"requests": 0, "not_modified": 0}
+
+    def _cache_key(self, url):
+        # Responses differ per identity (private repos, /user)
+        return f"{'auth' if self.token else 'anon'} {url}"
+
+    def cached(self, path):
+        """Last response body seen for ``path`` (possibly stale), or None"""
+        with self._lock:
+            entry = self._cache.get(self._cache_key(f"{self.api}{path}"))
+        return entry["data"] if entry else None
+
+    def get(self, path, allow_missing=False):
+        """GET with If-None-Match revalidation; returns parsed JSON (None if missing and allowed)"""
+        url = f"{self.api}{path}"
+        key = self._cache_key(url)
+        with self._lock:
+            cached = self._cache.get(key)
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        with self._lock:
+            self.stats["requests"] += 1
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return cached["data"]
+        # 409: the repository is empty
+        if response.status_code in (404, 409) and allow_missing:
+            with self._lock:
+                if self._cache.pop(key, None) is not None:
+                    self._dirty = True
+            return None
+        if response.status_code != 200:
+            raise GitHubError(response.status_code, response.text[:200])
+
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._cache[key] = {"etag": etag, "data": data}
+                self._dirty = True
+        return data
+
+    def post(self, path, payload):
+        response = self.session.post(f"{self.api}{path}", json=payload, timeout=self.timeout)
+        with self._lock:
+            self.stats["requests"] += 1
+        if response.status_code not in (200, 201):
+            raise GitHubError(response.status_code, response.text[:200])
+        return response.json()
+
+    def save(self):
+        """Persist the ETag cache (only if something changed)"""
+        if not self.cache_path or not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix('.tmp')
+        with self._lock:
+            tmp.write_text(json.dumps(self._cache), encoding='utf-8')
+            self._dirty = False
+        os.replace(tmp, self.cache_path)
+
+    # --- Endpoints ---
+
+    def user(self):
+        """Authenticated user's login (None without a token)"""
+        if not self.token:
+            return None
+        return self.get("/user")["login"]
+
+    def repo(self, owner, name):
+        """Repository metadata, or None if it doesn't exist (or isn't visible)"""
+        return self.get(f"/repos/{owner}/{name}", allow_missing=True)
+
+    def branch_head(self, owner, name, branch):
+        """SHA of the branch tip, or None if the repo/branch doesn't exist"""
+        data = self.get(f"/repos/{owner}/{name}/branches/{branch}", allow_missing=True)
+        return data["commit"]["sha"] if data else None
+
+    def create_repo(self, name, description="", private=False):
+        return self.post("/user/repos", {"name": name, "description": description,
+                                         "private": private, "auto_init": False})
+
+    def setup(self, owner, name, branch="main", create=False, description=""):
+        """
+        Everything needed before a push, in one concurrent round: identity,
+        repository metadata and the branch head. The default branch from the
+        previous run (or ``branch``) is guessed for the head lookup; it is
+        re-fetched only if the repository says otherwise. Creates the
+        repository when missing and ``create`` is set.
+        """
+        previous = self.cached(f"/repos/{owner}/{name}")
+        branch = (previous or {}).get("default_branch") or branch
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            login_f = pool.submit(self.user)
+            repo_f = pool.submit(self.repo, owner, name)
+            head_f = pool.submit(self.branch_head, owner, name, branch)
+            login, repo, head = login_f.result(), repo_f.result(), head_f.result()
+
+        if repo is None:
+            if not create:
+                return RepoInfo(owner, name, exists=False, default_branch=branch, login=login)
+            if not self.token:
+                raise GitHubError(401, "repository not found and GITHUB_TOKEN is not set")
+            repo = self.create_repo(name, description)
+            self.save()
+            return RepoInfo(owner, name, exists=True, clone_url=repo.get("clone_url"),
+                            default_branch=repo.get("default_branch") or branch, login=login)
+
+        default_branch = repo.get("default_branch") or branch
+        if default_branch != branch:
+            head = self.branch_head(owner, name, default_branch)
+        info = RepoInfo(owner, name, exists=True, clone_url=repo.get("clone_url"),
+                        default_branch=default_branch, head_sha=head, login=login)
+        self.save()
+        return info
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the monitor's hot paths.
+
+Pages come from a ``--record`` archive (``--replay DIR``) when given,
+otherwise from synthetic Cafe24 list pages, so the benchmarks run offline.
+
+Usage:
+    python benchmark.py parse                   # per-product parse cost
+    python benchmark.py parse --replay fixtures/
+    python benchmark.py parse-pool --replay fixtures/ --workers 4  # scaling over 1-4 processes
+    python benchmark.py fallback --replay fixtures/  # how often two-phase parses pages whole
+    python benchmark.py startup                 # cold start of a cron --check --if-due run
+    python benchmark.py convert                 # KRW → UAH: per-product strings vs batch
+    python benchmark.py rates                   # historical as-of conversion of a price column
+    python benchmark.py logging                 # log overhead per page: direct vs queued
+"""
+
+import argparse
+import os
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import parse_pool
+import replay
+from scraper import (_parse_page_rows, _parse_products_from_page, _scan_and_extract,
+                     get_extraction_plan, _PLANS)
+from stores import MEDICUBE
+
+EXCHANGE_RATE = 0.029
+
+
+def synthetic_page(count: int = 40, start: int = 1000) -> str:
+    """A Cafe24 mobile list page with ``count`` products (struck-through sale + member price)."""
+    items = []
+    for no in range(start, start + count):
+        items.append(f"""
+<li id="anchorBoxId_{no}" class="xans-record-">
+  <div class="thumbnail">
+    <a href="/product/detail.html?product_no={no}&cate_no=51&display_group=1">
+      <img src="//m.themedicube.co.kr/web/product/medium/{no}.jpg" alt="">
+    </a>
+  </div>
+  <div class="description">
+    <strong class="name"><a href="/product/detail.html?product_no={no}&cate_no=51">
+      <span class="title displaynone">상품명</span> 에이지알 부스터 프로 {no}</a></strong>
+    <ul class="xans-element- xans-product xans-product-listitem listInfo">
+      <li class="xans-record-"><strong class="ptitle"><span>판매가</span></strong>
+        <span style="font-size:12px;color:#999;text-decoration:line-through;">{(no % 90 + 10) * 1000 + 9000:,}원</span></li>
+      <li class="xans-record-"><strong class="ptitle"><span>일반 회원가</span></strong>
+        <span style="font-size:14px;color:#000;">{(no % 90 + 10) * 1000:,}원</span></li>
+      <li class="xans-record-"><strong class="ptitle"><span>상품요약정보</span></strong>
+        <span>피부 탄력 케어</span></li>
+    </ul>
+  </div>
+</li>""")
+    return ('<html><body><div class="xans-element- xans-product xans-product-listnormal">'
+            '<ul class="prdList">' + "".join(items) + "</ul></div></body></html>")
+
+
+def load_archive(replay_dir: str) -> List[Tuple[str, str]]:
+    """(url, html) of every page in a ``--record`` archive."""
+    return list(replay.PageArchive(replay_dir, replaying=True).iter_pages())
+
+
+def load_pages(replay_dir: str = None, synthetic: int = 7) -> List[str]:
+    if replay_dir:
+        return [html for _, html in load_archive(replay_dir)]
+    return [synthetic_page(40, 1000 + i * 20) for i in range(synthetic)]
+
+
+def _time_runs(fn, repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def bench_parse(pages: List[str], repeat: int) -> None:
+    """
+    Per-check parse cost of all pages: every page parsed whole vs two-phase
+    (items already extracted earlier in the check are only scanned).
+    """
+    _PLANS.clear()
+    started = time.perf_counter()
+    get_extraction_plan(MEDICUBE)
+    plan_build = time.perf_counter() - started
+
+    products = sum(len(_parse_products_from_page(p, "NEW")) for p in pages)
+    seen = {}
+    for html in pages:
+        _parse_products_from_page(html, "NEW", seen=seen)
+
+    def whole():
+        for html in pages:
+            _parse_products_from_page(html, "NEW")
+
+    def two_phase():
+        seen = {}
+        for html in pages:
+            _parse_products_from_page(html, "NEW", seen=seen)
+
+    print(f"pages: {len(pages)}  products: {products}  unique: {len(seen)}  repeat: {repeat}")
+    print(f"plan build (once per store/layout): {plan_build * 1000:.2f} ms")
+    results = {}
+    for label, fn in (("whole pages", whole), ("two-phase", two_phase)):
+        runs = _time_runs(fn, repeat)
+        results[label] = best = min(runs)
+        print(f"{label:>12}: best {best * 1000:.1f} ms, median {statistics.median(runs) * 1000:.1f} ms "
+              f"per check, {best / products * 1e6:.1f} µs per listed product")
+    print(f"two-phase speedup: {results['whole pages'] / results['two-phase']:.2f}x")
+
+
+def bench_fallback(pages: List[Tuple[str, str]], repeat: int, show: int = 10) -> None:
+    """
+    How often ``_scan_and_extract`` parses a recorded page whole because the
+    scan can't place every product_no= link on an anchored item, why, and
+    the two-phase speedup over the archive with those fallbacks included.
+    """
+    plan = get_extraction_plan(MEDICUBE)
+    fallbacks = []
+    for url, html in pages:
+        order, _ = _scan_and_extract(html, "NEW", plan, frozenset())
+        if order is not None:
+            continue
+        anchored = set(plan.item_start_re.findall(html))
+        stray = set(plan.product_no_re.findall(html)) - anchored
+        if not stray:
+            reason = "no products on the page"
+        elif not anchored:
+            reason = "no anchored items"
+        else:
+            reason = "product_no outside the anchored items"
+        fallbacks.append((url, html, reason))
+
+    print(f"pages: {len(pages)}  parsed whole: {len(fallbacks)} "
+          f"({len(fallbacks) / max(len(pages), 1):.1%})  repeat: {repeat}")
+    for reason, count in Counter(reason for _, _, reason in fallbacks).most_common():
+        print(f"  {count:5d}  {reason}")
+    for url, _, reason in fallbacks[:show]:
+        print(f"  {url}  ({reason})")
+    if len(fallbacks) > show:
+        print(f"  ... {len(fallbacks) - show} more")
+
+    htmls = [html for _, html in pages]
+
+    def whole():
+        for html in htmls:
+            _parse_products_from_page(html, "NEW")
+
+    def two_phase():
+        seen = {}
+        for html in htmls:
+            _parse_products_from_page(html, "NEW", seen=seen)
+
+    def fallback_pages():
+        for _, html, _ in fallbacks:
+            _parse_products_from_page(html, "NEW")
+
+    whole_best = min(_time_runs(whole, repeat))
+    two_phase_best = min(_time_runs(two_phase, repeat))
+    print(f" whole pages: {whole_best * 1000:.1f} ms per check")
+    print(f"   two-phase: {two_phase_best * 1000:.1f} ms per check, "
+          f"speedup {whole_best / two_phase_best:.2f}x")
+    if fallbacks:
+        spent = min(_time_runs(fallback_pages, repeat))
+        print(f"   of which parsing the fallback pages whole: {spent * 1000:.1f} ms "
+              f"({spent / two_phase_best:.0%})")
+
+
+def bench_parse_pool(pages: List[str], repeat: int, max_workers: int = 0) -> None:
+    """
+    Pages per second parsed in 1..N worker processes (all pages in flight at
+    once) against parsing them in-process, plus the size of the results
+    sent back (``Product.to_row`` tuples vs pickled ``Product`` objects).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    empty = frozenset()
+
+    def serial():
+        for html in pages:
+            _parse_page_rows(html, "NEW", MEDICUBE, empty)
+
+    runs = _time_runs(serial, repeat)
+    base = min(runs)
+    print(f"pages: {len(pages)}  cores: {os.cpu_count()}  repeat: {repeat}")
+    print(f"{'in-process':>12}: {base * 1000:7.1f} ms  {len(pages) / base:6.1f} pages/s")
+
+    for workers in range(1, max_workers + 1):
+        parse_pool.configure(workers)
+        started = time.perf_counter()
+        parse_pool.submit(pages[0], "NEW", MEDICUBE, empty).result()
+        warmup = time.perf_counter() - started
+
+        def pooled():
+            futures = [parse_pool.submit(html, "NEW", MEDICUBE, empty) for html in pages]
+            for future in futures:
+                future.result()
+
+        best = min(_time_runs(pooled, repeat))
+        print(f"{workers:>3} workers: {best * 1000:7.1f} ms  {len(pages) / best:6.1f} pages/s  "
+              f"speedup {base / best:4.2f}x  (pool start {warmup * 1000:.0f} ms)")
+    parse_pool.shutdown()
+
+    _, rows = _parse_page_rows(pages[0], "NEW", MEDICUBE, empty)
+    objects = list(_parse_products_from_page(pages[0], "NEW").values())
+    print(f"result size per page: {len(pickle.dumps(rows))} B as rows, "
+          f"{len(pickle.dumps(objects))} B as Product objects")
+
+
+def bench_convert(pages: List[str], repeat: int, copies: int = 50) -> None:
+    """
+    Converting every product price to UAH: the old per-product path (regex
+    parse of the KRW string + convert + format) vs one ``convert_many`` call
+    on integer KRW.
+    """
+    import currency
+
+    prices = [p.price_krw for html in pages
+              for p in _parse_products_from_page(html, "NEW").values()] * copies
+    strings = [currency.format_krw(p) if p is not None else "" for p in prices]
+
+    def per_product():
+        for price in strings:
+            currency.convert_price(price, rate=EXCHANGE_RATE)
+
+    def batch():
+        currency.convert_many(prices, EXCHANGE_RATE)
+
+    backend = "numpy" if currency._get_numpy() is not None else "pure Python (numpy not installed)"
+    print(f"prices: {len(prices)}  repeat: {repeat}  batch backend: {backend}")
+    for label, fn in (("per-product strings", per_product), ("convert_many", batch)):
+        best = min(_time_runs(fn, repeat))
+        print(f"{label:>20}: {best * 1000:7.2f} ms  ({best / len(prices) * 1e9:6.0f} ns per price)")
+
+
+def bench_rates(repeat: int, days: int = 3 * 365, rows: int = 100_000) -> None:
+    """As-of conversion of a price-history column against a multi-year daily rate table."""
+    import random
+    from datetime import date
+
+    import rate_history
+
+    first = 739000
+    with tempfile.TemporaryDirectory(prefix="medicube-rates-") as tmp:
+        table = rate_history.RateTable(os.path.join(tmp, rate_history.RATE_HISTORY_FILENAME))
+    series = table.series["UAH"] = rate_history.RateSeries()
+    for day in range(first, first + days):
+        series.set(day, EXCHANGE_RATE * (1 + random.uniform(-0.05, 0.05)))
+    amounts = [random.randrange(5_000, 300_000, 100) for _ in range(rows)]
+    when = [date.fromordinal(random.randrange(first, first + days)) for _ in range(rows)]
+
+    best = min(_time_runs(lambda: table.convert_column(amounts, when), repeat))
+    backend = "numpy" if rate_history._get_numpy() is not None else "bisect"
+    print(f"series: {days} days  rows: {rows}  lookup: {backend}  repeat: {repeat}")
+    print(f"convert_column: {best * 1000:.1f} ms ({best / rows * 1e9:.0f} ns per row)")
+
+
+class _SlowStream:
+    """File stream wrapper adding a fixed latency per write (a slow or network disk)."""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text):
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def bench_logging(repeat: int, pages: int = 500, lines_per_page: int = 3) -> None:
+    """
+    Time the scrape loop spends in logging per page with --verbose: a plain
+    FileHandler + console (the old setup) vs the queued pipeline (logs.py),
+    on the local disk and with 0.2 ms of added write latency. Console output
+    goes to /dev/null so only the logging cost is measured.
+    """
+    import logging
+    import logs
+
+    log = logging.getLogger("scraper")
+    root = logging.getLogger()
+    saved_handlers, saved_level, saved_stdout = root.handlers[:], root.level, sys.stdout
+
+    def loop():
+        for page in range(pages):
+            for line in range(lines_per_page):
+                log.debug("[medicube] Category 51 page %d: %d products (%d new)", page, 40, line)
+
+    def direct(tmp):
+        formatter = logging.Formatter(logs.LOG_FORMAT)
+        handlers = [logging.StreamHandler(sys.stdout),
+                    logging.FileHandler(os.path.join(tmp, "direct.log"), encoding="utf-8")]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+            root.addHandler(handler)
+        root.setLevel(logging.DEBUG)
+        return handlers[1], lambda: [h.close() for h in handlers]
+
+    def queued(tmp):
+        listener = logs.setup(tmp, verbose=True)
+        return listener.handlers[1], logs.stop
+
+    print(f"pages: {pages}  lines per page: {lines_per_page}  repeat: {repeat}")
+    with tempfile.TemporaryDirectory(prefix="medicube-logging-") as tmp, \
+            open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            for latency in (0, 0.0002):
+                for label, build in (("direct FileHandler", direct), ("queued (logs.py)", queued)):
+                    for handler in root.handlers[:]:
+                        root.removeHandler(handler)
+                    file_handler, close = build(tmp)
+                    if latency:
+                        file_handler.stream = _SlowStream(file_handler.stream, latency)
+                    best = min(_time_runs(loop, repeat))
+                    close()
+                    disk = f"+{latency * 1000:.1f} ms/write" if latency else "local disk"
+                    print(f"{label:>20} ({disk}): {best / pages * 1e6:8.1f} µs per page in the caller",
+                          file=saved_stdout)
+        finally:
+            sys.stdout = saved_stdout
+            for handler in root.handlers[:]:
+                root.removeHandler(handler)
+            for handler in saved_handlers:
+                root.addHandler(handler)
+            root.setLevel(saved_level)
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# A cron --check --if-due that is not due yet: import, parse args, read config, exit
+_NOT_DUE_RUN = """
+import sys, time
+import monitor
+from storage import ProductStorage
+monitor.DATA_DIR = sys.argv[1]
+ProductStorage(sys.argv[1]).set_next_due(["medicube"], time.time() + 3600)
+sys.argv = ["monitor.py", "--check", "--if-due"]
+monitor.main()
+"""
+
+
+def _importtime(code: str, *args: str) -> Dict[str, tuple]:
+    """Run ``code`` in a fresh interpreter with -X importtime; {module: (self_us, cumulative_us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue    # header line
+    return modules
+
+
+def bench_startup(repeat: int, top: int = 10) -> None:
+    """Cold-start cost of ``monitor.py --check --if-due`` when no check is due (the common cron case)."""
+    import_us = []
+    for _ in range(repeat):
+        import_us.append(_importtime("import monitor")["monitor"][1])
+
+    walls = []
+    with tempfile.TemporaryDirectory(prefix="medicube-startup-") as tmp:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", _NOT_DUE_RUN, tmp], cwd=HERE,
+                           capture_output=True, check=True)
+            walls.append(time.perf_counter() - started)
+        modules = _importtime(_NOT_DUE_RUN, tmp)
+
+    print(f"import monitor: best {min(import_us) / 1000:.1f} ms, "
+          f"median {statistics.median(import_us) / 1000:.1f} ms")
+    print(f"not-due --check --if-due process: best {min(walls) * 1000:.0f} ms, "
+          f"median {statistics.median(walls) * 1000:.0f} ms (interpreter included)")
+    heavy = [m for m in ("requests", "bs4", "soupsieve", "numpy", "scraper",
+                         "telegram_bot", "http.server")
+             if m in modules]
+    print(f"heavy modules loaded on the not-due path: {', '.join(heavy) or 'none'}")
+    print(f"top {top} imports by self time:")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda kv: -kv[1][0])[:top]:
+        print(f"  {self_us / 1000:7.2f} ms  (cumulative {cumulative_us / 1000:7.2f} ms)  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medicube monitor benchmarks")
+    parser.add_argument("bench", choices=["parse", "parse-pool", "fallback", "startup", "convert",
+                                          "rates", "logging"])
+    parser.add_argument("--replay", metavar="DIR", help="Use pages from a --record archive")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="parse-pool: scale up to this many processes (default: all cores)")
+    args = parser.parse_args()
+
+    if args.bench == "parse":
+        bench_parse(load_pages(args.replay), args.repeat)
+    elif args.bench == "parse-pool":
+        bench_parse_pool(load_pages(args.replay), args.repeat, args.workers)
+    elif args.bench == "fallback":
+        if not args.replay:
+            parser.error("fallback needs recorded pages (--replay DIR)")
+        bench_fallback(load_archive(args.replay), args.repeat)
+    elif args.bench == "startup":
+        bench_startup(args.repeat)
+    elif args.bench == "convert":
+        bench_convert(load_pages(args.replay), args.repeat)
+    elif args.bench == "rates":
+        bench_rates(args.repeat)
+    elif args.bench == "logging":
+        bench_logging(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,164 @@
 """
 Currency conversion module.
 Fetches live KRW → UAH exchange rate and converts prices.
+
+Prices are kept as integer KRW; conversion to UAH happens only when a
+message is rendered, for all rendered products at once (``convert_many``,
+vectorized with NumPy when it is installed).
+
+One provider response carries the rates for every currency, so any display
+currency (``RateSnapshot.rate_for``) costs no extra request.
 """
 
 import re
 import logging
+import threading
+import time
 import requests
-from typing import Optional, Tuple
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import metrics
 
 logger = logging.getLogger(__name__)
 
+_NON_PRICE_CHARS = re.compile(r"[^\d,]")
+
+DEFAULT_CURRENCY = "UAH"
+
+# Display format per currency ({} is the number); others get "{} CODE"
+_CURRENCY_FORMATS = {"USD": "${}", "EUR": "€{}", "GBP": "£{}", "PLN": "{} zł"}
+
+# Below this many prices a plain loop beats building an array
+NUMPY_MIN_BATCH = 64
+
 # Fallback rate in case all APIs fail (will be stale but better than nothing)
 _FALLBACK_RATE: Optional[float] = None
 
 
+# NumPy is optional and only imported once a batch is big enough to use it
+_numpy = None
+
+
+def _get_numpy():
+    """The numpy module, or None if it isn't installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class RateSnapshot:
+    """
+    One fetched KRW → UAH rate. ``rate_id`` identifies it in storage, so a
+    stored price can be tied to the rate of the day it was first seen.
+
+    ``rates`` keeps every KRW → currency rate of the provider response (not
+    just UAH) and ``as_of`` the provider's own update time, for the
+    historical rate table (see ``rate_history``).
+    """
+
+    def __init__(self, rate: float, source: str, fetched_at: Optional[float] = None,
+                 rates: Optional[Dict[str, float]] = None, as_of: Optional[float] = None):
+        self.rate = rate
+        self.source = source
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.rates = dict(rates or {})
+        self.rates.setdefault("UAH", rate)
+        self.as_of = as_of if as_of is not None else self.fetched_at
+        stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(self.fetched_at))
+        self.rate_id = f"{source}:{stamp}"
+
+    def rate_for(self, currency: str) -> Optional[float]:
+        """KRW → ``currency`` rate from the same provider response, or None if it had none."""
+        if currency == "KRW":
+            return 1.0
+        return self.rates.get(currency)
+
+    def to_dict(self) -> dict:
+        return {"pair": "KRW/UAH", "rate": self.rate, "source": self.source,
+                "fetched_at": self.fetched_at}
+
+    def __repr__(self):
+        return f"RateSnapshot({self.rate_id}: 1 KRW = {self.rate} UAH)"
+
+
+class LazyRate:
+    """
+    A rate snapshot fetched on first use and then shared (thread-safe), so
+    a check that renders nothing makes no exchange-rate request at all.
+    """
+
+    def __init__(self, fetch: Callable[[], RateSnapshot]):
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._snapshot: Optional[RateSnapshot] = None
+
+    def get(self) -> RateSnapshot:
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._fetch()
+            return self._snapshot
+
+
+def get_rate_snapshot() -> RateSnapshot:
+    """Fetch the current KRW → UAH rate together with where it came from."""
+    return _fetch_snapshot()
+
+
 def get_krw_to_uah_rate() -> float:
     """
     Fetch the current KRW → UAH exchange rate from public APIs.
     Tries multiple sources for reliability.
     Returns rate as float (e.g. 0.0295 means 1 KRW = 0.0295 UAH).
     """
+    return _fetch_snapshot().rate
+
+
+def _fetch_snapshot() -> RateSnapshot:
     global _FALLBACK_RATE
 
     # Source 1: exchangerate-api.com (free, no key needed)
     try:
+        metrics.count_request("https://api.exchangerate-api.com/v4/latest/KRW")
         resp = requests.get(
             "https://api.exchangerate-api.com/v4/latest/KRW",
             timeout=10,
         )
         resp.raise_for_status()
-        rate = resp.json()["rates"]["UAH"]
+        data = resp.json()
+        rate = data["rates"]["UAH"]
         logger.info(f"Exchange rate (exchangerate-api): 1 KRW = {rate} UAH")
         _FALLBACK_RATE = rate
-        return rate
+        return RateSnapshot(rate, "exchangerate-api", rates=data["rates"],
+                            as_of=data.get("time_last_updated"))
     except Exception as e:
         logger.warning(f"exchangerate-api.com failed: {e}")
 
     # Source 2: open.er-api.com (free, no key needed)
     try:
+        metrics.count_request("https://open.er-api.com/v6/latest/KRW")
         resp = requests.get(
             "https://open.er-api.com/v6/latest/KRW",
             timeout=10,
         )
         resp.raise_for_status()
-        rate = resp.json()["rates"]["UAH"]
+        data = resp.json()
+        rate = data["rates"]["UAH"]
         logger.info(f"Exchange rate (open.er-api): 1 KRW = {rate} UAH")
         _FALLBACK_RATE = rate
-        return rate
+        return RateSnapshot(rate, "open.er-api", rates=data["rates"],
+                            as_of=data.get("time_last_update_unix"))
     except Exception as e:
         logger.warning(f"open.er-api.com failed: {e}")
 
     # Source 3: via USD as intermediate (frankfurter.app - ECB data)
     try:
+        metrics.count_request("https://api.frankfurter.app/latest?from=KRW&to=UAH")
         resp = requests.get(
             "https://api.frankfurter.app/latest?from=KRW&to=UAH",
             timeout=10,
@@ -62,19 +169,24 @@ def get_krw_to_uah_rate() -> float:
         if rate:
             logger.info(f"Exchange rate (frankfurter): 1 KRW = {rate} UAH")
             _FALLBACK_RATE = rate
-            return rate
+            as_of = None
+            if data.get("date"):
+                as_of = datetime.strptime(data["date"], "%Y-%m-%d").replace(
+                    tzinfo=timezone.utc).timestamp()
+            return RateSnapshot(rate, "frankfurter", rates=data["rates"], as_of=as_of)
     except Exception as e:
         logger.warning(f"frankfurter.app failed: {e}")
 
     # Fallback: use last known rate or a hardcoded approximate
+    metrics.ERRORS.inc(kind="exchange_rate")
     if _FALLBACK_RATE:
         logger.warning(f"Using cached fallback rate: 1 KRW = {_FALLBACK_RATE} UAH")
-        return _FALLBACK_RATE
+        return RateSnapshot(_FALLBACK_RATE, "cached")
 
     # Last resort: approximate rate (updated Feb 2026)
     fallback = 0.03
     logger.warning(f"All APIs failed! Using hardcoded fallback: 1 KRW = {fallback} UAH")
-    return fallback
+    return RateSnapshot(fallback, "fallback")
 
 
 def parse_krw_price(price_str: str) -> Optional[int]:
@@ -85,7 +197,7 @@ def parse_krw_price(price_str: str) -> Optional[int]:
     if not price_str:
         return None
     # Remove everything except digits and commas, then strip commas
-    cleaned = re.sub(r"[^\d,]", "", price_str)
+    cleaned = _NON_PRICE_CHARS.sub("", price_str)
     cleaned = cleaned.replace(",", "")
     if cleaned:
         try:
@@ -100,6 +212,25 @@ def krw_to_uah(price_krw: int, rate: float) -> float:
     return round(price_krw * rate, 2)
 
 
+def convert_many(amounts_krw: Sequence[Optional[int]], rate: float) -> List[Optional[float]]:
+    """
+    Convert many KRW amounts to UAH in one pass (None stays None).
+    Same rounding as ``krw_to_uah``.
+    """
+    numpy = _get_numpy() if len(amounts_krw) >= NUMPY_MIN_BATCH else None
+    if numpy is None:
+        return [None if a is None else round(a * rate, 2) for a in amounts_krw]
+    values = numpy.fromiter((0 if a is None else a for a in amounts_krw),
+                            dtype=numpy.int64, count=len(amounts_krw))
+    converted = numpy.round(values * rate, 2).tolist()
+    return [None if a is None else c for a, c in zip(amounts_krw, converted)]
+
+
+def format_krw(amount: int) -> str:
+    """Format a KRW amount the way the store shows it: '329,000원'."""
+    return f"{amount:,}원"
+
+
 def format_uah(amount: float) -> str:
     """Format UAH amount nicely: '1 234.50 грн'."""
     if amount >= 1000:
@@ -116,6 +247,16 @@ def format_uah(amount: float) -> str:
         return f"{amount:.2f} грн"
 
 
+def format_amount(amount: float, currency: str = DEFAULT_CURRENCY) -> str:
+    """Format an amount for display: '1 234.50 грн', '$12.34', '56.78 zł'."""
+    if currency == DEFAULT_CURRENCY:
+        return format_uah(amount)
+    if currency == "KRW":
+        return format_krw(int(amount))
+    number = f"{amount:,.2f}".replace(",", " ")
+    return _CURRENCY_FORMATS.get(currency, "{} " + currency).format(number)
+
+
 def convert_price(price_str: str, rate: Optional[float] = None) -> Tuple[str, str]:
     """
     Convert a KRW price string to UAH.
@@ -0,0 +1,172 @@
+"""
+Append-only check history with incremental rollups.
+
+Each check appends one compact JSON line to ``check_history.jsonl``; when
+the file passes ``MAX_SEGMENT_BYTES`` it is rotated into a numbered,
+gzip-compressed segment (``check_history.1.jsonl.gz``, ...), so the full
+history is kept at O(1) cost per check.
+
+``check_summary.json`` holds the last entry plus daily and weekly rollups
+(checks, failures, new products, check durations), updated on every append,
+so ``last()`` and the status view never read the log itself.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from locking import FileLock, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILENAME = "check_history.jsonl"
+SUMMARY_FILENAME = "check_summary.json"
+LEGACY_FILENAME = "check_history.json"
+MAX_SEGMENT_BYTES = 1024 * 1024
+DAILY_KEEP = 92     # days of daily rollups kept in the summary (weekly ones are kept)
+
+_SEGMENT_RE = re.compile(r"^check_history\.(\d+)\.jsonl\.gz$")
+
+
+def _empty_rollup() -> dict:
+    return {"checks": 0, "failures": 0, "new_products": 0,
+            "duration_s": 0.0, "max_duration_s": 0.0}
+
+
+def _add_to_rollup(rollup: dict, entry: dict) -> None:
+    rollup["checks"] += 1
+    if entry.get("error"):
+        rollup["failures"] += 1
+    rollup["new_products"] += entry.get("new_count", 0)
+    duration = entry.get("duration_s")
+    if duration is not None:
+        rollup["duration_s"] = round(rollup["duration_s"] + duration, 3)
+        rollup["max_duration_s"] = max(rollup["max_duration_s"], duration)
+
+
+def period_keys(timestamp: str) -> tuple:
+    """(day, ISO week) keys of an entry timestamp, e.g. ('2026-10-19', '2026-W43')."""
+    when = datetime.fromisoformat(timestamp)
+    year, week, _ = when.isocalendar()
+    return when.date().isoformat(), f"{year}-W{week:02d}"
+
+
+class CheckHistory:
+    """Check log and rollups of one store directory; writes hold the store's file lock."""
+
+    def __init__(self, directory: str, lock: FileLock):
+        self.directory = directory
+        self.log_file = os.path.join(directory, HISTORY_FILENAME)
+        self.summary_file = os.path.join(directory, SUMMARY_FILENAME)
+        self.legacy_file = os.path.join(directory, LEGACY_FILENAME)
+        self._lock = lock
+
+    # --- Writing ---
+
+    def append(self, entry: dict) -> None:
+        """Append one check entry and fold it into the rollups."""
+        with self._lock:
+            self._migrate_legacy()
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+                size = f.tell()
+            if size >= MAX_SEGMENT_BYTES:
+                self._rotate()
+            summary = self.summary()
+            self._fold(summary, entry)
+            write_json_atomic(self.summary_file, summary, ensure_ascii=False, indent=1)
+
+    def _fold(self, summary: dict, entry: dict) -> None:
+        day, week = period_keys(entry["timestamp"])
+        _add_to_rollup(summary["daily"].setdefault(day, _empty_rollup()), entry)
+        _add_to_rollup(summary["weekly"].setdefault(week, _empty_rollup()), entry)
+        summary["last"] = entry
+        summary["total_checks"] = summary.get("total_checks", 0) + 1
+        for old_day in sorted(summary["daily"])[:-DAILY_KEEP]:
+            del summary["daily"][old_day]
+
+    def _segments(self) -> List[str]:
+        """Rotated segment paths, oldest first."""
+        numbered = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_RE.match(name)
+            if match:
+                numbered.append((int(match.group(1)), name))
+        return [os.path.join(self.directory, name) for _, name in sorted(numbered)]
+
+    def _rotate(self) -> None:
+        segments = self._segments()
+        number = int(_SEGMENT_RE.match(os.path.basename(segments[-1])).group(1)) + 1 if segments else 1
+        target = os.path.join(self.directory, f"check_history.{number}.jsonl.gz")
+        tmp = target + ".tmp"
+        with open(self.log_file, "rb") as src, gzip.open(tmp, "wb") as dst:
+            dst.write(src.read())
+        os.replace(tmp, target)
+        os.remove(self.log_file)
+        logger.debug(f"Rotated check history into {os.path.basename(target)}")
+
+    def _migrate_legacy(self) -> None:
+        """Move entries of the old whole-file JSON history into the log (once)."""
+        if not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.error(f"Error loading legacy history, leaving it in place: {e}")
+            return
+        summary = self.summary()
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+                self._fold(summary, entry)
+        write_json_atomic(self.summary_file, summary, ensure_ascii=False, indent=1)
+        os.replace(self.legacy_file, self.legacy_file + ".bak")
+        logger.info(f"Migrated {len(entries)} history entries to {HISTORY_FILENAME}")
+
+    # --- Reading ---
+
+    def summary(self) -> dict:
+        try:
+            with open(self.summary_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"last": None, "total_checks": 0, "daily": {}, "weekly": {}}
+
+    def last(self) -> Optional[dict]:
+        """Most recent entry (from the summary, not the log)."""
+        last = self.summary().get("last")
+        if last is None and os.path.exists(self.legacy_file):
+            with self._lock:
+                self._migrate_legacy()
+            last = self.summary().get("last")
+        return last
+
+    def rollups(self, period: str = "daily") -> Dict[str, dict]:
+        """{day or week: rollup} - ``period`` is 'daily' or 'weekly'."""
+        return self.summary().get(period, {})
+
+    def entries(self) -> Iterator[dict]:
+        """Every entry ever logged, oldest first (reads all segments)."""
+        for path in self._segments():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+        if os.path.exists(self.log_file):
+            with open(self.log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def rebuild_summary(self) -> dict:
+        """Recompute the rollups from the full log (e.g. after editing it by hand)."""
+        with self._lock:
+            summary = {"last": None, "total_checks": 0, "daily": {}, "weekly": {}}
+            for entry in self.entries():
+                self._fold(summary, entry)
+            write_json_atomic(self.summary_file, summary, ensure_ascii=False, indent=1)
+        return summary
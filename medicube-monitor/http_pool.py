@@ -0,0 +1,100 @@
+"""
+Per-host HTTP connection pools with rate-limit budgets.
+
+Each host gets its own ``requests.Session`` (keep-alive connection pool),
+a cap on concurrent requests and a minimum interval between request starts.
+Stores on different hosts can therefore be scraped in parallel while each
+individual site still sees a polite, sequential-looking request rate.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 2
+DEFAULT_MIN_INTERVAL = 0.5
+
+
+class HostClient:
+    """Pooled session + request budget for a single host."""
+
+    def __init__(self, host: str, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 min_interval: float = DEFAULT_MIN_INTERVAL):
+        self.host = host
+        self.max_connections = max_connections
+        self.min_interval = min_interval
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _wait_turn(self) -> None:
+        """Block until this host's rate-limit budget allows another request."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        with self._slots:
+            self._wait_turn()
+            return self.session.get(url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[str, HostClient] = {}
+_clients_lock = threading.Lock()
+
+
+def configure_host(host: str, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                   min_interval: float = DEFAULT_MIN_INTERVAL) -> HostClient:
+    """Create (or replace) the client for a host with the given budget."""
+    with _clients_lock:
+        old = _clients.get(host)
+        if (old is not None and old.max_connections == max_connections
+                and old.min_interval == min_interval):
+            return old
+        client = HostClient(host, max_connections, min_interval)
+        _clients[host] = client
+    if old is not None:
+        old.close()
+    return client
+
+
+def client_for(url: str) -> HostClient:
+    """Return the client for the URL's host, creating one with defaults if needed."""
+    host = urlsplit(url).hostname or ""
+    with _clients_lock:
+        client = _clients.get(host)
+        if client is None:
+            client = _clients[host] = HostClient(host)
+    return client
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET through the per-host pool and rate limiter."""
+    return client_for(url).get(url, **kwargs)
+
+
+def close_all() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
@@ -0,0 +1,261 @@
+"""
+Cross-process coordination for the shared data directory.
+
+Two layers:
+
+* ``file_lock(path)`` - an exclusive ``fcntl.flock`` lock, re-entrant within
+  the process (threads share one lock per path). ``ProductStorage`` holds
+  it around every read-modify-write, so concurrent runs never lose updates.
+
+* ``CheckLease`` / ``single_flight`` - at most one check runs per data
+  directory. The lease file records pid, host, run ID and a heartbeat; a
+  lease whose process is gone or whose heartbeat is older than
+  ``stale_after`` is considered stale and taken over. In single-flight mode
+  a second invocation for the same stores waits for the running check and
+  returns its published result instead of scraping again; if that check
+  failed, the waiter runs the check itself.
+
+On platforms without fcntl the file locks degrade to in-process locks.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LEASE_FILENAME = "check.lease"
+RESULT_FILENAME = "check.result"
+LOCK_SUFFIX = ".lock"
+DEFAULT_STALE_AFTER = 15 * 60   # seconds without a heartbeat
+HEARTBEAT_INTERVAL = 30
+POLL_INTERVAL = 1.0
+# (os.uname instead of socket/platform: this module is on the cron cold-start path)
+HOSTNAME = os.uname().nodename if hasattr(os, "uname") else os.environ.get("COMPUTERNAME", "")
+
+
+class LockTimeout(Exception):
+    """The lock could not be acquired in time."""
+
+
+class FileLock:
+    """Exclusive advisory lock on ``path``; re-entrant and shared by all threads of the process."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise LockTimeout(self.path)
+        try:
+            if self._depth == 0 and fcntl is not None:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    while True:
+                        try:
+                            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                            break
+                        except BlockingIOError:
+                            if deadline is not None and time.monotonic() >= deadline:
+                                raise LockTimeout(self.path)
+                            time.sleep(0.05)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self._fd = fd
+            self._depth += 1
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+_locks: Dict[str, FileLock] = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(path: str) -> FileLock:
+    """The process-wide lock object for ``path`` (the lock file itself is ``path``)."""
+    path = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = FileLock(path)
+        return lock
+
+
+def write_json_atomic(path: str, data, **dump_kwargs) -> None:
+    """Write JSON to a temp file and rename it over ``path`` (readers never see a torn file)."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# --- Check lease ---
+
+class CheckLease:
+    """The right to run a check against a data directory, kept alive by a heartbeat thread."""
+
+    def __init__(self, data_dir: str, key: str, stale_after: float = DEFAULT_STALE_AFTER):
+        self.data_dir = data_dir
+        self.key = key
+        self.stale_after = stale_after
+        self.run_id = os.urandom(6).hex()
+        self.path = os.path.join(data_dir, LEASE_FILENAME)
+        self._lock = file_lock(self.path + LOCK_SUFFIX)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _record(self) -> dict:
+        now = time.time()
+        return {"run_id": self.run_id, "key": self.key, "pid": os.getpid(),
+                "host": HOSTNAME, "started": now, "heartbeat": now}
+
+    def is_stale(self, lease: dict) -> bool:
+        if time.time() - lease.get("heartbeat", 0) > self.stale_after:
+            return True
+        if lease.get("host") == HOSTNAME and not _pid_alive(lease.get("pid", 0)):
+            return True
+        return False
+
+    def try_acquire(self) -> Optional[dict]:
+        """Take the lease. Returns None on success, or the holder's lease record."""
+        with self._lock:
+            current = _read_json(self.path)
+            if current and current.get("run_id") != self.run_id:
+                if not self.is_stale(current):
+                    return current
+                logger.warning(
+                    f"Taking over stale check lease {current.get('run_id')} "
+                    f"(pid {current.get('pid')} on {current.get('host')})"
+                )
+            write_json_atomic(self.path, self._record())
+        self._thread = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+        self._thread.start()
+        return None
+
+    def _heartbeat(self) -> None:
+        interval = min(HEARTBEAT_INTERVAL, self.stale_after / 4)
+        while not self._stop.wait(interval):
+            with self._lock:
+                current = _read_json(self.path)
+                if not current or current.get("run_id") != self.run_id:
+                    logger.error("Check lease was taken over by another process")
+                    return
+                current["heartbeat"] = time.time()
+                write_json_atomic(self.path, current)
+
+    def release(self, result=None, ok: bool = True) -> None:
+        """Publish the result (or a failure) for waiters and give the lease up."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            write_json_atomic(os.path.join(self.data_dir, RESULT_FILENAME), {
+                "run_id": self.run_id, "key": self.key, "ok": ok,
+                "finished": time.time(), "result": result,
+            })
+            current = _read_json(self.path)
+            if current and current.get("run_id") == self.run_id:
+                os.remove(self.path)
+
+
+def read_result(data_dir: str) -> Optional[dict]:
+    return _read_json(os.path.join(data_dir, RESULT_FILENAME))
+
+
+def single_flight(data_dir: str, key: str, run: Callable[[], object],
+                  wait_timeout: float = 2 * 3600,
+                  stale_after: float = DEFAULT_STALE_AFTER) -> Tuple[object, bool]:
+    """
+    Run ``run()`` under the data directory's check lease.
+
+    If another process holds the lease for the same ``key``, wait for it and
+    return its result instead (``attached`` is True). A lease for a different
+    key is waited out and then this check runs, as is one that fails (a
+    failed check publishes ``ok: False``, never a result to attach to).
+    Returns (result, attached).
+    """
+    lease = CheckLease(data_dir, key, stale_after)
+    waited_for = None
+    deadline = time.monotonic() + wait_timeout
+    while True:
+        if waited_for is not None and waited_for.get("key") == key:
+            published = read_result(data_dir)
+            if published and published.get("run_id") == waited_for["run_id"]:
+                if not published.get("ok", True):
+                    logger.warning(
+                        f"Check {waited_for['run_id']} failed, running the check here"
+                    )
+                    waited_for = None
+                    continue
+                logger.info(
+                    f"Attached to check {waited_for['run_id']}: result {published.get('result')}"
+                )
+                return published.get("result"), True
+
+        holder = lease.try_acquire()
+        if holder is None:
+            break
+        if waited_for is None or holder["run_id"] != waited_for["run_id"]:
+            waited_for = holder
+            logger.info(
+                f"Check {holder['run_id']} is already running (pid {holder['pid']}), waiting..."
+            )
+        if time.monotonic() >= deadline:
+            raise LockTimeout(f"check {holder['run_id']} still running after {wait_timeout}s")
+        time.sleep(POLL_INTERVAL)
+
+    try:
+        outcome = run()
+    except BaseException:
+        lease.release(ok=False)
+        raise
+    lease.release(outcome)
+    return outcome, False
@@ -0,0 +1,164 @@
+"""
+Non-blocking logging pipeline.
+
+Log calls only put the record on an in-memory queue (``QueueHandler``); a
+``QueueListener`` thread does the formatting and the console/file I/O, so
+the check path never waits on disk. ``monitor.log`` is rotated by size (or
+at midnight) and rotated files are gzip-compressed on a background thread.
+With ``json_format`` the file gets one JSON object per line.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+LOG_FILENAME = "monitor.log"
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+ROTATIONS = ("size", "midnight")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_compressions: List[threading.Thread] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, thread, msg (+ exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Cheaper ``prepare``: resolve the message in the caller (args may be
+    mutable) but skip the stock copy-and-format; this is the only root
+    handler, so the record isn't shared with anyone else.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _compress(source: str, dest: str) -> None:
+    tmp = dest + ".tmp"
+    with open(source, "rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, dest)
+    os.remove(source)
+
+
+def _namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _wait_for_compressions() -> None:
+    while _compressions:
+        _compressions.pop().join()
+
+
+def _rotator(source: str, dest: str) -> None:
+    """Move the full log aside at once; gzip it into ``dest`` on a background thread."""
+    raw = dest[:-len(".gz")]
+    os.replace(source, raw)
+    thread = threading.Thread(target=_compress, args=(raw, dest), name="log-compress", daemon=True)
+    _compressions.append(thread)
+    thread.start()
+
+
+class _CompressedRollover:
+    """
+    Finish gzipping the previous rotated file before a rollover shifts the
+    ``.N.gz`` backups (or deletes the oldest dated one): until then it is
+    still the raw file and would be skipped. Only ever waits when rotating
+    faster than gzip; this runs on the listener thread.
+    """
+
+    def doRollover(self) -> None:
+        _wait_for_compressions()
+        super().doRollover()
+
+
+class _RotatingFileHandler(_CompressedRollover, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class _TimedRotatingFileHandler(_CompressedRollover, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+
+def file_handler(path: str, rotation: str = "size", max_bytes: int = MAX_BYTES,
+                 backup_count: int = BACKUP_COUNT) -> logging.Handler:
+    """Rotating file handler whose rotated files end up as ``<name>.N.gz`` / ``<name>.<date>.gz``."""
+    if rotation == "midnight":
+        handler = _TimedRotatingFileHandler(
+            path, when="midnight", backupCount=backup_count, encoding="utf-8")
+    else:
+        handler = _RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    handler.namer = _namer
+    handler.rotator = _rotator
+    return handler
+
+
+def setup(log_dir: str, verbose: bool = False, json_format: bool = False,
+          rotation: str = "size") -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to the console and ``log_dir/monitor.log``.
+    Records are flushed and pending compressions finished at exit.
+    """
+    global _listener
+    stop()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    logfile = file_handler(os.path.join(log_dir, LOG_FILENAME), rotation)
+    logfile.setFormatter(JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+    _listener = logging.handlers.QueueListener(log_queue, console, logfile)
+    _listener.start()
+    return _listener
+
+
+def stop() -> None:
+    """Drain the queue, close the handlers and wait for background compression."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    _wait_for_compressions()
+
+
+atexit.register(stop)
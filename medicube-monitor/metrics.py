@@ -0,0 +1,217 @@
+"""
+Prometheus-style metrics for the monitor daemon.
+
+Metrics are plain in-process counters/gauges/histograms guarded by a lock,
+so recording them from the check path is just an increment. The optional
+HTTP endpoint (``start_server``) renders them in the Prometheus text
+exposition format from a background daemon thread.
+"""
+
+import logging
+import threading
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9108
+
+# Buckets in seconds
+CHECK_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        if not items:
+            return [f"{self.name} 0"]
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        if not items:
+            return [f"{self.name} 0"]
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += 1
+            data[-1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = []
+        for key, data in items:
+            for bound, count in zip(self.buckets, data):
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {data[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {data[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(round(data[-1], 6))}")
+        return lines
+
+
+# --- Registry ---
+
+CHECK_DURATION = Histogram(
+    "medicube_check_duration_seconds", "Duration of a full product check", CHECK_BUCKETS)
+CHECKS = Counter("medicube_checks_total", "Completed product checks")
+PRODUCTS_SCRAPED = Counter(
+    "medicube_products_scraped_total", "Unique products scraped across all checks")
+PRODUCTS_LAST_CHECK = Gauge(
+    "medicube_products_last_check", "Unique products found by the last check")
+NEW_PRODUCTS = Counter("medicube_new_products_total", "New products detected")
+HTTP_REQUESTS = Counter("medicube_http_requests_total", "Outgoing HTTP requests by host")
+ERRORS = Counter("medicube_errors_total", "Errors by kind")
+TELEGRAM_SEND = Histogram(
+    "medicube_telegram_send_seconds", "Telegram sendMessage latency", LATENCY_BUCKETS)
+QUEUE_DEPTH = Gauge("medicube_notification_queue_depth", "Alerts waiting to be sent")
+EXCHANGE_RATE = Gauge("medicube_exchange_rate", "Current exchange rate used for conversion")
+
+REGISTRY: List[_Metric] = [
+    CHECK_DURATION, CHECKS, PRODUCTS_SCRAPED, PRODUCTS_LAST_CHECK, NEW_PRODUCTS,
+    HTTP_REQUESTS, ERRORS, TELEGRAM_SEND, QUEUE_DEPTH, EXCHANGE_RATE,
+]
+
+
+def render() -> str:
+    """Render all metrics in the Prometheus text format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def count_request(url: str) -> None:
+    """Count an outgoing HTTP request against the URL's host."""
+    HTTP_REQUESTS.inc(host=urlsplit(url).hostname or "unknown")
+
+
+# --- HTTP endpoint ---
+
+def start_server(port: int = DEFAULT_PORT, host: str = "0.0.0.0"):
+    """Serve /metrics from a background daemon thread. Returns the server."""
+    # http.server is imported here so one-shot checks don't pay for it
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("metrics: " + format % args)
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+    return server
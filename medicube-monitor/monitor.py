@@ -11,9 +11,21 @@ Main monitoring script that:
 Usage:
     python monitor.py                  # Run once and exit
     python monitor.py --daemon         # Run continuously every 24h
-    python monitor.py --check          # Force check now
+    python monitor.py --check          # Check now
+    python monitor.py --check --if-due  # Only if due (frequent cron: exits at once otherwise)
+    python monitor.py --check --frontier  # Stop at already known products (1-2 requests)
+    python monitor.py --check --parse-workers 4  # Parse pages in 4 processes
     python monitor.py --setup          # Initial setup (discover chat IDs)
+    python monitor.py --status         # Last check and daily/weekly rollups
     python monitor.py --interval 12    # Check every 12 hours (daemon mode)
+    python monitor.py --check --chat-currency 123456=USD  # Prices in USD for one chat
+    python monitor.py --check --all-stores  # Check every store from data/stores.json
+    python monitor.py --check --record fixtures/       # Save fetched pages (no alerts, data untouched)
+    python monitor.py --check --replay fixtures/       # Offline check from saved pages (same)
+    python monitor.py --check --profile --replay fixtures/  # Profile one offline check
+
+Runs sharing the data directory never check the same stores at once: a
+second --check while one is in progress waits for it and reports its result.
 """
 
 import argparse
@@ -22,11 +34,25 @@ import os
 import signal
 import sys
 import time
+from contextlib import contextmanager
 from datetime import datetime
-
-from scraper import scrape_all_products
+from typing import TYPE_CHECKING, List, Optional
+
+import locking
+import logs
+import metrics
+import profiling
+import replay
+import stores
+import tracing
 from storage import ProductStorage
-from telegram_bot import TelegramBot
+from stores import StoreDefinition
+
+# scraper (requests, bs4, soupsieve) and telegram_bot are imported where they
+# are first needed, so a cron run that isn't due yet exits before loading them
+if TYPE_CHECKING:
+    from currency import LazyRate
+    from telegram_bot import TelegramBot
 
 # --- Configuration ---
 BOT_TOKEN = os.environ.get(
@@ -34,53 +60,151 @@ BOT_TOKEN = os.environ.get(
     "8450762615:AAF0j3A0bRhA0zejgLEZgma4t8nAvBtF2bg",
 )
 DEFAULT_INTERVAL_HOURS = 24
+# With --if-due a check counts as due this fraction of the interval early, so
+# a cron run that starts late doesn't make the next on-time run skip a period
+DUE_GRACE_FRACTION = 0.25
+# --frontier checks still crawl the whole catalog this often (products that
+# only show up outside the newest-first categories)
+FULL_CRAWL_HOURS = 7 * 24
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 # --- Logging setup ---
-LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-
-
-def setup_logging(verbose: bool = False):
-    level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format=LOG_FORMAT,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(
-                os.path.join(DATA_DIR, "monitor.log"),
-                encoding="utf-8",
-            ),
-        ],
-    )
+
+def setup_logging(verbose: bool = False, json_format: bool = False, rotation: str = "size"):
+    """Queued logging to stdout and data/monitor.log (rotated, compressed; see logs.py)."""
+    logs.setup(DATA_DIR, verbose, json_format, rotation)
 
 
 logger = logging.getLogger("medicube-monitor")
 
 
-def run_check(storage: ProductStorage, bot: TelegramBot, silent_first_run: bool = True) -> int:
+def run_check(storage: ProductStorage, bot: "TelegramBot", silent_first_run: bool = True,
+              store_list: Optional[List[StoreDefinition]] = None,
+              frontier: bool = False) -> int:
+    """
+    Run a single product check cycle for one or more stores.
+    Several stores are checked concurrently (each host keeps its own
+    connection pool and rate limit), so the cycle takes about as long as
+    the slowest store. With ``frontier`` each store is crawled only up to
+    its known products (see ``_run_check``). Returns the number of new
+    products found.
+    """
+    store_list = store_list or [stores.get_store(stores.DEFAULT_STORE_ID)]
+    tracing.begin_trace()
+    started = time.monotonic()
+    try:
+        with tracing.span("check", stores=len(store_list)):
+            from currency import LazyRate
+            from scraper import fetch_rate_snapshot
+
+            # At most one exchange-rate lookup, shared by all stores, and only
+            # if some store has something to render
+            rates = LazyRate(fetch_rate_snapshot)
+            if len(store_list) == 1:
+                store = store_list[0]
+                return _run_check(_store_storage(storage, store), bot, silent_first_run,
+                                  store, rates, frontier)
+
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=len(store_list),
+                                    thread_name_prefix="store") as pool:
+                futures = {
+                    store.store_id: pool.submit(
+                        _run_check, _store_storage(storage, store), bot,
+                        silent_first_run, store, rates, frontier,
+                    )
+                    for store in store_list
+                }
+            new_total = 0
+            for store_id, future in futures.items():
+                try:
+                    new_total += future.result()
+                except Exception as e:
+                    metrics.ERRORS.inc(kind="store_check")
+                    logger.error(f"[{store_id}] Check failed: {e}", exc_info=True)
+            return new_total
+    finally:
+        metrics.CHECK_DURATION.observe(time.monotonic() - started)
+        metrics.CHECKS.inc()
+        trace_summary = tracing.end_trace()
+        if trace_summary:
+            logger.info(
+                f"Trace {trace_summary['trace_id'][:8]}: {trace_summary['total_ms']:.0f} ms, "
+                f"{trace_summary['pages']} pages, {trace_summary['bytes_downloaded']} bytes"
+            )
+
+
+def exclusive_check(storage: ProductStorage, bot: "TelegramBot", silent_first_run: bool = True,
+                    store_list: Optional[List[StoreDefinition]] = None,
+                    kind: str = "check", frontier: bool = False) -> int:
     """
-    Run a single product check cycle.
-    Returns the number of new products found.
+    run_check under the data directory's check lease. If another process is
+    already checking the same stores, wait for it and return its result
+    instead of scraping again (single flight). Checks of other stores are
+    waited out, then run.
     """
+    store_list = store_list or [stores.get_store(stores.DEFAULT_STORE_ID)]
+    if frontier:
+        kind += "-frontier"
+    key = f"{kind}:" + ",".join(sorted(s.store_id for s in store_list))
+    new_count, attached = locking.single_flight(
+        storage.data_dir, key,
+        lambda: run_check(storage, bot, silent_first_run, store_list, frontier),
+    )
+    if attached:
+        logger.info(f"Used the result of the check that was already running: {new_count} new")
+    return new_count or 0
+
+
+def _store_storage(storage: ProductStorage, store: StoreDefinition) -> ProductStorage:
+    return storage.for_store(store.store_id, stores.DEFAULT_STORE_ID)
+
+
+def _run_check(storage: ProductStorage, bot: "TelegramBot", silent_first_run: bool,
+               store: StoreDefinition, rates: "LazyRate", frontier: bool = False) -> int:
+    """
+    Check one store. A frontier check reads only the newest-first categories
+    up to the first run of already known products; the whole catalog is
+    still crawled on the first run and every FULL_CRAWL_HOURS.
+    """
+    from currency import convert_many
+    from scraper import scrape_all_products
+
     logger.info("=" * 60)
-    logger.info("Starting product check...")
+    logger.info(f"Starting product check for {store.name}...")
     logger.info(f"Time: {datetime.now().isoformat()}")
 
     is_first = storage.is_first_run()
+    started = time.monotonic()
+
+    known_ids = None
+    if frontier and not is_first:
+        last_full = storage.get_last_full_crawl(store.store_id)
+        if last_full is not None and time.time() - last_full < FULL_CRAWL_HOURS * 3600:
+            known_ids = storage.get_known_product_ids()
+        else:
+            logger.info(f"Full crawl due (every {FULL_CRAWL_HOURS}h), not stopping at known products")
 
     # Step 1: Scrape current products
-    logger.info("Scraping Medicube website...")
+    logger.info(f"Scraping {store.name} website ({store.base_url})...")
+    crawl_started = time.time()
     try:
-        current_products_raw = scrape_all_products()
+        with tracing.span("scrape", store=store.store_id, frontier=known_ids is not None):
+            current_products_raw = scrape_all_products(store, known_ids=known_ids)
+        profiling.mark("scraped")
     except Exception as e:
+        metrics.ERRORS.inc(kind="scrape")
         logger.error(f"Scraping failed: {e}", exc_info=True)
-        bot.broadcast("⚠️ <b>Помилка моніторингу</b>\n\nНе вдалося перевірити сайт Medicube. Перевірте логи.")
+        bot.broadcast(f"⚠️ <b>Помилка моніторингу</b>\n\nНе вдалося перевірити сайт {store.name}. Перевірте логи.")
+        storage.log_check(0, 0, duration=time.monotonic() - started, error=f"scrape: {e}"[:200])
         return 0
 
     if not current_products_raw:
+        metrics.ERRORS.inc(kind="empty_scrape")
         logger.warning("No products found! The website might be down or changed.")
-        bot.broadcast("⚠️ <b>Увага!</b>\n\nНе знайдено жодного товару на сайті Medicube. Можливо, сайт недоступний або змінив структуру.")
+        bot.broadcast(f"⚠️ <b>Увага!</b>\n\nНе знайдено жодного товару на сайті {store.name}. Можливо, сайт недоступний або змінив структуру.")
+        storage.log_check(0, 0, duration=time.monotonic() - started, error="no products found")
         return 0
 
     # Convert to dicts for storage
@@ -88,48 +212,144 @@ def run_check(storage: ProductStorage, bot: TelegramBot, silent_first_run: bool
         pid: p.to_dict() for pid, p in current_products_raw.items()
     }
 
-    total_count = len(current_products)
-    logger.info(f"Found {total_count} products on the website")
+    metrics.PRODUCTS_SCRAPED.inc(len(current_products))
+    if known_ids is None:
+        total_count = len(current_products)
+        storage.set_last_full_crawl(store.store_id, crawl_started)
+        logger.info(f"Found {total_count} products on the website")
+    else:
+        # Only the newest products were read; the rest of the catalog is known
+        total_count = len(known_ids.union(current_products))
+        logger.info(f"Frontier crawl: read {len(current_products)} products, "
+                    f"{total_count} known in total")
+    metrics.PRODUCTS_LAST_CHECK.set(total_count, store=store.store_id)
 
     # Step 2: Compare with known products
     if is_first:
         logger.info("First run - saving all products as baseline (no notifications)")
-        storage.update_products(current_products)
-        storage.log_check(total_count, 0)
+        snapshot = rates.get()
+        with tracing.span("storage"):
+            storage.save_rate_snapshot(snapshot)
+            storage.update_products(current_products, rate_id=snapshot.rate_id)
 
         if not silent_first_run:
-            bot.send_summary(0, total_count)
+            with tracing.span("telegram"):
+                bot.send_summary(0, total_count, store.name, store.base_url + "/")
+
+        with tracing.span("storage"):
+            storage.log_check(total_count, 0, timings=tracing.summary(),
+                              duration=time.monotonic() - started)
         
         logger.info(f"Baseline saved: {total_count} products")
         return 0
 
-    new_products = storage.find_new_products(current_products)
+    with tracing.span("storage"):
+        new_products = storage.find_new_products(current_products)
     new_count = len(new_products)
+    metrics.NEW_PRODUCTS.inc(new_count)
 
     logger.info(f"New products found: {new_count}")
 
     # Step 3: Send notifications for each new product
+    rate_id = None
     if new_count > 0:
-        logger.info(f"Sending notifications for {new_count} new products...")
-        for pid, pdata in sorted(new_products.items(), key=lambda x: int(x[0])):
-            logger.info(f"  NEW: #{pid} - {pdata.get('name', 'Unknown')}")
-            bot.send_new_product_alert(pdata)
-            time.sleep(0.5)  # Rate limit
+        snapshot = rates.get()
+        rate_id = snapshot.rate_id
+        storage.save_rate_snapshot(snapshot)
+        ordered = sorted(new_products.items(), key=lambda x: int(x[0]))
+        # One batch conversion per display currency in use (all from the same
+        # rate fetch), not one per product and chat
+        amounts_krw = [pdata.get("price_krw") for _, pdata in ordered]
+        converted = {}
+        for currency in bot.currency_groups():
+            rate = snapshot.rate_for(currency)
+            converted[currency] = (convert_many(amounts_krw, rate) if rate is not None
+                                   else [None] * len(ordered))
 
-        # Send summary
-        bot.send_summary(new_count, total_count)
+        logger.info(f"Sending notifications for {new_count} new products...")
+        with tracing.span("telegram", messages=new_count + 1):
+            metrics.QUEUE_DEPTH.set(new_count)
+            for i, (pid, pdata) in enumerate(ordered):
+                logger.info(f"  NEW: #{pid} - {pdata.get('name', 'Unknown')}")
+                bot.send_new_product_alert(
+                    pdata, store.name,
+                    prices={currency: amounts[i] for currency, amounts in converted.items()},
+                )
+                metrics.QUEUE_DEPTH.dec()
+                time.sleep(0.5)  # Rate limit
+            metrics.QUEUE_DEPTH.set(0)
+
+            # Send summary
+            bot.send_summary(new_count, total_count, store.name, store.base_url + "/")
 
     # Step 4: Update storage
-    storage.update_products(current_products)
-    storage.log_check(total_count, new_count, list(new_products.keys()) if new_products else None)
-
-    logger.info(f"Check complete. {new_count} new products, {total_count} total.")
+    with tracing.span("storage"):
+        storage.update_products(current_products, rate_id=rate_id)
+        storage.log_check(total_count, new_count,
+                          list(new_products.keys()) if new_products else None,
+                          timings=tracing.summary(),
+                          duration=time.monotonic() - started)
+
+    logger.info(f"[{store.store_id}] Check complete. {new_count} new products, {total_count} total.")
     logger.info("=" * 60)
 
     return new_count
 
 
-def setup_mode(storage: ProductStorage, bot: TelegramBot):
+@contextmanager
+def sandbox_storage(prefix: str):
+    """
+    A throwaway copy of the data directory's product state, for checks that
+    must not change real state (profiling, --replay, --record).
+    """
+    import shutil
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix=prefix) as tmp:
+        for name in ("known_products.json", "config.json"):
+            src = os.path.join(DATA_DIR, name)
+            if os.path.exists(src):
+                shutil.copy2(src, tmp)
+        stores_dir = os.path.join(DATA_DIR, "stores")
+        if os.path.isdir(stores_dir):
+            shutil.copytree(stores_dir, os.path.join(tmp, "stores"))
+        yield ProductStorage(tmp)
+
+
+def profile_mode(token: str, profiler: str, store_list: List[StoreDefinition]):
+    """
+    Profile a single check cycle. Runs against a throwaway copy of the data
+    directory and without notifications, so it never changes real state.
+    """
+    from telegram_bot import TelegramBot
+
+    with sandbox_storage("medicube-profile-") as storage:
+        bot = TelegramBot(token, [])
+        profiling.profile_check(
+            lambda: run_check(storage, bot, store_list=store_list),
+            os.path.join(DATA_DIR, "profiles"),
+            profiler=profiler,
+        )
+
+
+def archive_mode(token: str, store_list: List[StoreDefinition], replaying: bool,
+                 frontier: bool = False):
+    """
+    One --replay/--record check. Like profiling it runs against a throwaway
+    copy of the data directory without notifications: replayed pages are
+    stale, and a recording is for building fixtures, not for alerting.
+    """
+    from telegram_bot import TelegramBot
+
+    with sandbox_storage("medicube-replay-" if replaying else "medicube-record-") as storage:
+        bot = TelegramBot(token, [])
+        new_count = run_check(storage, bot, silent_first_run=False, store_list=store_list,
+                              frontier=frontier)
+    logger.info(f"{'Replayed' if replaying else 'Recorded'} check: {new_count} new products "
+                f"(no notifications sent, data directory unchanged)")
+
+
+def setup_mode(storage: ProductStorage, bot: "TelegramBot"):
     """Interactive setup: discover chat IDs and send test message."""
     print("\n" + "=" * 50)
     print("  Medicube Monitor - Setup")
@@ -173,7 +393,7 @@ def setup_mode(storage: ProductStorage, bot: TelegramBot):
 
     # Run initial scrape
     print("\n4. Running initial product scan...")
-    run_check(storage, bot, silent_first_run=False)
+    exclusive_check(storage, bot, silent_first_run=False)
 
     print("\n" + "=" * 50)
     print("  Setup complete!")
@@ -181,7 +401,48 @@ def setup_mode(storage: ProductStorage, bot: TelegramBot):
     print("=" * 50 + "\n")
 
 
-def daemon_mode(storage: ProductStorage, bot: TelegramBot, interval_hours: float):
+def status_mode(storage: ProductStorage, store_list: List[StoreDefinition]):
+    """Print the last check and today's / this week's rollups (reads only the summaries)."""
+    from history import period_keys
+
+    today, this_week = period_keys(datetime.now().isoformat())
+    for store in store_list:
+        store_storage = _store_storage(storage, store)
+        last = store_storage.get_last_check()
+        print(f"\n{store.name} ({store.store_id})")
+        if last is None:
+            print("  No checks yet")
+            continue
+        outcome = f"failed: {last['error']}" if last.get("error") else (
+            f"{last['new_count']} new / {last['total_products']} total")
+        print(f"  Last check: {last['timestamp'][:19]} - {outcome}")
+        for label, period, key in (("Today", "daily", today), ("This week", "weekly", this_week)):
+            rollup = store_storage.get_rollups(period).get(key)
+            if not rollup:
+                print(f"  {label}: no checks")
+                continue
+            avg = rollup["duration_s"] / rollup["checks"]
+            print(f"  {label}: {rollup['checks']} checks, {rollup['failures']} failed, "
+                  f"{rollup['new_products']} new products, avg {avg:.1f}s, "
+                  f"max {rollup['max_duration_s']:.1f}s")
+
+
+def check_and_schedule(storage: ProductStorage, bot: "TelegramBot", interval_hours: float,
+                       silent_first_run: bool = True,
+                       store_list: Optional[List[StoreDefinition]] = None,
+                       frontier: bool = False) -> int:
+    """exclusive_check, then persist when the stores are next due."""
+    store_list = store_list or [stores.get_store(stores.DEFAULT_STORE_ID)]
+    started = time.time()
+    new_count = exclusive_check(storage, bot, silent_first_run, store_list, frontier=frontier)
+    storage.set_next_due([s.store_id for s in store_list],
+                         started + interval_hours * 3600 * (1 - DUE_GRACE_FRACTION))
+    return new_count
+
+
+def daemon_mode(storage: ProductStorage, bot: "TelegramBot", interval_hours: float,
+                store_list: Optional[List[StoreDefinition]] = None,
+                frontier: bool = False):
     """Run the monitor continuously on a schedule."""
     interval_seconds = interval_hours * 3600
 
@@ -199,7 +460,8 @@ def daemon_mode(storage: ProductStorage, bot: TelegramBot, interval_hours: float
     signal.signal(signal.SIGTERM, signal_handler)
 
     # Initial check
-    run_check(storage, bot)
+    check_and_schedule(storage, bot, interval_hours, store_list=store_list,
+                       frontier=frontier)
 
     while running:
         next_check = datetime.now().timestamp() + interval_seconds
@@ -212,7 +474,8 @@ def daemon_mode(storage: ProductStorage, bot: TelegramBot, interval_hours: float
 
         if running:
             try:
-                run_check(storage, bot)
+                check_and_schedule(storage, bot, interval_hours, store_list=store_list,
+                                   frontier=frontier)
             except Exception as e:
                 logger.error(f"Check failed: {e}", exc_info=True)
                 try:
@@ -242,6 +505,22 @@ def main():
         action="store_true",
         help="Run a single check and exit",
     )
+    parser.add_argument(
+        "--if-due",
+        action="store_true",
+        help="With --check: exit at once unless the persisted next-due time has come (for cron)",
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Show the last check and daily/weekly rollups, then exit",
+    )
+    parser.add_argument(
+        "--frontier",
+        action="store_true",
+        help=f"Read only newest-first categories up to the known products "
+             f"(full crawl every {FULL_CRAWL_HOURS}h)",
+    )
     parser.add_argument(
         "--setup", "-s",
         action="store_true",
@@ -258,6 +537,67 @@ def main():
         action="store_true",
         help="Enable verbose logging",
     )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        default=bool(os.environ.get("MEDICUBE_LOG_JSON")),
+        help="Write data/monitor.log as JSON lines (or set MEDICUBE_LOG_JSON=1)",
+    )
+    parser.add_argument(
+        "--log-rotate",
+        choices=logs.ROTATIONS,
+        default="size",
+        help=f"Rotate monitor.log by size ({logs.MAX_BYTES // 2**20} MB) or at midnight; "
+             f"old logs are gzipped",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record per-stage timings to data/traces.jsonl",
+    )
+    parser.add_argument(
+        "--store",
+        action="append",
+        dest="store_ids",
+        metavar="ID",
+        help=f"Store to check (repeatable; default: {stores.DEFAULT_STORE_ID}). "
+             f"Extra stores are defined in data/{stores.STORES_FILENAME}",
+    )
+    parser.add_argument(
+        "--all-stores",
+        action="store_true",
+        help="Check every registered store concurrently",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="auto",
+        choices=profiling.PROFILERS,
+        help="Profile a single check (cprofile, or sampling if pyinstrument is installed)",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Save every fetched page to DIR for later --replay",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Serve pages from a --record archive instead of the live site",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        metavar="N",
+        default=int(os.environ.get("MEDICUBE_PARSE_WORKERS", "0")),
+        help="Parse pages in N worker processes, overlapping with fetching (0 = off)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.environ.get("MEDICUBE_METRICS_PORT", "0")),
+        help=f"Serve Prometheus metrics on this port (e.g. {metrics.DEFAULT_PORT}; 0 = off)",
+    )
     parser.add_argument(
         "--token", "-t",
         default=BOT_TOKEN,
@@ -269,6 +609,12 @@ def main():
         dest="chat_ids",
         help="Telegram chat ID(s) to notify (can be used multiple times)",
     )
+    parser.add_argument(
+        "--chat-currency",
+        action="append",
+        metavar="CHAT_ID=CODE",
+        help="Show prices in another currency for a chat, e.g. 123456=USD (saved; repeatable)",
+    )
 
     args = parser.parse_args()
 
@@ -276,42 +622,86 @@ def main():
     os.makedirs(DATA_DIR, exist_ok=True)
 
     # Setup logging
-    setup_logging(args.verbose)
+    setup_logging(args.verbose, args.log_json, args.log_rotate)
 
-    # Initialize storage
-    storage = ProductStorage(DATA_DIR)
+    stores.load_stores(DATA_DIR)
+    if args.all_stores:
+        store_list = list(stores.STORES.values())
+    else:
+        try:
+            store_list = [stores.get_store(sid) for sid in (args.store_ids or [stores.DEFAULT_STORE_ID])]
+        except KeyError as e:
+            parser.error(f"Unknown store {e}. Known: {', '.join(stores.list_store_ids())}")
 
-    # Initialize bot
-    chat_ids = args.chat_ids or storage.get_chat_ids()
+    storage = ProductStorage(DATA_DIR)
 
-    # Auto-discover chat IDs if none configured
-    bot = TelegramBot(args.token, chat_ids)
+    for choice in args.chat_currency or []:
+        chat_id, _, code = choice.partition("=")
+        code = code.strip().upper()
+        if not chat_id or len(code) != 3 or not code.isalpha():
+            parser.error(f"--chat-currency expects CHAT_ID=CODE (e.g. 123456=USD), got {choice!r}")
+        storage.set_chat_currency(chat_id.strip(), code)
+
+    if args.status:
+        status_mode(storage, store_list)
+        return
+
+    # Cron fast path: nothing heavy has been imported yet
+    one_shot = not (args.setup or args.daemon or args.profile or args.replay or args.record)
+    if one_shot and args.if_due:
+        next_due = storage.get_next_due([s.store_id for s in store_list])
+        if next_due is not None and time.time() < next_due:
+            due_at = datetime.fromtimestamp(next_due).strftime("%Y-%m-%d %H:%M:%S")
+            logger.info(f"Not due yet (next check at {due_at}), exiting. Drop --if-due to check now.")
+            return
 
-    if not chat_ids:
-        logger.info("No chat IDs configured, trying to discover...")
-        discovered = bot.discover_chat_ids()
-        if discovered:
-            storage.save_chat_ids(discovered)
-            bot.chat_ids = discovered
-            logger.info(f"Discovered {len(discovered)} chat(s)")
-        else:
-            logger.warning(
-                "No chat IDs found! Send /start to @KoreanEonni_bot first, "
-                "then run with --setup"
-            )
-            if not args.setup:
-                logger.warning("Continuing without notifications (scrape-only mode)")
+    if args.trace or os.environ.get("MEDICUBE_TRACE"):
+        tracing.enable(DATA_DIR)
+
+    if args.metrics_port:
+        try:
+            metrics.start_server(args.metrics_port)
+        except OSError as e:
+            logger.error(f"Could not start metrics endpoint on port {args.metrics_port}: {e}")
+
+    if args.parse_workers:
+        import parse_pool
+        parse_pool.configure(args.parse_workers)
+
+    archive = None
+    if args.replay:
+        archive = replay.PageArchive(args.replay, replaying=True)
+    elif args.record:
+        archive = replay.PageArchive(args.record, replaying=False)
+    replay.activate(archive)
+
+    if args.profile:
+        profile_mode(args.token, args.profile, store_list)
+        if archive is not None:
+            archive.save()
+        return
+    if archive is not None:
+        archive_mode(args.token, store_list, archive.replaying, args.frontier)
+        archive.save()
+        return
+
+    from telegram_bot import TelegramBot
+
+    # Chat IDs are discovered on the first notification, not before scraping
+    chat_ids = args.chat_ids or storage.get_chat_ids()
+    bot = TelegramBot(args.token, chat_ids,
+                      on_discover=None if args.setup else storage.save_chat_ids,
+                      chat_currencies=storage.get_chat_currencies())
 
     # Run
     if args.setup:
         setup_mode(storage, bot)
     elif args.daemon:
-        daemon_mode(storage, bot, args.interval)
-    elif args.check:
-        run_check(storage, bot, silent_first_run=False)
+        daemon_mode(storage, bot, args.interval, store_list, args.frontier)
     else:
-        # Default: single check
-        run_check(storage, bot)
+        check_and_schedule(storage, bot, args.interval,
+                           silent_first_run=not args.check, store_list=store_list,
+                           frontier=args.frontier)
 
 
 if __name__ == "__main__":
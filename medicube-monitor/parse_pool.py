@@ -0,0 +1,87 @@
+"""
+Worker processes for list-page parsing.
+
+BeautifulSoup is pure Python and CPU-bound, so however many pages are being
+fetched at once, parsing them in threads runs on one core. With
+``--parse-workers N`` (``configure``) pages are parsed in N processes
+instead:
+
+* a worker gets the page HTML plus the product_nos the check has already
+  extracted, and does the two-phase parse (see
+  ``scraper._parse_products_from_page``) on its side;
+* it sends back the page's product_no order and one ``Product.to_row``
+  tuple per newly extracted product, not pickled objects;
+* ``scrape_all_products`` crawls the categories from threads meanwhile, so
+  pages of one category are fetched while another's are parsed.
+
+The pool starts on first use, is shared by all stores and is shut down at
+exit. Workers are started with forkserver (spawn where unavailable): the
+monitor process has background threads that must not be forked.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Container, Optional
+
+from stores import StoreDefinition
+
+logger = logging.getLogger(__name__)
+
+_workers = 0
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def configure(workers: int) -> None:
+    """Parse in ``workers`` processes from now on (0 = in the scraping thread)."""
+    global _workers
+    workers = max(0, workers)
+    if workers != _workers:
+        shutdown()
+        _workers = workers
+
+
+def workers() -> int:
+    return _workers
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            logger.debug(f"Started {workers} parse worker processes")
+        return _pool
+
+
+def submit(html: str, category_name: str, store: StoreDefinition,
+           skip: Container[str], workers: Optional[int] = None) -> Future:
+    """
+    Parse a page in a worker; the future's result is
+    ``scraper._parse_page_rows(html, category_name, store, skip)``.
+    ``workers`` sizes the pool if it isn't running yet (default: ``configure``).
+    """
+    return _get_pool(workers or _workers or 1).submit(
+        _parse_in_worker, html, category_name, store, skip)
+
+
+def _parse_in_worker(html: str, category_name: str, store: StoreDefinition,
+                     skip: Container[str]):
+    from scraper import _parse_page_rows     # imported once per worker process
+    return _parse_page_rows(html, category_name, store, skip)
+
+
+def shutdown() -> None:
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+atexit.register(shutdown)
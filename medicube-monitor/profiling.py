@@ -0,0 +1,188 @@
+"""
+Profiling support for ``monitor.py --check --profile``.
+
+Runs one check cycle under cProfile (or pyinstrument's sampling profiler
+when it is installed, unless cProfile is requested), writes the raw profile to the data
+directory and prints the hottest functions by cumulative time together with
+the tracemalloc peak and the largest allocation sites.
+"""
+
+import logging
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("auto", "cprofile", "sampling")
+
+
+def _sampling_available() -> bool:
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Session:
+    def __init__(self):
+        self.snapshots: List[Tuple[str, tracemalloc.Snapshot, int]] = []
+
+
+_session: Optional[_Session] = None
+
+
+def mark(label: str) -> None:
+    """
+    Take a tracemalloc snapshot at an interesting point of the check
+    (e.g. right after scraping, when retained memory is highest).
+    No-op unless a profile session is running.
+    """
+    if _session is None or not tracemalloc.is_tracing():
+        return
+    current, _ = tracemalloc.get_traced_memory()
+    _session.snapshots.append((label, tracemalloc.take_snapshot(), current))
+
+
+def profile_check(run: Callable[[], object], output_dir: str,
+                  profiler: str = "auto", top: int = 25) -> object:
+    """
+    Run ``run()`` once under a profiler. Writes ``check-<timestamp>.pstats``
+    (cProfile) or ``check-<timestamp>.collapsed`` (sampling) into output_dir
+    and prints a report. Returns whatever ``run()`` returned.
+    """
+    global _session
+
+    if profiler == "auto":
+        profiler = "sampling" if _sampling_available() else "cprofile"
+    if profiler == "sampling" and not _sampling_available():
+        logger.warning("pyinstrument is not installed, falling back to cProfile")
+        profiler = "cprofile"
+
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+
+    _session = _Session()
+    tracemalloc.start(25)
+    started = time.perf_counter()
+    try:
+        if profiler == "sampling":
+            from pyinstrument import Profiler
+
+            sampler = Profiler(interval=0.001)
+            sampler.start()
+            try:
+                result = run()
+            finally:
+                sampler.stop()
+            elapsed = time.perf_counter() - started
+            path = os.path.join(output_dir, f"check-{stamp}.collapsed")
+            root = sampler.last_session.root_frame() if sampler.last_session else None
+            _write_collapsed(root, path)
+            report = _sampling_report(root, top)
+        else:
+            import cProfile
+
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                result = run()
+            finally:
+                prof.disable()
+            elapsed = time.perf_counter() - started
+            path = os.path.join(output_dir, f"check-{stamp}.pstats")
+            prof.dump_stats(path)
+            report = _pstats_report(prof, top)
+
+        _, peak = tracemalloc.get_traced_memory()
+        mark("end")
+        memory_report = _memory_report(_session.snapshots, peak, top=10)
+    finally:
+        tracemalloc.stop()
+        _session = None
+
+    print("\n" + "=" * 70)
+    print(f"  PROFILE ({profiler}) - {elapsed:.2f}s wall")
+    print(f"  Written to: {path}")
+    print("=" * 70)
+    print(report)
+    print(memory_report)
+    return result
+
+
+def _pstats_report(prof, top: int) -> str:
+    import io
+    import pstats
+
+    out = io.StringIO()
+    stats = pstats.Stats(prof, stream=out)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+    return out.getvalue()
+
+
+# --- Sampling (pyinstrument) helpers ---
+
+def _frame_label(frame) -> str:
+    return f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+
+
+def _write_collapsed(root, path: str) -> None:
+    """Write Brendan Gregg style collapsed stacks (self time in microseconds)."""
+    lines: List[str] = []
+
+    def walk(frame, stack):
+        stack = stack + [_frame_label(frame)]
+        children = list(frame.children)
+        self_time = frame.time - sum(c.time for c in children)
+        if self_time > 0:
+            lines.append(f"{';'.join(stack)} {int(self_time * 1_000_000)}")
+        for child in children:
+            walk(child, stack)
+
+    if root is not None:
+        walk(root, [])
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _sampling_report(root, top: int) -> str:
+    totals: Dict[str, float] = {}
+
+    def walk(frame, seen):
+        label = _frame_label(frame)
+        if label not in seen:  # don't double count recursion
+            totals[label] = totals.get(label, 0.0) + frame.time
+            seen = seen | {label}
+        for child in frame.children:
+            walk(child, seen)
+
+    if root is not None:
+        walk(root, frozenset())
+    ranked = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    lines = ["   cumtime  function"]
+    lines.extend(f"{t:10.3f}  {label}" for label, t in ranked)
+    return "\n".join(lines) + "\n"
+
+
+# --- tracemalloc ---
+
+def _memory_report(snapshots, peak: int, top: int) -> str:
+    lines = [f"tracemalloc peak: {peak / 1024 / 1024:.1f} MiB"]
+    if not snapshots:
+        return "\n".join(lines)
+    # The snapshot with the most retained memory is the closest to the peak
+    label, snapshot, current = max(snapshots, key=lambda s: s[2])
+    lines.append(f"Top allocation sites at '{label}' ({current / 1024 / 1024:.1f} MiB retained):")
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"  {stat.size / 1024:9.1f} KiB  {stat.count:7d} blocks  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,181 @@
+"""
+Historical exchange-rate table for point-in-time price conversion.
+
+Every rate snapshot fetched during a check (see ``currency.RateSnapshot``)
+carries the provider's full KRW rate vector. The table keeps one rate per
+day per currency - a daily series per pair - so a stored price can be
+re-expressed in the currency of the day it was seen.
+
+On disk (``data/rate_history.json``) each series is two parallel arrays:
+
+    {"base": "KRW", "series": {"UAH": {"days": [739543, ...], "rates": [0.0291, ...]}}}
+
+``days`` are proleptic Gregorian ordinals (``date.toordinal()``), sorted.
+In memory they are ``array`` columns, so an as-of lookup is one bisect and
+``convert_column`` converts a whole price-history column in one call
+(``numpy.searchsorted`` when NumPy is installed).
+"""
+
+import json
+import logging
+import os
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+from locking import file_lock, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+BASE_CURRENCY = "KRW"
+RATE_HISTORY_FILENAME = "rate_history.json"
+# Snapshots that are not a provider observation of that day
+UNOBSERVED_SOURCES = ("cached", "fallback", "replay")
+
+When = Union[date, datetime, str, float, int]
+
+
+# NumPy is optional and only imported by ``as_of_many``: storage loads this
+# module on the cron cold-start path, where the import alone would dominate
+_numpy = None
+
+
+def _get_numpy():
+    """The numpy module, or None if it isn't installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def day_number(when: When) -> int:
+    """Day ordinal of a date, datetime, ISO string (e.g. a stored ``first_seen``) or Unix time."""
+    if isinstance(when, date):     # datetime included
+        return when.toordinal()
+    if isinstance(when, str):
+        return datetime.fromisoformat(when).toordinal()
+    return datetime.fromtimestamp(when).toordinal()
+
+
+class RateSeries:
+    """Daily rates of one currency pair: sorted day ordinals and their rates."""
+
+    def __init__(self, days: Sequence[int] = (), rates: Sequence[float] = ()):
+        self.days = array("q", days)
+        self.rates = array("d", rates)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def set(self, day: int, rate: float) -> None:
+        """Record the rate of a day (a later observation of the same day replaces it)."""
+        i = bisect_right(self.days, day)
+        if i and self.days[i - 1] == day:
+            self.rates[i - 1] = rate
+            return
+        self.days.insert(i, day)
+        self.rates.insert(i, rate)
+
+    def as_of(self, day: int) -> Optional[float]:
+        """Rate in effect on ``day``: the latest one recorded on or before it."""
+        i = bisect_right(self.days, day)
+        return self.rates[i - 1] if i else None
+
+    def as_of_many(self, days: Sequence[int]) -> List[Optional[float]]:
+        """``as_of`` for a whole column of days."""
+        if not self.days:
+            return [None] * len(days)
+        numpy = _get_numpy()
+        if numpy is None:
+            lookup, rates = self.days, self.rates
+            out = []
+            for day in days:
+                i = bisect_right(lookup, day)
+                out.append(rates[i - 1] if i else None)
+            return out
+        idx = numpy.searchsorted(numpy.frombuffer(self.days, dtype=numpy.int64),
+                                 numpy.asarray(days, dtype=numpy.int64), side="right")
+        rates = numpy.frombuffer(self.rates, dtype=numpy.float64)
+        picked = rates[numpy.maximum(idx - 1, 0)].tolist()
+        return [r if i else None for i, r in zip(idx.tolist(), picked)]
+
+
+class RateTable:
+    """Daily rate series for every KRW → currency pair seen in provider responses."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.series: Dict[str, RateSeries] = {}
+        self._lock = file_lock(path + ".lock")
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.error(f"Error loading rate history: {e}")
+            return
+        self.series = {
+            quote: RateSeries(s["days"], s["rates"])
+            for quote, s in data.get("series", {}).items()
+        }
+
+    def save(self) -> None:
+        data = {
+            "base": BASE_CURRENCY,
+            "series": {
+                quote: {"days": s.days.tolist(), "rates": s.rates.tolist()}
+                for quote, s in sorted(self.series.items())
+            },
+        }
+        write_json_atomic(self.path, data, separators=(",", ":"))
+
+    def record(self, snapshot) -> bool:
+        """
+        Add every rate of a ``currency.RateSnapshot`` under the provider's
+        day and persist the table. Returns False for snapshots that aren't a
+        provider observation (fallback/cached/replayed rates).
+        """
+        if snapshot.source in UNOBSERVED_SOURCES:
+            return False
+        day = day_number(snapshot.as_of)
+        with self._lock:
+            self._load()    # another process may have recorded since
+            for quote, rate in snapshot.rates.items():
+                if quote == BASE_CURRENCY or not rate:
+                    continue
+                self.series.setdefault(quote, RateSeries()).set(day, float(rate))
+            self.save()
+        return True
+
+    def currencies(self) -> List[str]:
+        return sorted(self.series)
+
+    def rate_at(self, when: When, quote: str = "UAH") -> Optional[float]:
+        """KRW → ``quote`` rate as of ``when``, or None if the table has nothing that old."""
+        series = self.series.get(quote)
+        return series.as_of(day_number(when)) if series else None
+
+    def convert_column(self, amounts_krw: Sequence[Optional[int]], when: Sequence[When],
+                       quote: str = "UAH") -> List[Optional[float]]:
+        """
+        Convert a column of KRW amounts, each at the rate of its own day
+        (e.g. ``price_krw`` and ``first_seen`` of stored products), in one
+        call. None where the amount is missing or no rate is known that early.
+        """
+        series = self.series.get(quote)
+        if series is None:
+            return [None] * len(amounts_krw)
+        rates = series.as_of_many([day_number(w) for w in when])
+        return [
+            None if amount is None or rate is None else round(amount * rate, 2)
+            for amount, rate in zip(amounts_krw, rates)
+        ]
@@ -0,0 +1,93 @@
+"""
+Record/replay archive of fetched category pages.
+
+``--record DIR`` saves every page a check downloads (plus the exchange
+rate it used) into DIR; ``--replay DIR`` serves those pages back instead of
+hitting the site. Replays make profiling and benchmarking repeatable and
+offline.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.json"
+
+
+class PageArchive:
+    """A directory of recorded pages keyed by URL."""
+
+    def __init__(self, path: str, replaying: bool = True):
+        self.path = path
+        self.replaying = replaying
+        self.pages_dir = os.path.join(path, "pages")
+        self.index_file = os.path.join(path, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self.index: Dict[str, str] = {}
+        self.exchange_rate: Optional[float] = None
+        self.rates: Dict[str, float] = {}   # every KRW rate of the recorded fetch
+
+        if replaying:
+            self._load()
+        else:
+            os.makedirs(self.pages_dir, exist_ok=True)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_file):
+            raise FileNotFoundError(f"No replay archive at {self.path} (missing {INDEX_FILENAME})")
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.index = data.get("pages", {})
+        self.exchange_rate = data.get("exchange_rate")
+        self.rates = data.get("rates", {})
+        logger.info(f"Replay archive loaded: {len(self.index)} pages from {self.path}")
+
+    def get(self, url: str) -> Optional[str]:
+        """Return the recorded HTML for a URL, or None if it was never recorded."""
+        filename = self.index.get(url)
+        if not filename:
+            return None
+        with open(os.path.join(self.pages_dir, filename), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, url: str, html: str) -> None:
+        """Record a fetched page."""
+        filename = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".html"
+        with open(os.path.join(self.pages_dir, filename), "w", encoding="utf-8") as f:
+            f.write(html)
+        with self._lock:
+            self.index[url] = filename
+
+    def save(self) -> None:
+        """Write the index (recording mode only)."""
+        if self.replaying:
+            return
+        with self._lock:
+            data = {"exchange_rate": self.exchange_rate, "rates": self.rates,
+                    "pages": dict(self.index)}
+        with open(self.index_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        logger.info(f"Recorded {len(data['pages'])} pages to {self.path}")
+
+    def iter_pages(self):
+        """Yield (url, html) for every recorded page."""
+        for url in sorted(self.index):
+            yield url, self.get(url)
+
+
+_active: Optional[PageArchive] = None
+
+
+def activate(archive: Optional[PageArchive]) -> None:
+    """Route scraper fetches through the given archive (None to disable)."""
+    global _active
+    _active = archive
+
+
+def active() -> Optional[PageArchive]:
+    return _active
@@ -1,56 +1,30 @@
 """
-Medicube Korea product scraper.
-Scrapes all product categories from m.themedicube.co.kr
+Cafe24 product scraper.
+Scrapes all product categories of a store (default: m.themedicube.co.kr).
+Store URLs, categories and selectors come from ``stores.StoreDefinition``.
 """
 
+import functools
 import re
-import time
 import logging
 import requests
+import soupsieve as sv
 from bs4 import BeautifulSoup
-from typing import Dict, Optional
+from typing import Container, Dict, List, Optional, Set, Tuple
 
-from currency import get_krw_to_uah_rate, convert_price
+import http_pool
+import metrics
+import parse_pool
+import replay
+import tracing
+from currency import RateSnapshot, get_rate_snapshot, parse_krw_price
+from stores import MEDICUBE, StoreDefinition
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://m.themedicube.co.kr"
-
-# All known product categories on the site
-CATEGORIES = {
-    # Top-level categories
-    44: "PRODUCT (All)",
-    51: "NEW",
-    52: "BEST",
-    # Line-based categories
-    47: "RED LINE",
-    57: "ZERO LINE",
-    414: "SUPER CICA LINE",
-    264: "BLUE LINE",
-    307: "DEEP LINE",
-    760: "PDRN 라인",
-    # Product type categories
-    441: "상품 유형별",
-    442: "클렌징",
-    444: "패드",
-    445: "스킨/토너",
-    446: "앰플/세럼",
-    447: "크림",
-    448: "선 케어",
-    449: "메이크업",
-    450: "마스크팩",
-    451: "바디",
-    452: "헤어",
-    603: "디바이스",
-    # Function-based categories
-    454: "기능별",
-    458: "탄력/미백",
-    460: "민감/진정",
-    466: "라인별",
-    501: "에이지알",
-    90: "SET",
-    93: "TOOL",
-}
+# Module-level aliases for the default (Medicube) store
+BASE_URL = MEDICUBE.base_url
+CATEGORIES = MEDICUBE.categories
 
 HEADERS = {
     "User-Agent": (
@@ -66,15 +40,13 @@ HEADERS = {
 class Product:
     """Represents a single product from Medicube."""
 
-    def __init__(self, product_no: str, name: str, url: str, price: str = "",
-                 price_uah: str = "", price_krw: str = "",
+    def __init__(self, product_no: str, name: str, url: str,
+                 price_krw: Optional[int] = None,
                  image_url: str = "", category: str = ""):
         self.product_no = product_no
         self.name = name
         self.url = url
-        self.price = price          # Display price (UAH if converted, otherwise KRW)
-        self.price_uah = price_uah  # Price in UAH (formatted string)
-        self.price_krw = price_krw  # Original KRW price
+        self.price_krw = price_krw  # Integer KRW; converted to UAH only when rendered
         self.image_url = image_url
         self.category = category
 
@@ -83,8 +55,6 @@ class Product:
             "product_no": self.product_no,
             "name": self.name,
             "url": self.url,
-            "price": self.price,
-            "price_uah": self.price_uah,
             "price_krw": self.price_krw,
             "image_url": self.image_url,
             "category": self.category,
@@ -92,44 +62,200 @@ class Product:
 
     @classmethod
     def from_dict(cls, data: dict) -> "Product":
+        price_krw = data.get("price_krw")
+        if isinstance(price_krw, str):
+            price_krw = parse_krw_price(price_krw)  # stored by older versions as '329,000원'
         return cls(
             product_no=data["product_no"],
             name=data["name"],
             url=data["url"],
-            price=data.get("price", ""),
-            price_uah=data.get("price_uah", ""),
-            price_krw=data.get("price_krw", ""),
+            price_krw=price_krw,
             image_url=data.get("image_url", ""),
             category=data.get("category", ""),
         )
 
+    def to_row(self) -> tuple:
+        """Compact form without the category: (product_no, name, url, price_krw, image_url)."""
+        return (self.product_no, self.name, self.url, self.price_krw, self.image_url)
+
+    @classmethod
+    def from_row(cls, row: tuple, category: str = "") -> "Product":
+        return cls(*row, category=category)
+
+    def with_category(self, category: str) -> "Product":
+        """The same product as listed in another category."""
+        return Product(self.product_no, self.name, self.url, self.price_krw,
+                       self.image_url, category)
+
     def __repr__(self):
         return f"Product(#{self.product_no}: {self.name})"
 
 
+class ExtractionPlan:
+    """
+    Precompiled extraction plan for one store layout.
+
+    Holds the compiled CSS queries (soupsieve) and regexes used by
+    ``_parse_products_from_page`` so that they are built once per
+    store/layout version and reused across every page of a check.
+    """
+
+    def __init__(self, store: StoreDefinition):
+        sel = store.selectors
+        self.store = store
+        self.item = sv.compile(sel["item"])
+        self.link = sv.compile(sel["link"])
+        self.link_fallback = sv.compile(sel["link_fallback"])
+        self.name = sv.compile(sel["name"])
+        self.name_fallback = sv.compile(sel["name_fallback"])
+        self.price_rows = sv.compile(sel["price_rows"])
+        self.price_title = sv.compile(sel["price_title"])
+        self.image = sv.compile(sel["image"])
+        self.product_no_re = re.compile(r"product_no=(\d+)")
+        # Start tag of a list item: Cafe24 renders <li id="anchorBoxId_<product_no>">.
+        # Two-phase parsing relies on it; a page linking a product_no that has no
+        # such item (an unanchored item, a widget) is parsed whole instead
+        self.item_start_re = re.compile(r"""<li\b[^>]*\bid=["']anchorBoxId_(\d+)""")
+        self.price_re = re.compile(r"([\d,]+)\s*원")
+        self.member_kw = store.price_keywords["member"]
+        self.sale_kw = store.price_keywords["sale"]
+
+    def find_price(self, desc) -> Optional[int]:
+        """
+        Pick the member price (preferred) or sale price from the listInfo rows,
+        as integer KRW. Struck-through and title spans are skipped without
+        walking up parents.
+        """
+        price = None
+        member_kw = self.member_kw
+        for li in self.price_rows.select(desc):
+            ptitle = self.price_title.select_one(li)
+            if not ptitle:
+                continue
+            title_text = ptitle.get_text(strip=True)
+            is_member = member_kw in title_text
+            if not is_member and self.sale_kw not in title_text:
+                continue  # Neither price tier, nothing to take from this row
+            # Spans inside the title element are labels, not prices
+            title_spans = {id(ptitle), *(id(t) for t in ptitle.find_all("span"))}
+            for span in li.find_all("span"):
+                if id(span) in title_spans:
+                    continue
+                if "line-through" in span.get("style", ""):
+                    continue  # Old (crossed-out) price
+                price_match = self.price_re.search(span.get_text(strip=True))
+                if not price_match:
+                    continue
+                if is_member:
+                    price = int(price_match.group(1).replace(",", ""))
+                    break  # Best price, stop
+                elif price is None:
+                    price = int(price_match.group(1).replace(",", ""))
+            if is_member and price is not None:
+                break  # Got member price, no need to check more
+        return price
+
+
+_PLANS: Dict[Tuple[str, str], ExtractionPlan] = {}
+
+
+def get_extraction_plan(store: StoreDefinition) -> ExtractionPlan:
+    """Return the cached plan for a store, building it on first use."""
+    key = (store.store_id, store.layout_version)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _PLANS[key] = ExtractionPlan(store)
+    return plan
+
+
 def _parse_products_from_page(html: str, category_name: str = "",
-                              exchange_rate: Optional[float] = None) -> Dict[str, Product]:
-    """Parse products from a Cafe24 product list page."""
+                              store: StoreDefinition = MEDICUBE,
+                              seen: Optional[Dict[str, Product]] = None) -> Dict[str, Product]:
+    """
+    Parse products from a Cafe24 product list page.
+
+    With ``seen`` (products already extracted earlier in the same check,
+    updated in place) parsing is two-phase: a regex scan locates the page's
+    items and their product_no, and only the HTML of items not in ``seen``
+    goes through BeautifulSoup and full extraction; the others are reused.
+    A page with products the scan can't locate is parsed whole.
+    """
+    plan = get_extraction_plan(store)
+    if seen is None:
+        return _extract_products(html, category_name, plan)
+    order, extracted = _scan_and_extract(html, category_name, plan, seen)
+    return _merge_page(order, extracted, category_name, seen)
+
+
+def _scan_and_extract(html: str, category_name: str, plan: ExtractionPlan,
+                      skip: Container[str]) -> Tuple[Optional[List[str]], Dict[str, Product]]:
+    """
+    Both phases for one page: the product_nos of its items in page order
+    (None when the page was parsed whole because the scan can't account for
+    every product on it) and the fully extracted products not in ``skip``.
+    """
+    starts = [(m.start(), m.group(1)) for m in plan.item_start_re.finditer(html)]
+    anchored = {product_no for _, product_no in starts}
+    if not starts or not anchored.issuperset(plan.product_no_re.findall(html)):
+        return None, _extract_products(html, category_name, plan)
+
+    # Each item runs up to the next item's start tag (the last one to the end)
+    fragments = []
+    for i, (start, product_no) in enumerate(starts):
+        if product_no not in skip:
+            end = starts[i + 1][0] if i + 1 < len(starts) else len(html)
+            fragments.append(html[start:end])
+    extracted = _extract_products("".join(fragments), category_name, plan) if fragments else {}
+    return [product_no for _, product_no in starts], extracted
+
+
+def _merge_page(order: Optional[List[str]], extracted: Dict[str, Product],
+                category_name: str, seen: Dict[str, Product]) -> Dict[str, Product]:
+    """The page's products: newly extracted ones plus the ones reused from ``seen``."""
+    if order is None:
+        products = extracted
+    else:
+        products = {}
+        for product_no in order:
+            if product_no in extracted:
+                products[product_no] = extracted[product_no]
+            elif product_no in seen:
+                products[product_no] = seen[product_no].with_category(category_name)
+        for product_no, product in extracted.items():
+            products.setdefault(product_no, product)
+    seen.update(extracted)
+    return products
+
+
+def _parse_page_rows(html: str, category_name: str, store: StoreDefinition,
+                     skip: Container[str]) -> Tuple[Optional[List[str]], List[tuple]]:
+    """
+    ``_scan_and_extract`` for a parse worker (see ``parse_pool``): extracted
+    products come back as ``Product.to_row`` tuples, which pickle far
+    smaller than objects.
+    """
+    order, extracted = _scan_and_extract(html, category_name, get_extraction_plan(store), skip)
+    return order, [product.to_row() for product in extracted.values()]
+
+
+def _extract_products(html: str, category_name: str, plan: ExtractionPlan) -> Dict[str, Product]:
+    """Full field extraction of every list item in ``html``."""
+    store = plan.store
     soup = BeautifulSoup(html, "html.parser")
     products = {}
 
-    descriptions = soup.select(".description")
-    for desc in descriptions:
+    for desc in plan.item.select(soup):
         box = desc.parent
         if not box:
             continue
 
         # Find product link
-        link_el = box.select_one(".thumbnail a[href*='product_no']")
-        if not link_el:
-            link_el = box.select_one("a[href*='product_no']")
+        link_el = plan.link.select_one(box) or plan.link_fallback.select_one(box)
         if not link_el:
             continue
 
         # Find product name
-        name_el = desc.select_one(".name a")
-        if not name_el:
-            name_el = desc.select_one("a")
+        name_el = plan.name.select_one(desc) or plan.name_fallback.select_one(desc)
         if not name_el:
             continue
 
@@ -139,65 +265,35 @@ def _parse_products_from_page(html: str, category_name: str = "",
             continue
 
         # Extract product_no from URL
-        match = re.search(r"product_no=(\d+)", href)
+        match = plan.product_no_re.search(href)
         if not match:
             continue
         product_no = match.group(1)
 
         # Build full URL
         if href.startswith("/"):
-            full_url = f"{BASE_URL}{href}"
+            full_url = f"{store.base_url}{href}"
         elif not href.startswith("http"):
-            full_url = f"{BASE_URL}/{href}"
+            full_url = f"{store.base_url}/{href}"
         else:
             full_url = href
 
-        # Try to get price from Cafe24 listInfo structure
-        price = ""
         # Priority: 일반 회원가 (member price) > 판매가 (sale price)
-        list_items = desc.select(".listInfo li.xans-record-")
-        for li in list_items:
-            ptitle = li.select_one(".ptitle")
-            if not ptitle:
-                continue
-            title_text = ptitle.get_text(strip=True)
-            # Get the price span (not the title span)
-            spans = li.select("span")
-            for span in spans:
-                if span.find_parent(class_="ptitle"):
-                    continue  # Skip title spans
-                span_text = span.get_text(strip=True)
-                price_match = re.search(r"[\d,]+\s*원", span_text)
-                if price_match and "line-through" not in span.get("style", ""):
-                    if "회원가" in title_text:
-                        price = price_match.group(0)
-                        break  # Best price, stop
-                    elif "판매가" in title_text and not price:
-                        price = price_match.group(0)
-            if "회원가" in (ptitle.get_text(strip=True) if ptitle else "") and price:
-                break  # Got member price, no need to check more
+        price = plan.find_price(desc)
 
         # Try to get image URL
         image_url = ""
-        img_el = box.select_one(".thumbnail img")
+        img_el = plan.image.select_one(box)
         if img_el:
             image_url = img_el.get("src", "") or img_el.get("data-original", "")
             if image_url.startswith("//"):
                 image_url = "https:" + image_url
 
-        # Convert KRW price to UAH
-        price_uah = ""
-        price_krw = price  # original KRW string
-        if price and exchange_rate:
-            price_uah, _ = convert_price(price, rate=exchange_rate)
-
         products[product_no] = Product(
             product_no=product_no,
             name=name,
             url=full_url,
-            price=price_uah if price_uah else price_krw,  # display UAH if available
-            price_uah=price_uah,
-            price_krw=price_krw,
+            price_krw=price,
             image_url=image_url,
             category=category_name,
         )
@@ -205,27 +301,78 @@ def _parse_products_from_page(html: str, category_name: str = "",
     return products
 
 
+def fetch_page(url: str) -> str:
+    """
+    GET a list page and return its HTML.
+    Goes through the per-host connection pool and rate limiter; served from
+    the replay archive when one is active (recorded when recording).
+    """
+    archive = replay.active()
+    if archive is not None and archive.replaying:
+        html = archive.get(url)
+        if html is None:
+            raise requests.RequestException(f"Not in replay archive: {url}")
+        return html
+
+    metrics.count_request(url)
+    resp = http_pool.get(url, headers=HEADERS, timeout=20)
+    resp.raise_for_status()
+    html = resp.text
+    if archive is not None:
+        archive.put(url, html)
+    return html
+
+
 def scrape_category(cate_no: int, category_name: str = "",
-                    max_pages: int = 5,
-                    exchange_rate: Optional[float] = None) -> Dict[str, Product]:
-    """Scrape all products from a given category (with pagination)."""
-    # Auto-fetch exchange rate if not provided
-    if exchange_rate is None:
-        exchange_rate = get_krw_to_uah_rate()
+                    max_pages: Optional[int] = None,
+                    store: StoreDefinition = MEDICUBE,
+                    known_ids: Optional[Set[str]] = None,
+                    seen: Optional[Dict[str, Product]] = None,
+                    parse_workers: Optional[int] = None) -> Dict[str, Product]:
+    """
+    Scrape all products from a given category (with pagination).
+    ``seen`` is passed on to ``_parse_products_from_page``. With
+    ``parse_workers`` (default: ``parse_pool.workers()``) pages are parsed
+    in the worker pool.
+
+    With ``known_ids`` (a newest-first category only) pagination stops at the
+    known frontier: once a whole page, or ``store.known_run`` products in a
+    row, are already known, everything after them is older and known too.
+    """
+    if max_pages is None:
+        max_pages = store.max_pages
+
+    if parse_workers is None:
+        parse_workers = parse_pool.workers()
+    if parse_workers and seen is None:
+        seen = {}
 
     all_products = {}
+    known_streak = 0
 
     for page in range(1, max_pages + 1):
-        url = f"{BASE_URL}/product/list.html?cate_no={cate_no}&page={page}"
+        url = store.list_url(cate_no, page)
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=20)
-            resp.raise_for_status()
+            with tracing.span("fetch", store=store.store_id, category=cate_no, page=page) as span:
+                html = fetch_page(url)
+                if tracing.is_enabled():    # don't re-encode every page when tracing is off
+                    span.set(bytes=len(html.encode("utf-8")))
         except requests.RequestException as e:
-            logger.warning(f"Failed to fetch category {cate_no} page {page}: {e}")
+            metrics.ERRORS.inc(kind="fetch")
+            logger.warning(f"[{store.store_id}] Failed to fetch category {cate_no} page {page}: {e}")
             break
 
-        page_products = _parse_products_from_page(resp.text, category_name,
-                                                   exchange_rate=exchange_rate)
+        with tracing.span("parse", store=store.store_id, category=cate_no, page=page) as span:
+            if parse_workers:
+                # seen.copy() and update() are atomic, other category threads may share it
+                order, rows = parse_pool.submit(html, category_name, store, frozenset(seen.copy()),
+                                                parse_workers).result()
+                extracted = {row[0]: Product.from_row(row, category_name) for row in rows}
+                page_products = _merge_page(order, extracted, category_name, seen)
+            else:
+                page_products = _parse_products_from_page(html, category_name, store=store,
+                                                          seen=seen)
+            span.set(products=len(page_products))
 
         if not page_products:
             break  # No more products on this page
@@ -237,64 +384,120 @@ def scrape_category(cate_no: int, category_name: str = "",
         if new_count == 0:
             break  # No new products, stop paginating
 
-        logger.debug(f"Category {cate_no} page {page}: {len(page_products)} products "
-                      f"({new_count} new)")
-
-        # Be respectful - small delay between pages
-        if page < max_pages:
-            time.sleep(0.5)
+        if known_ids is not None:
+            page_known = True
+            for pid in page_products:   # page order, newest first
+                if pid in known_ids:
+                    known_streak += 1
+                else:
+                    known_streak = 0
+                    page_known = False
+            if page_known or known_streak >= store.known_run:
+                logger.debug(f"[{store.store_id}] Category {cate_no}: reached known products "
+                             f"on page {page}, stopping")
+                break
+
+        logger.debug(f"[{store.store_id}] Category {cate_no} page {page}: "
+                     f"{len(page_products)} products ({new_count} new)")
 
     return all_products
 
 
-def scrape_all_products() -> Dict[str, Product]:
+def scrape_all_products(store: StoreDefinition = MEDICUBE,
+                        known_ids: Optional[Set[str]] = None,
+                        parse_workers: Optional[int] = None) -> Dict[str, Product]:
     """
-    Scrape ALL products from all categories on Medicube Korea.
-    Prices are automatically converted from KRW to UAH using live exchange rate.
+    Scrape ALL products from all crawl categories of a store.
+    Prices stay in integer KRW (see ``fetch_rate_snapshot`` for conversion).
+
+    Given ``known_ids`` this is a frontier crawl instead: only the store's
+    newest-first categories are read, each up to the first run of known
+    products, so a check with nothing new costs a request or two. The result
+    then holds only the products seen, not the whole catalog.
+
+    With ``parse_workers`` (default: ``parse_pool.workers()``) pages are
+    parsed in worker processes and the categories are crawled from up to
+    ``store.max_connections`` threads, so fetching and parsing overlap
+    (requests still go through the host's rate limit).
     Returns dict of product_no -> Product.
     """
     all_products: Dict[str, Product] = {}
-
-    # Fetch exchange rate once for the entire scraping session
-    logger.info("Fetching KRW → UAH exchange rate...")
-    exchange_rate = get_krw_to_uah_rate()
-    logger.info(f"Exchange rate: 1 KRW = {exchange_rate} UAH")
-
-    # Key categories that contain ALL products
-    # Using a subset that covers everything without too much overlap
-    key_categories = {
-        51: "NEW",
-        52: "BEST",
-        441: "상품 유형별 (By Type)",
-        454: "기능별 (By Function)",
-        466: "라인별 (By Line)",
-        501: "에이지알 (AGE-R)",
-        760: "PDRN 라인",
-    }
-
-    for cate_no, cat_name in key_categories.items():
-        logger.info(f"Scraping category: {cat_name} (cate_no={cate_no})...")
+    # Products extracted so far: the categories overlap, so most items of
+    # later categories are reused instead of parsed again
+    seen: Dict[str, Product] = {}
+
+    # Per-host connection pool and request budget for this store
+    http_pool.configure_host(store.host, store.max_connections, store.request_interval)
+
+    categories = store.crawl_categories
+    if known_ids is not None:
+        categories = {c: store.categories.get(c, str(c)) for c in store.recency_categories}
+        if not categories:
+            logger.warning(f"[{store.store_id}] No recency categories defined, doing a full crawl")
+            categories, known_ids = store.crawl_categories, None
+
+    if parse_workers is None:
+        parse_workers = parse_pool.workers()
+
+    def crawl(cate_no: int, cat_name: str) -> Dict[str, Product]:
+        logger.info(f"[{store.store_id}] Scraping category: {cat_name} (cate_no={cate_no})...")
+        with tracing.span("category", store=store.store_id, category=cate_no) as span:
+            cat_products = scrape_category(cate_no, cat_name, store=store, known_ids=known_ids,
+                                           seen=seen, parse_workers=parse_workers)
+            span.set(products=len(cat_products))
+        return cat_products
+
+    if parse_workers and len(categories) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=store.max_connections,
+                                thread_name_prefix="category") as pool:
+            futures = {cate_no: pool.submit(crawl, cate_no, cat_name)
+                       for cate_no, cat_name in categories.items()}
+        results = {cate_no: future.result for cate_no, future in futures.items()}
+    else:
+        results = {cate_no: functools.partial(crawl, cate_no, cat_name)
+                   for cate_no, cat_name in categories.items()}
+
+    # Merged in category order either way (a product keeps its last category)
+    for cate_no, cat_name in categories.items():
         try:
-            cat_products = scrape_category(cate_no, cat_name,
-                                           exchange_rate=exchange_rate)
+            cat_products = results[cate_no]()
             new_count = sum(1 for pid in cat_products if pid not in all_products)
             all_products.update(cat_products)
-            logger.info(f"  -> {len(cat_products)} products ({new_count} new unique)")
+            logger.info(f"  -> {cat_name}: {len(cat_products)} products ({new_count} new unique)")
         except Exception as e:
-            logger.error(f"Error scraping category {cat_name}: {e}")
+            metrics.ERRORS.inc(kind="category")
+            logger.error(f"[{store.store_id}] Error scraping category {cat_name}: {e}")
 
-        # Delay between categories
-        time.sleep(1)
-
-    logger.info(f"Total unique products found: {len(all_products)}")
+    logger.info(f"[{store.store_id}] Total unique products found: {len(all_products)}")
     return all_products
 
 
-def scrape_product_detail(product_no: str) -> Optional[dict]:
+def fetch_rate_snapshot() -> RateSnapshot:
+    """KRW → UAH rate for a check (taken from the replay archive when replaying)."""
+    logger.info("Fetching KRW → UAH exchange rate...")
+    archive = replay.active()
+    with tracing.span("currency"):
+        if archive is not None and archive.replaying and archive.exchange_rate:
+            snapshot = RateSnapshot(archive.exchange_rate, "replay", rates=archive.rates)
+        else:
+            snapshot = get_rate_snapshot()
+    if archive is not None and not archive.replaying:
+        archive.exchange_rate = snapshot.rate
+        archive.rates = snapshot.rates
+    metrics.EXCHANGE_RATE.set(snapshot.rate, pair="KRW/UAH")
+    logger.info(f"Exchange rate: 1 KRW = {snapshot.rate} UAH ({snapshot.rate_id})")
+    return snapshot
+
+
+def scrape_product_detail(product_no: str,
+                          store: StoreDefinition = MEDICUBE) -> Optional[dict]:
     """Scrape additional details for a specific product (optional enrichment)."""
-    url = f"{BASE_URL}/product/detail.html?product_no={product_no}"
+    url = store.detail_url(product_no)
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        metrics.count_request(url)
+        resp = http_pool.get(url, headers=HEADERS, timeout=20)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "html.parser")
 
@@ -8,6 +8,10 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Set
 
+from history import CheckHistory
+from locking import file_lock, write_json_atomic
+from rate_history import RATE_HISTORY_FILENAME, RateTable
+
 logger = logging.getLogger(__name__)
 
 # Default storage directory (next to this script)
@@ -15,16 +19,40 @@ DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dat
 
 
 class ProductStorage:
-    """Persistent storage for tracking known Medicube products."""
+    """
+    Persistent storage for tracking known products.
+
+    Products and check history live in a per-store namespace
+    (``data/stores/<namespace>/``); the default store keeps the original
+    top-level files. Config (chat IDs) is shared by all stores.
 
-    def __init__(self, data_dir: str = DEFAULT_DATA_DIR):
+    Every read-modify-write holds a cross-process file lock (one per store
+    directory, one for the shared config) and files are replaced atomically,
+    so concurrent runs against the same data directory don't lose updates.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, namespace: Optional[str] = None):
         self.data_dir = data_dir
-        self.products_file = os.path.join(data_dir, "known_products.json")
+        self.namespace = namespace
+        store_dir = os.path.join(data_dir, "stores", namespace) if namespace else data_dir
+        self.store_dir = store_dir
+        self.products_file = os.path.join(store_dir, "known_products.json")
         self.config_file = os.path.join(data_dir, "config.json")
-        self.history_file = os.path.join(data_dir, "check_history.json")
+        self.rates_file = os.path.join(data_dir, "rates.json")
+        self.rate_history_file = os.path.join(data_dir, RATE_HISTORY_FILENAME)
 
         # Ensure data directory exists
-        os.makedirs(data_dir, exist_ok=True)
+        os.makedirs(store_dir, exist_ok=True)
+        self._store_lock = file_lock(os.path.join(store_dir, ".store.lock"))
+        self._config_lock = file_lock(os.path.join(data_dir, ".config.lock"))
+        self.history = CheckHistory(store_dir, self._store_lock)
+
+    def for_store(self, store_id: str, default_store_id: str) -> "ProductStorage":
+        """Storage for another store sharing this data directory."""
+        namespace = None if store_id == default_store_id else store_id
+        if namespace == self.namespace:
+            return self
+        return ProductStorage(self.data_dir, namespace)
 
     # --- Products ---
 
@@ -42,8 +70,7 @@ class ProductStorage:
     def save_known_products(self, products: Dict[str, dict]) -> None:
         """Save the current set of known products."""
         try:
-            with open(self.products_file, "w", encoding="utf-8") as f:
-                json.dump(products, f, ensure_ascii=False, indent=2)
+            write_json_atomic(self.products_file, products, ensure_ascii=False, indent=2)
             logger.debug(f"Saved {len(products)} products to storage")
         except IOError as e:
             logger.error(f"Error saving products file: {e}")
@@ -65,27 +92,32 @@ class ProductStorage:
         }
         return new_products
 
-    def update_products(self, current_products: Dict[str, dict]) -> Dict[str, dict]:
+    def update_products(self, current_products: Dict[str, dict],
+                        rate_id: Optional[str] = None) -> Dict[str, dict]:
         """
         Update the stored products with current ones.
+        New products are stamped with ``first_seen`` and the exchange-rate
+        snapshot (``rate_id``) of that moment; known products keep theirs.
         Returns the new products that weren't known before.
         """
-        known = self.load_known_products()
-        new_products = {
-            pid: pdata
-            for pid, pdata in current_products.items()
-            if pid not in known
-        }
-
-        # Merge: update existing + add new
-        known.update(current_products)
-
-        # Add first_seen timestamp to new products
-        now = datetime.now().isoformat()
-        for pid in new_products:
-            known[pid]["first_seen"] = now
-
-        self.save_known_products(known)
+        with self._store_lock:
+            known = self.load_known_products()
+            new_products = {}
+            now = datetime.now().isoformat()
+            for pid, pdata in current_products.items():
+                previous = known.get(pid)
+                if previous is None:
+                    pdata["first_seen"] = now
+                    if rate_id:
+                        pdata["rate_id"] = rate_id
+                    new_products[pid] = pdata
+                else:
+                    for key in ("first_seen", "rate_id"):
+                        if key in previous:
+                            pdata.setdefault(key, previous[key])
+                known[pid] = pdata
+
+            self.save_known_products(known)
 
         return new_products
 
@@ -109,8 +141,7 @@ class ProductStorage:
     def save_config(self, config: dict) -> None:
         """Save configuration."""
         try:
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            write_json_atomic(self.config_file, config, ensure_ascii=False, indent=2)
         except IOError as e:
             logger.error(f"Error saving config: {e}")
 
@@ -121,24 +152,102 @@ class ProductStorage:
 
     def save_chat_ids(self, chat_ids: List[str]) -> None:
         """Save Telegram chat IDs."""
-        config = self.load_config()
-        config["chat_ids"] = list(set(chat_ids))  # deduplicate
-        self.save_config(config)
+        with self._config_lock:
+            config = self.load_config()
+            config["chat_ids"] = list(set(chat_ids))  # deduplicate
+            self.save_config(config)
 
     def add_chat_id(self, chat_id: str) -> None:
         """Add a new chat ID if not already present."""
-        chat_ids = self.get_chat_ids()
-        if chat_id not in chat_ids:
-            chat_ids.append(chat_id)
-            self.save_chat_ids(chat_ids)
-            logger.info(f"Added chat ID: {chat_id}")
+        with self._config_lock:
+            chat_ids = self.get_chat_ids()
+            if chat_id not in chat_ids:
+                chat_ids.append(chat_id)
+                self.save_chat_ids(chat_ids)
+                logger.info(f"Added chat ID: {chat_id}")
+
+    def get_chat_currencies(self) -> Dict[str, str]:
+        """Display currency chosen per chat ID (chats not listed use the default)."""
+        return self.load_config().get("chat_currencies", {})
+
+    def set_chat_currency(self, chat_id: str, currency: str) -> None:
+        """Choose the currency prices are shown in for one chat."""
+        with self._config_lock:
+            config = self.load_config()
+            config.setdefault("chat_currencies", {})[chat_id] = currency
+            self.save_config(config)
+            logger.info(f"Chat {chat_id} will see prices in {currency}")
+
+    # --- Exchange rates ---
+
+    def save_rate_snapshot(self, snapshot) -> None:
+        """
+        Record a ``currency.RateSnapshot`` so stored ``rate_id``s can be
+        resolved, and add its full rate vector to the historical rate table.
+        """
+        self.rate_table().record(snapshot)
+        with self._config_lock:
+            rates = {}
+            if os.path.exists(self.rates_file):
+                try:
+                    with open(self.rates_file, "r", encoding="utf-8") as f:
+                        rates = json.load(f)
+                except (json.JSONDecodeError, IOError) as e:
+                    logger.error(f"Error loading rates file: {e}")
+            if snapshot.rate_id in rates:
+                return
+            rates[snapshot.rate_id] = snapshot.to_dict()
+            try:
+                write_json_atomic(self.rates_file, rates, indent=1)
+            except IOError as e:
+                logger.error(f"Error saving rates file: {e}")
+
+    def rate_table(self) -> RateTable:
+        """Daily KRW → currency rate series (as-of lookups, bulk conversion)."""
+        return RateTable(self.rate_history_file)
+
+    # --- Schedule ---
+
+    def get_next_due(self, store_ids: List[str]) -> Optional[float]:
+        """
+        Earliest time (Unix timestamp) any of the stores is due for a check,
+        or None if one of them has never been checked.
+        """
+        due = self.load_config().get("next_due", {})
+        if any(sid not in due for sid in store_ids):
+            return None
+        return min(due[sid] for sid in store_ids)
+
+    def set_next_due(self, store_ids: List[str], timestamp: float) -> None:
+        """Remember when the stores need their next check."""
+        with self._config_lock:
+            config = self.load_config()
+            due = config.setdefault("next_due", {})
+            for sid in store_ids:
+                due[sid] = timestamp
+            self.save_config(config)
+
+    def get_last_full_crawl(self, store_id: str) -> Optional[float]:
+        """When the store's whole catalog was last crawled (Unix timestamp), if ever."""
+        return self.load_config().get("last_full_crawl", {}).get(store_id)
+
+    def set_last_full_crawl(self, store_id: str, timestamp: float) -> None:
+        with self._config_lock:
+            config = self.load_config()
+            config.setdefault("last_full_crawl", {})[store_id] = timestamp
+            self.save_config(config)
 
     # --- History ---
 
     def log_check(self, total_products: int, new_count: int,
-                  new_product_ids: Optional[List[str]] = None) -> None:
-        """Log a monitoring check to history."""
-        history = self._load_history()
+                  new_product_ids: Optional[List[str]] = None,
+                  timings: Optional[dict] = None,
+                  duration: Optional[float] = None,
+                  error: Optional[str] = None) -> None:
+        """
+        Log a monitoring check to history (with a trace summary if available).
+        ``error`` marks a failed check; ``duration`` is the check time in seconds.
+        """
         entry = {
             "timestamp": datetime.now().isoformat(),
             "total_products": total_products,
@@ -146,32 +255,22 @@ class ProductStorage:
         }
         if new_product_ids:
             entry["new_product_ids"] = new_product_ids
+        if timings:
+            entry["timings"] = timings
+        if duration is not None:
+            entry["duration_s"] = round(duration, 3)
+        if error:
+            entry["error"] = error
 
-        history.append(entry)
-
-        # Keep last 100 entries
-        if len(history) > 100:
-            history = history[-100:]
-
-        self._save_history(history)
+        try:
+            self.history.append(entry)
+        except IOError as e:
+            logger.error(f"Error saving history: {e}")
 
     def get_last_check(self) -> Optional[dict]:
         """Get the most recent check entry."""
-        history = self._load_history()
-        return history[-1] if history else None
-
-    def _load_history(self) -> list:
-        if not os.path.exists(self.history_file):
-            return []
-        try:
-            with open(self.history_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
+        return self.history.last()
 
-    def _save_history(self, history: list) -> None:
-        try:
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-        except IOError as e:
-            logger.error(f"Error saving history: {e}")
+    def get_rollups(self, period: str = "daily") -> Dict[str, dict]:
+        """Per-day ('daily') or per-ISO-week ('weekly') check rollups."""
+        return self.history.rollups(period)
@@ -0,0 +1,216 @@
+"""
+Store definitions for Cafe24-based shops.
+
+A store bundles everything the scraper needs to know about one site: base
+URL, categories to crawl, CSS selectors and the price-title keywords used to
+pick the member/sale price. The built-in registry contains Medicube; more
+stores can be added in ``data/stores.json`` (a list of store dicts, missing
+keys fall back to the Cafe24 defaults).
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+STORES_FILENAME = "stores.json"
+
+# Standard Cafe24 mobile skin selectors
+CAFE24_SELECTORS = {
+    "item": ".description",
+    "link": ".thumbnail a[href*='product_no']",
+    "link_fallback": "a[href*='product_no']",
+    "name": ".name a",
+    "name_fallback": "a",
+    "price_rows": ".listInfo li.xans-record-",
+    "price_title": ".ptitle",
+    "image": ".thumbnail img",
+}
+
+# Price-title keywords: member price (preferred) and regular sale price
+CAFE24_PRICE_KEYWORDS = {
+    "member": "회원가",
+    "sale": "판매가",
+}
+
+CAFE24_LIST_PATH = "/product/list.html?cate_no={cate_no}&page={page}"
+CAFE24_DETAIL_PATH = "/product/detail.html?product_no={product_no}"
+
+
+class StoreDefinition:
+    """Everything needed to scrape one Cafe24 shop."""
+
+    def __init__(self, store_id: str, name: str, base_url: str,
+                 crawl_categories: Dict[int, str],
+                 categories: Optional[Dict[int, str]] = None,
+                 selectors: Optional[Dict[str, str]] = None,
+                 price_keywords: Optional[Dict[str, str]] = None,
+                 list_path: str = CAFE24_LIST_PATH,
+                 detail_path: str = CAFE24_DETAIL_PATH,
+                 max_pages: int = 5,
+                 request_interval: float = 0.5,
+                 max_connections: int = 2,
+                 layout_version: str = "cafe24-v1",
+                 recency_categories: Optional[List[int]] = None,
+                 known_run: int = 20):
+        self.store_id = store_id
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.crawl_categories = crawl_categories    # categories scraped each check
+        self.categories = categories or dict(crawl_categories)  # all known categories
+        self.selectors = {**CAFE24_SELECTORS, **(selectors or {})}
+        self.price_keywords = {**CAFE24_PRICE_KEYWORDS, **(price_keywords or {})}
+        self.list_path = list_path
+        self.detail_path = detail_path
+        self.max_pages = max_pages
+        self.request_interval = request_interval    # min seconds between requests to the host
+        self.max_connections = max_connections      # pooled connections to the host
+        self.layout_version = layout_version        # bump when selectors change (plan cache key)
+        # Categories listed newest-first: a frontier crawl reads only these and
+        # stops once known_run products in a row (or a whole page) are already known
+        self.recency_categories = list(recency_categories or [])
+        self.known_run = known_run
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.base_url).hostname or ""
+
+    def list_url(self, cate_no: int, page: int) -> str:
+        return self.base_url + self.list_path.format(cate_no=cate_no, page=page)
+
+    def detail_url(self, product_no: str) -> str:
+        return self.base_url + self.detail_path.format(product_no=product_no)
+
+    def to_dict(self) -> dict:
+        return {
+            "store_id": self.store_id,
+            "name": self.name,
+            "base_url": self.base_url,
+            "crawl_categories": {str(k): v for k, v in self.crawl_categories.items()},
+            "categories": {str(k): v for k, v in self.categories.items()},
+            "selectors": self.selectors,
+            "price_keywords": self.price_keywords,
+            "list_path": self.list_path,
+            "detail_path": self.detail_path,
+            "max_pages": self.max_pages,
+            "request_interval": self.request_interval,
+            "max_connections": self.max_connections,
+            "layout_version": self.layout_version,
+            "recency_categories": self.recency_categories,
+            "known_run": self.known_run,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StoreDefinition":
+        def int_keys(d):
+            return {int(k): v for k, v in (d or {}).items()}
+
+        return cls(
+            store_id=data["store_id"],
+            name=data.get("name", data["store_id"]),
+            base_url=data["base_url"],
+            crawl_categories=int_keys(data["crawl_categories"]),
+            categories=int_keys(data.get("categories")) or None,
+            selectors=data.get("selectors"),
+            price_keywords=data.get("price_keywords"),
+            list_path=data.get("list_path", CAFE24_LIST_PATH),
+            detail_path=data.get("detail_path", CAFE24_DETAIL_PATH),
+            max_pages=data.get("max_pages", 5),
+            request_interval=data.get("request_interval", 0.5),
+            max_connections=data.get("max_connections", 2),
+            layout_version=data.get("layout_version", "cafe24-v1"),
+            recency_categories=data.get("recency_categories"),
+            known_run=data.get("known_run", 20),
+        )
+
+    def __repr__(self):
+        return f"StoreDefinition({self.store_id}: {self.base_url})"
+
+
+MEDICUBE = StoreDefinition(
+    store_id="medicube",
+    name="Medicube",
+    base_url="https://m.themedicube.co.kr",
+    # Key categories that contain ALL products
+    # Using a subset that covers everything without too much overlap
+    crawl_categories={
+        51: "NEW",
+        52: "BEST",
+        441: "상품 유형별 (By Type)",
+        454: "기능별 (By Function)",
+        466: "라인별 (By Line)",
+        501: "에이지알 (AGE-R)",
+        760: "PDRN 라인",
+    },
+    # NEW is sorted newest-first; BEST is by sales, so it can't be cut short
+    recency_categories=[51],
+    # All known product categories on the site
+    categories={
+        # Top-level categories
+        44: "PRODUCT (All)",
+        51: "NEW",
+        52: "BEST",
+        # Line-based categories
+        47: "RED LINE",
+        57: "ZERO LINE",
+        414: "SUPER CICA LINE",
+        264: "BLUE LINE",
+        307: "DEEP LINE",
+        760: "PDRN 라인",
+        # Product type categories
+        441: "상품 유형별",
+        442: "클렌징",
+        444: "패드",
+        445: "스킨/토너",
+        446: "앰플/세럼",
+        447: "크림",
+        448: "선 케어",
+        449: "메이크업",
+        450: "마스크팩",
+        451: "바디",
+        452: "헤어",
+        603: "디바이스",
+        # Function-based categories
+        454: "기능별",
+        458: "탄력/미백",
+        460: "민감/진정",
+        466: "라인별",
+        501: "에이지알",
+        90: "SET",
+        93: "TOOL",
+    },
+)
+
+DEFAULT_STORE_ID = MEDICUBE.store_id
+
+STORES: Dict[str, StoreDefinition] = {MEDICUBE.store_id: MEDICUBE}
+
+
+def register_store(store: StoreDefinition) -> None:
+    """Add (or replace) a store in the registry."""
+    STORES[store.store_id] = store
+
+
+def load_stores(data_dir: str) -> Dict[str, StoreDefinition]:
+    """Register stores from ``data_dir/stores.json`` and return the registry."""
+    path = os.path.join(data_dir, STORES_FILENAME)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for entry in json.load(f):
+                    register_store(StoreDefinition.from_dict(entry))
+        except (json.JSONDecodeError, IOError, KeyError, TypeError) as e:
+            logger.error(f"Error loading {STORES_FILENAME}: {e}")
+    return STORES
+
+
+def get_store(store_id: str) -> StoreDefinition:
+    """Look up a store by ID. Raises KeyError for unknown stores."""
+    return STORES[store_id]
+
+
+def list_store_ids() -> List[str]:
+    return list(STORES)
@@ -3,8 +3,13 @@ Telegram bot module for sending Medicube product notifications.
 """
 
 import logging
+import threading
+import time
 import requests
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
+
+import metrics
+from currency import DEFAULT_CURRENCY, format_amount, format_krw
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +19,19 @@ class TelegramBot:
 
     API_BASE = "https://api.telegram.org/bot{token}"
 
-    def __init__(self, token: str, chat_ids: Optional[List[str]] = None):
+    def __init__(self, token: str, chat_ids: Optional[List[str]] = None,
+                 on_discover: Optional[Callable[[List[str]], None]] = None,
+                 chat_currencies: Optional[Dict[str, str]] = None):
         self.token = token
         self.chat_ids = chat_ids or []
+        # Display currency per chat (DEFAULT_CURRENCY for chats not listed)
+        self.chat_currencies = chat_currencies or {}
         self.api_url = self.API_BASE.format(token=token)
+        # With no chat IDs, discovery runs on the first broadcast instead of at startup;
+        # on_discover receives the IDs found (e.g. to persist them)
+        self.on_discover = on_discover
+        self._discovery_pending = on_discover is not None and not self.chat_ids
+        self._discovery_lock = threading.Lock()
 
     def verify(self) -> bool:
         """Verify the bot token is valid."""
@@ -69,11 +83,32 @@ class TelegramBot:
             logger.error(f"Error discovering chat IDs: {e}")
             return []
 
+    def ensure_chat_ids(self) -> List[str]:
+        """Chat IDs to notify, discovering them once on first use if none are configured."""
+        if self._discovery_pending:
+            with self._discovery_lock:
+                if self._discovery_pending:
+                    self._discovery_pending = False
+                    logger.info("No chat IDs configured, trying to discover...")
+                    discovered = self.discover_chat_ids()
+                    if discovered:
+                        self.chat_ids = discovered
+                        self.on_discover(discovered)
+                        logger.info(f"Discovered {len(discovered)} chat(s)")
+                    else:
+                        logger.warning(
+                            "No chat IDs found! Send /start to @KoreanEonni_bot first, "
+                            "then run with --setup. Continuing without notifications."
+                        )
+        return self.chat_ids
+
     def send_message(self, chat_id: str, text: str,
                      parse_mode: str = "HTML",
                      disable_web_page_preview: bool = False) -> bool:
         """Send a text message to a specific chat."""
+        started = time.perf_counter()
         try:
+            metrics.count_request(self.api_url)
             resp = requests.post(
                 f"{self.api_url}/sendMessage",
                 json={
@@ -88,45 +123,70 @@ class TelegramBot:
             if data.get("ok"):
                 return True
             else:
+                metrics.ERRORS.inc(kind="telegram")
                 logger.error(f"Failed to send message to {chat_id}: {data}")
                 return False
         except Exception as e:
+            metrics.ERRORS.inc(kind="telegram")
             logger.error(f"Error sending message to {chat_id}: {e}")
             return False
+        finally:
+            metrics.TELEGRAM_SEND.observe(time.perf_counter() - started)
 
     def broadcast(self, text: str, **kwargs) -> int:
         """Send a message to all known chat IDs. Returns count of successful sends."""
         success = 0
-        for chat_id in self.chat_ids:
+        for chat_id in self.ensure_chat_ids():
             if self.send_message(chat_id, text, **kwargs):
                 success += 1
         return success
 
-    def send_new_product_alert(self, product: dict) -> int:
+    def currency_groups(self) -> Dict[str, List[str]]:
+        """Chats to notify, grouped by display currency."""
+        groups: Dict[str, List[str]] = {}
+        for chat_id in self.ensure_chat_ids():
+            currency = self.chat_currencies.get(chat_id, DEFAULT_CURRENCY)
+            groups.setdefault(currency, []).append(chat_id)
+        return groups
+
+    def send_new_product_alert(self, product: dict, store_name: str = "Medicube",
+                               prices: Optional[Dict[str, Optional[float]]] = None) -> int:
         """
         Send a formatted new product notification to all chats.
-        product dict should have: name, url, price_uah, price_krw, product_no, category
+        product dict should have: name, url, price_krw (int), product_no, category.
+        ``prices`` maps display currency -> already converted price; the
+        message is rendered once per currency group (see ``currency_groups``).
         """
+        success = 0
+        for currency, chat_ids in self.currency_groups().items():
+            text = self._render_alert(product, store_name, currency,
+                                      (prices or {}).get(currency))
+            for chat_id in chat_ids:
+                if self.send_message(chat_id, text):
+                    success += 1
+        return success
+
+    def _render_alert(self, product: dict, store_name: str, currency: str,
+                      price: Optional[float]) -> str:
         name = product.get("name", "Unknown")
         url = product.get("url", "")
-        price_uah = product.get("price_uah", "")
-        price_krw = product.get("price_krw", "")
+        price_krw = product.get("price_krw")
         product_no = product.get("product_no", "")
         category = product.get("category", "")
 
         lines = [
-            "🆕 <b>Новий товар на Medicube!</b>",
+            f"🆕 <b>Новий товар на {_escape_html(store_name)}!</b>",
             "",
             f"📦 <b>{_escape_html(name)}</b>",
         ]
 
-        if price_uah:
-            price_line = f"💰 Ціна: <b>{_escape_html(price_uah)}</b>"
-            if price_krw:
-                price_line += f" ({_escape_html(price_krw)})"
+        if price is not None and currency != "KRW":
+            price_line = f"💰 Ціна: <b>{format_amount(price, currency)}</b>"
+            if price_krw is not None:
+                price_line += f" ({format_krw(price_krw)})"
             lines.append(price_line)
-        elif price_krw:
-            lines.append(f"💰 Ціна: {_escape_html(price_krw)}")
+        elif price_krw is not None:
+            lines.append(f"💰 Ціна: {format_krw(price_krw)}")
 
         if category:
             lines.append(f"📂 Категорія: {_escape_html(category)}")
@@ -136,21 +196,23 @@ class TelegramBot:
         if url:
             lines.append(f"\n<a href=\"{url}\">👉 Перейти до товару</a>")
 
-        text = "\n".join(lines)
-        return self.broadcast(text)
+        return "\n".join(lines)
 
-    def send_summary(self, new_count: int, total_count: int) -> int:
+    def send_summary(self, new_count: int, total_count: int,
+                     store_name: str = "Medicube",
+                     store_url: str = "https://m.themedicube.co.kr/") -> int:
         """Send a monitoring summary message."""
+        name = _escape_html(store_name)
         if new_count > 0:
             text = (
-                f"📊 <b>Моніторинг Medicube завершено</b>\n\n"
+                f"📊 <b>Моніторинг {name} завершено</b>\n\n"
                 f"🆕 Нових товарів: <b>{new_count}</b>\n"
                 f"📦 Всього товарів на сайті: <b>{total_count}</b>\n\n"
-                f"🌐 <a href=\"https://m.themedicube.co.kr/\">Перейти на сайт</a>"
+                f"🌐 <a href=\"{store_url}\">Перейти на сайт</a>"
             )
         else:
             text = (
-                f"📊 <b>Моніторинг Medicube завершено</b>\n\n"
+                f"📊 <b>Моніторинг {name} завершено</b>\n\n"
                 f"✅ Нових товарів не знайдено\n"
                 f"📦 Всього товарів на сайті: <b>{total_count}</b>"
             )
@@ -0,0 +1,226 @@
+"""
+Lightweight per-stage tracing for monitor checks.
+
+Spans are recorded only while a trace is active (see ``begin_trace``).
+When tracing is disabled ``span()`` returns a shared no-op object, so the
+instrumented code paths cost a single global lookup.
+
+Finished traces are appended as JSON lines to ``traces.jsonl`` in the
+data directory, one line per span.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILENAME = "traces.jsonl"
+
+
+class _NullSpan:
+    """Span stand-in used when tracing is disabled."""
+
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def add(self, key: str, value: float) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A single timed stage of a check."""
+
+    __slots__ = ("tracer", "name", "span_id", "parent_id", "attrs",
+                 "start", "duration", "error")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = os.urandom(8).hex()     # (not uuid: keeps platform off the cold start)
+        self.parent_id: Optional[str] = None
+        self.attrs = attrs
+        self.start = 0.0
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set(self, **attrs) -> None:
+        """Attach attributes (e.g. bytes, product counts) to the span."""
+        self.attrs.update(attrs)
+
+    def add(self, key: str, value: float) -> None:
+        """Increment a numeric attribute."""
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        if stack:
+            self.parent_id = stack[-1].span_id
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self) -> dict:
+        data = {
+            "trace_id": self.tracer.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start - self.tracer.started) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class Tracer:
+    """Collects spans for one check. Thread-safe; parents are tracked per thread."""
+
+    def __init__(self, output_path: Optional[str] = None):
+        self.trace_id = os.urandom(16).hex()
+        self.output_path = output_path
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def span(self, name: str, **attrs) -> Span:
+        return Span(self, name, attrs)
+
+    def summary(self) -> dict:
+        """
+        Aggregate finished spans into a compact dict suitable for check history:
+        total time per stage, per-category time, pages fetched and bytes downloaded.
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        stages: Dict[str, dict] = {}
+        categories: Dict[str, float] = {}
+        bytes_downloaded = 0
+        pages = 0
+        for s in spans:
+            stage = stages.setdefault(s.name, {"count": 0, "ms": 0.0})
+            stage["count"] += 1
+            stage["ms"] += s.duration * 1000
+            if s.name == "fetch":
+                pages += 1
+                bytes_downloaded += s.attrs.get("bytes", 0)
+            elif s.name == "category":
+                key = str(s.attrs.get("category", ""))
+                if "store" in s.attrs:
+                    key = f"{s.attrs['store']}:{key}"
+                categories[key] = categories.get(key, 0.0) + s.duration * 1000
+
+        for stage in stages.values():
+            stage["ms"] = round(stage["ms"], 1)
+
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages": stages,
+            "categories": {k: round(v, 1) for k, v in categories.items()},
+            "pages": pages,
+            "bytes_downloaded": bytes_downloaded,
+        }
+
+    def flush(self) -> None:
+        """Append all finished spans to the JSON lines file."""
+        if not self.output_path:
+            return
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        try:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                for s in spans:
+                    f.write(json.dumps(s.to_dict(), ensure_ascii=False))
+                    f.write("\n")
+        except IOError as e:
+            logger.error(f"Error writing trace file: {e}")
+
+
+# --- Module-level active trace ---
+
+_enabled_dir: Optional[str] = None
+_active: Optional[Tracer] = None
+
+
+def enable(data_dir: str) -> None:
+    """Turn tracing on; traces will be written to ``data_dir/traces.jsonl``."""
+    global _enabled_dir
+    _enabled_dir = data_dir
+
+
+def is_enabled() -> bool:
+    return _enabled_dir is not None
+
+
+def begin_trace() -> Optional[Tracer]:
+    """Start a new trace if tracing is enabled. Returns the tracer or None."""
+    global _active
+    if _enabled_dir is None:
+        return None
+    _active = Tracer(os.path.join(_enabled_dir, TRACE_FILENAME))
+    return _active
+
+
+def end_trace() -> Optional[dict]:
+    """Finish the active trace, write it out and return its summary."""
+    global _active
+    tracer = _active
+    if tracer is None:
+        return None
+    _active = None
+    tracer.flush()
+    return tracer.summary()
+
+
+def span(name: str, **attrs):
+    """Open a span on the active trace (no-op when no trace is active)."""
+    tracer = _active
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, **attrs)
+
+
+def summary() -> Optional[dict]:
+    """Summary of the spans finished so far in the active trace."""
+    tracer = _active
+    return tracer.summary() if tracer is not None else None
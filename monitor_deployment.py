@@ -1,55 +1,36 @@
 """
 Monitor deployment and notify when ready
 """
-import requests
-import time
+from deployment_resolver import ERROR, CANCELED
+from deployment_watcher import DeploymentWatcher
+from url_probe import candidate_urls
 
 REPO_NAME = "ai-video-website"
 USERNAME = "algotcha-project"
 
-URLS_TO_CHECK = [
-    f"https://{REPO_NAME}.vercel.app",
-    f"https://{REPO_NAME}-{USERNAME}.vercel.app",
-]
-
-def check_if_live(url):
-    """Check if URL is live with our content"""
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            content = response.text.lower()
-            keywords = ['відео', 'фотографій', 'ai-відео', 'замовлення', 'весілля', 'ai video', 'custom']
-            if any(kw in content for kw in keywords):
-                return True
-    except:
-        pass
-    return False
+URLS_TO_CHECK = candidate_urls(REPO_NAME, USERNAME)[:2]
 
 print("Monitoring deployment...")
-print("This will check every 15 seconds for up to 5 minutes...")
+print("Polling with backoff (1s, 2s, 4s ... 15s) for up to 5 minutes...")
 print()
 
-start_time = time.time()
-max_wait = 300  # 5 minutes
+watcher = DeploymentWatcher(candidates=URLS_TO_CHECK, max_wait=300)
+url = watcher.watch()
+watcher.print_report()
 
-while time.time() - start_time < max_wait:
-    for url in URLS_TO_CHECK:
-        if check_if_live(url):
-            print("\n" + "="*70)
-            print("SUCCESS! YOUR SITE IS LIVE!")
-            print("="*70)
-            print(f"\nYour live website:")
-            print(f"  {url}")
-            print()
-            exit(0)
-    
-    elapsed = int(time.time() - start_time)
-    if elapsed % 15 == 0:
-        print(f"Still deploying... ({elapsed}s)")
-    
-    time.sleep(15)
+if url:
+    print("\n" + "="*70)
+    print("SUCCESS! YOUR SITE IS LIVE!")
+    print("="*70)
+    print(f"\nYour live website:")
+    print(f"  {url}")
+    print()
+    exit(0)
 
-print("\nTimeout reached. Please check manually:")
+if watcher.state in (ERROR, CANCELED):
+    print(f"\nDeployment {watcher.state}. Please check the build logs:")
+else:
+    print("\nTimeout reached. Please check manually:")
 print("  https://vercel.com/dashboard")
 for url in URLS_TO_CHECK:
     print(f"  {url}")
@@ -0,0 +1,367 @@
+"""
+Performance budget check for the deployed site (no browser needed)
+
+Fetches the HTML of each page (/ and /admin by default), resolves every
+referenced script, stylesheet, image and font concurrently (fonts and
+images referenced from CSS included), and reports transfer size, request
+count, compression and cache headers. The result is checked against
+perf-budget.json and against the previous run (.vercel/perf-baseline.json),
+so growth beyond ``max_regression_pct`` fails too.
+
+The target can be a URL (a deployment, or a local ``next start`` on
+http://localhost:3000) or a directory with a static export, which is
+served on a temporary local port. A local directory server sets no
+Content-Encoding or Cache-Control, so those checks only apply to URLs.
+
+Usage:
+    python perf_budget.py https://ai-video-website.vercel.app
+    python perf_budget.py http://localhost:3000 --save-baseline
+    python perf_budget.py out/
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROJECT_DIR = Path(__file__).parent
+BUDGET_FILE = PROJECT_DIR / "perf-budget.json"
+BASELINE_PATH = PROJECT_DIR / ".vercel" / "perf-baseline.json"
+DEFAULT_PATHS = ("/", "/admin")
+WORKERS = 16
+TIMEOUT = 15
+# Text responses smaller than this are not expected to be compressed
+COMPRESS_MIN_BYTES = 1024
+TEXT_KINDS = {"document", "script", "stylesheet"}
+
+_CSS_URL = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+_EXT_KINDS = {
+    '.js': 'script', '.mjs': 'script', '.css': 'stylesheet',
+    '.woff': 'font', '.woff2': 'font', '.ttf': 'font', '.otf': 'font', '.eot': 'font',
+    '.png': 'image', '.jpg': 'image', '.jpeg': 'image', '.gif': 'image', '.svg': 'image',
+    '.webp': 'image', '.avif': 'image', '.ico': 'image',
+}
+
+def kind_for(url, default="other"):
+    return _EXT_KINDS.get(os.path.splitext(urlsplit(url).path)[1].lower(), default)
+
+class _AssetParser(HTMLParser):
+    """Collects (url, kind) pairs referenced from an HTML document"""
+
+    def __init__(self):
+        super().__init__()
+        self.refs = []
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "script" and a.get("src"):
+            self.refs.append((a["src"], "script"))
+        elif tag == "link" and a.get("href"):
+            rel = (a.get("rel") or "").lower().split()
+            if "stylesheet" in rel:
+                self.refs.append((a["href"], "stylesheet"))
+            elif "preload" in rel or "modulepreload" in rel:
+                kind = {"style": "stylesheet", "script": "script", "font": "font",
+                        "image": "image"}.get(a.get("as", ""), kind_for(a["href"]))
+                self.refs.append((a["href"], kind))
+            elif "icon" in rel or "apple-touch-icon" in rel:
+                self.refs.append((a["href"], "image"))
+        elif tag == "img" and a.get("src"):
+            self.refs.append((a["src"], "image"))
+        elif tag == "video" and a.get("poster"):
+            self.refs.append((a["poster"], "image"))
+
+class Resource:
+    """One fetched response, sized as it went over the wire"""
+
+    def __init__(self, url, kind):
+        self.url = url
+        self.kind = kind
+        self.status = None
+        self.transfer_bytes = 0     # encoded body size
+        self.size = 0               # decoded body size (None if it can't be decoded)
+        self.encoding = ""
+        self.cache_control = ""
+        self.elapsed = 0.0
+        self.error = None
+        self.text = None            # decoded body, kept for documents and stylesheets
+
+    @property
+    def compressed(self):
+        return self.encoding in ("br", "gzip", "deflate", "zstd")
+
+def _decode(body, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    if encoding == "br":
+        return brotli.decompress(body) if brotli is not None else None
+    return body
+
+class PageAudit:
+    def __init__(self, path, document, assets):
+        self.path = path
+        self.document = document
+        self.assets = assets
+
+    @property
+    def resources(self):
+        return [self.document, *self.assets]
+
+    @property
+    def total_bytes(self):
+        return sum(r.transfer_bytes for r in self.resources)
+
+    @property
+    def requests(self):
+        return len(self.resources)
+
+    def bytes_by_kind(self):
+        totals = {}
+        for r in self.resources:
+            totals[r.kind] = totals.get(r.kind, 0) + r.transfer_bytes
+        return totals
+
+    def summary(self):
+        return {"total_bytes": self.total_bytes, "requests": self.requests,
+                "by_kind": self.bytes_by_kind()}
+
+class PerfAuditor:
+    """Fetches pages and their assets concurrently; each URL is fetched once per run"""
+
+    def __init__(self, base_url, session=None, workers=WORKERS, timeout=TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        encodings = "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+        self.session.headers["Accept-Encoding"] = encodings
+        self.workers = workers
+        self.timeout = timeout
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url, kind):
+        with self._lock:
+            if url in self._cache:
+                return self._cache[url]
+        resource = Resource(url, kind)
+        started = time.perf_counter()
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                body = response.raw.read(decode_content=False)
+                resource.status = response.status_code
+                resource.transfer_bytes = len(body)
+                resource.encoding = response.headers.get("Content-Encoding", "").lower()
+                resource.cache_control = response.headers.get("Cache-Control", "")
+                decoded = _decode(body, resource.encoding)
+                resource.size = len(decoded) if decoded is not None else None
+                if kind in ("document", "stylesheet") and decoded is not None:
+                    resource.text = decoded.decode(response.encoding or "utf-8", errors="replace")
+        except (requests.RequestException, OSError, zlib.error) as e:
+            resource.error = f"{type(e).__name__}: {e}"
+        resource.elapsed = time.perf_counter() - started
+        with self._lock:
+            self._cache[url] = resource
+        return resource
+
+    def _fetch_all(self, pool, refs):
+        futures = [pool.submit(self.fetch, url, kind) for url, kind in refs]
+        return [f.result() for f in futures]
+
+    def audit_page(self, path, pool):
+        page_url = urljoin(self.base_url + "/", path.lstrip("/"))
+        document = self.fetch(page_url, "document")
+        if document.text is None:
+            return PageAudit(path, document, [])
+
+        parser = _AssetParser()
+        parser.feed(document.text)
+        refs = list(dict.fromkeys(
+            (urljoin(page_url, url), kind) for url, kind in parser.refs
+            if not url.startswith("data:")))
+        assets = self._fetch_all(pool, refs)
+
+        # Second wave: fonts and images referenced from the stylesheets
+        nested = []
+        for sheet in assets:
+            if sheet.kind == "stylesheet" and sheet.text:
+                for url in _CSS_URL.findall(sheet.text):
+                    if not url.startswith("data:"):
+                        full = urljoin(sheet.url, url)
+                        nested.append((full, kind_for(full, "font")))
+        seen = {url for url, _ in refs}
+        nested = [ref for ref in dict.fromkeys(nested) if ref[0] not in seen]
+        assets += self._fetch_all(pool, nested)
+        return PageAudit(path, document, assets)
+
+    def audit(self, paths=DEFAULT_PATHS):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            page_pool = ThreadPoolExecutor(max_workers=len(paths))
+            with page_pool:
+                futures = [page_pool.submit(self.audit_page, path, pool) for path in paths]
+                return [f.result() for f in futures]
+
+def serve_directory(directory):
+    """Serve a static export on a free local port; returns (base_url, server)"""
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def translate_path(self, path):
+            # Static exports write /admin as admin.html
+            local = super().translate_path(path)
+            if not os.path.exists(local) and os.path.exists(local + ".html"):
+                return local + ".html"
+            return local
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+def load_json(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def check_budget(audits, budget, check_headers=True):
+    """
+    List of human-readable violations of the budget file (compression and
+    immutable caching only with ``check_headers``: a real server answered)
+    """
+    violations = []
+    page_budgets = budget.get("pages", {})
+    for audit in audits:
+        limits = page_budgets.get(audit.path, page_budgets.get("*", {}))
+        if audit.document.status != 200:
+            violations.append(f"{audit.path}: HTTP {audit.document.status or audit.document.error}")
+            continue
+        if "max_bytes" in limits and audit.total_bytes > limits["max_bytes"]:
+            violations.append(f"{audit.path}: {audit.total_bytes:,} B > {limits['max_bytes']:,} B")
+        if "max_requests" in limits and audit.requests > limits["max_requests"]:
+            violations.append(f"{audit.path}: {audit.requests} requests > {limits['max_requests']}")
+        for kind, limit in limits.get("max_kind_bytes", {}).items():
+            size = audit.bytes_by_kind().get(kind, 0)
+            if size > limit:
+                violations.append(f"{audit.path}: {kind} {size:,} B > {limit:,} B")
+
+    require_compression = set(budget.get("require_compression", TEXT_KINDS)) if check_headers else set()
+    immutable_prefixes = budget.get("require_immutable", []) if check_headers else []
+    max_asset = budget.get("max_asset_bytes", {})
+    checked = set()
+    for audit in audits:
+        for r in audit.resources:
+            if r.url in checked:
+                continue
+            checked.add(r.url)
+            if r.error or (r.status and r.status >= 400):
+                violations.append(f"{r.url}: {r.error or f'HTTP {r.status}'}")
+                continue
+            if (r.kind in require_compression and not r.compressed
+                    and r.transfer_bytes >= COMPRESS_MIN_BYTES):
+                violations.append(f"{r.url}: {r.kind} served uncompressed ({r.transfer_bytes:,} B)")
+            if r.kind in max_asset and r.transfer_bytes > max_asset[r.kind]:
+                violations.append(f"{r.url}: {r.transfer_bytes:,} B > {max_asset[r.kind]:,} B")
+            path = urlsplit(r.url).path
+            if (any(path.startswith(p) for p in immutable_prefixes)
+                    and "immutable" not in r.cache_control):
+                violations.append(f"{r.url}: missing immutable Cache-Control ({r.cache_control or 'none'})")
+    return violations
+
+def check_regressions(audits, baseline, max_pct):
+    """Violations for pages that grew more than max_pct since the baseline"""
+    violations = []
+    for audit in audits:
+        before = baseline.get(audit.path)
+        if not before:
+            continue
+        for key in ("total_bytes", "requests"):
+            old, new = before[key], audit.summary()[key]
+            if old and new > old * (1 + max_pct / 100):
+                violations.append(f"{audit.path}: {key} {old:,} -> {new:,} "
+                                  f"(+{(new - old) / old * 100:.0f}%, limit {max_pct}%)")
+    return violations
+
+def print_report(audits):
+    for audit in audits:
+        print(f"\n{audit.path}  {audit.requests} requests, {audit.total_bytes:,} B transferred")
+        for kind, size in sorted(audit.bytes_by_kind().items(), key=lambda kv: -kv[1]):
+            print(f"  {kind:<11} {size:>10,} B")
+        for r in sorted(audit.resources, key=lambda r: -r.transfer_bytes):
+            status = r.error or r.status
+            cache = r.cache_control or "-"
+            print(f"    {r.transfer_bytes:>9,} B  {r.encoding or 'identity':<8} "
+                  f"{str(status):<4} {cache[:40]:<40} {urlsplit(r.url).path}")
+
+def run_audit(target, paths=DEFAULT_PATHS, budget_path=BUDGET_FILE,
+              baseline_path=BASELINE_PATH, save_baseline=False, verbose=True):
+    """Audit ``target`` (URL or static export dir); returns (audits, violations)"""
+    server = None
+    local = os.path.isdir(target)
+    if local:
+        target, server = serve_directory(target)
+    try:
+        started = time.perf_counter()
+        audits = PerfAuditor(target).audit(paths)
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    budget = load_json(budget_path)
+    baseline = load_json(baseline_path)
+    violations = check_budget(audits, budget, check_headers=not local)
+    violations += check_regressions(audits, baseline, budget.get("max_regression_pct", 10))
+
+    if verbose:
+        print_report(audits)
+        print(f"\nAudited {len(audits)} pages in {elapsed * 1000:.0f} ms")
+        if local:
+            print("  (static export: compression and cache headers not checked)")
+        for v in violations:
+            print(f"  ✗ {v}")
+        if not violations:
+            print("  ✓ within budget")
+
+    if save_baseline and not violations:
+        path = Path(baseline_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({a.path: a.summary() for a in audits}, indent=1),
+                        encoding="utf-8")
+    return audits, violations
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check page weight against perf-budget.json")
+    parser.add_argument("target", help="Site URL or static export directory")
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="Page path to audit (repeatable, default: / and /admin)")
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Record this run as the regression baseline if it passes")
+    args = parser.parse_args(argv)
+
+    _, violations = run_audit(args.target, tuple(args.paths or DEFAULT_PATHS),
+                              args.budget, args.baseline, args.save_baseline)
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Tests for deployment_resolver with a fake requests session (no network).
+
+Run with: python -m pytest test_deployment_resolver.py
+"""
+import deployment_resolver
+from deployment_resolver import DeploymentResolver, backoff_delays, READY, BUILDING, QUEUED
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """Answers GETs from a {url suffix: response or list of responses} table"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        for suffix, response in self.routes.items():
+            if url.endswith(suffix):
+                if isinstance(response, list):
+                    return response.pop(0) if len(response) > 1 else response[0]
+                return response
+        return FakeResponse(404, {})
+
+def make_resolver(routes, vercel_token="token"):
+    session = FakeSession(routes)
+    resolver = DeploymentResolver(vercel_token=vercel_token, github_token="",
+                                  team_id="", vercel_api="https://vercel.test",
+                                  github_api="https://github.test", session=session)
+    return resolver, session
+
+def vercel_deployment(uid, sha, state=READY, created=2_000_000_000_000):
+    return {"uid": uid, "url": f"{uid}.vercel.app", "state": state,
+            "created": created, "meta": {"githubCommitSha": sha}}
+
+GITHUB_DEPLOYMENTS = "/repos/algotcha-project/ai-video-website/deployments"
+
+def github_routes(state="success", created_at="2033-05-18T03:33:20Z"):
+    return {
+        f"{GITHUB_DEPLOYMENTS}/7/statuses": FakeResponse(200, [
+            {"state": state, "environment_url": "https://gh.vercel.app"}]),
+        GITHUB_DEPLOYMENTS: FakeResponse(200, [{"id": 7, "created_at": created_at}]),
+    }
+
+# --- resolve ---
+
+def test_resolve_latest_from_vercel_v6():
+    resolver, session = make_resolver({
+        "/v6/deployments": FakeResponse(200, {"deployments": [vercel_deployment("dpl_a", "abc")]}),
+    })
+    found = resolver.resolve()
+    assert found.source == "vercel"
+    assert found.url == "https://dpl_a.vercel.app"
+    assert found.deployment_id == "dpl_a"
+    assert found.state == READY
+    assert session.calls[0][1]["limit"] == 1
+
+def test_resolve_filters_v6_by_sha_and_since():
+    resolver, session = make_resolver({
+        "/v6/deployments": FakeResponse(200, {"deployments": [
+            vercel_deployment("dpl_new", "other"),
+            vercel_deployment("dpl_ours", "abc", state=BUILDING),
+        ]}),
+    })
+    found = resolver.resolve(sha="abc", since=1_900_000_000)
+    assert found.deployment_id == "dpl_ours"
+    assert found.state == BUILDING
+    params = session.calls[0][1]
+    assert params["limit"] == 20
+    assert params["since"] == 1_900_000_000_000
+
+def test_resolve_ignores_deployment_older_than_since():
+    resolver, _ = make_resolver({
+        "/v6/deployments": FakeResponse(200, {"deployments": [
+            vercel_deployment("dpl_old", "abc", created=1_000_000_000_000)]}),
+        GITHUB_DEPLOYMENTS: FakeResponse(200, []),
+    })
+    assert resolver.resolve(since=1_900_000_000) is None
+
+def test_resolve_specific_deployment_uses_v13():
+    resolver, session = make_resolver({
+        "/v13/deployments/dpl_x.vercel.app": FakeResponse(200, {
+            "id": "dpl_x", "url": "dpl_x.vercel.app", "readyState": BUILDING}),
+    })
+    found = resolver.resolve(deployment="https://dpl_x.vercel.app")
+    assert found.deployment_id == "dpl_x"
+    assert found.state == BUILDING
+    assert len(session.calls) == 1
+
+def test_resolve_specific_deployment_never_falls_back_to_github():
+    resolver, session = make_resolver(github_routes())
+    assert resolver.resolve(deployment="dpl_missing") is None
+    assert not any(GITHUB_DEPLOYMENTS in url for url, _ in session.calls)
+
+def test_resolve_falls_back_to_github_without_vercel_token():
+    resolver, session = make_resolver(github_routes(), vercel_token="")
+    found = resolver.resolve(sha="abc")
+    assert found.source == "github"
+    assert found.url == "https://gh.vercel.app"
+    assert found.state == READY
+    assert found.deployment_id == "7"
+    assert session.calls[0][1]["sha"] == "abc"
+
+def test_resolve_falls_back_to_github_on_vercel_error():
+    routes = github_routes(state="in_progress")
+    routes["/v6/deployments"] = FakeResponse(500, {"error": "boom"})
+    resolver, _ = make_resolver(routes)
+    found = resolver.resolve()
+    assert found.source == "github"
+    assert found.state == BUILDING
+
+def test_github_deployment_older_than_since_is_ignored():
+    resolver, _ = make_resolver(github_routes(created_at="2001-09-09T01:46:40Z"), vercel_token="")
+    assert resolver.resolve(since=1_900_000_000) is None
+
+# --- backoff_delays ---
+
+def test_backoff_delays_grow_and_cap():
+    delays = backoff_delays(initial=1, factor=2, maximum=5, jitter=0)
+    assert [next(delays) for _ in range(5)] == [1, 2, 4, 5, 5]
+
+def test_backoff_delays_jitter_only_shortens():
+    delays = backoff_delays(initial=4, factor=1, maximum=4, jitter=0.5)
+    for _ in range(50):
+        assert 2 <= next(delays) <= 4
+
+# --- wait_until_final ---
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_wait_until_final_polls_until_ready(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(deployment_resolver.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(deployment_resolver.time, "sleep", clock.sleep)
+    resolver, _ = make_resolver({"/v6/deployments": [
+        FakeResponse(200, {"deployments": []}),
+        FakeResponse(200, {"deployments": [vercel_deployment("dpl_a", "abc", state=QUEUED)]}),
+        FakeResponse(200, {"deployments": [vercel_deployment("dpl_a", "abc", state=READY)]}),
+    ], GITHUB_DEPLOYMENTS: FakeResponse(200, [])})
+    found = resolver.wait_until_final(max_wait=60, delays=iter([1, 2, 3]), sha="abc")
+    assert found.state == READY
+    assert clock.sleeps == [1, 2]
+
+def test_wait_until_final_stops_at_max_wait(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(deployment_resolver.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(deployment_resolver.time, "sleep", clock.sleep)
+    resolver, _ = make_resolver({"/v6/deployments": FakeResponse(200, {
+        "deployments": [vercel_deployment("dpl_a", "abc", state=BUILDING)]})})
+    found = resolver.wait_until_final(max_wait=10, delays=backoff_delays(4, 2, 15, jitter=0))
+    assert found.state == BUILDING
+    assert clock.sleeps == [4, 6]   # the last sleep is cut to the time left
+    assert clock.now == 10
@@ -0,0 +1,184 @@
+"""
+Concurrent liveness probe for candidate deployment URLs.
+
+All candidates are requested at once and the first one whose body contains
+a marker unique to this site (its <title>, name or contact phone) wins;
+generic words and Next.js markers would also confirm someone else's app
+answering on a candidate URL. Bodies are streamed and reading
+stops as soon as a match is found, so a confirmed URL usually costs one
+small chunk instead of the full page. Verdicts are cached per URL for a
+short TTL so repeated checks within a script don't hit the network again.
+"""
+import codecs
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+REPO_NAME = "ai-video-website"
+USERNAME = "algotcha-project"
+BRANCH = "main"             # production branch (deploy_pipeline pushes here)
+
+# Strings only our site renders: the <title> from app/layout.tsx (in <head>,
+# so it arrives in the first chunk), the site name and phone from app/page.tsx
+SITE_KEYWORDS = (
+    'AI Відео з Фотографій | Професійні Відео на Замовлення',
+    'MemoriaAI',
+    '+380968753003',
+)
+
+CHUNK_SIZE = 8 * 1024
+MAX_BYTES = 512 * 1024      # stop reading a body after this much without a match
+DEFAULT_TIMEOUT = 10
+DEFAULT_TTL = 30            # seconds a positive verdict stays cached
+NEGATIVE_TTL = 5            # failures are retried sooner
+
+def candidate_urls(repo=REPO_NAME, owner=USERNAME, branch=BRANCH):
+    """Common Vercel URL patterns for the project (no duplicates, in priority order)"""
+    urls = [
+        f"https://{repo}.vercel.app",
+        f"https://{repo}-{owner}.vercel.app",
+        f"https://{repo}-git-{branch}-{owner}.vercel.app",
+    ]
+    return list(dict.fromkeys(urls))
+
+class ProbeResult:
+    """Verdict for one URL"""
+
+    def __init__(self, url, live, status=None, matched=None, final_url=None,
+                 bytes_read=0, elapsed=0.0, error=None):
+        self.url = url
+        self.live = live
+        self.status = status
+        self.matched = matched          # site marker that confirmed the page
+        self.final_url = final_url or url
+        self.bytes_read = bytes_read
+        self.elapsed = elapsed
+        self.error = error
+
+    def __bool__(self):
+        return self.live
+
+    def __repr__(self):
+        state = f"live ({self.matched!r})" if self.live else (self.error or f"HTTP {self.status}")
+        return f"ProbeResult({self.url}: {state}, {self.bytes_read} B, {self.elapsed * 1000:.0f} ms)"
+
+class UrlProbe:
+    """Checks candidate URLs concurrently with a streaming keyword scan and a TTL cache"""
+
+    def __init__(self, keywords=SITE_KEYWORDS, timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL, negative_ttl=NEGATIVE_TTL,
+                 max_bytes=MAX_BYTES, session=None):
+        self.needles = tuple(n.lower() for n in keywords)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.session = session or requests.Session()
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return None
+
+    def _store(self, result):
+        ttl = self.ttl if result.live else self.negative_ttl
+        with self._lock:
+            self._cache[result.url] = (time.monotonic() + ttl, result)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _scan(self, response):
+        """Read the body chunk by chunk until a needle shows up; returns (needle, bytes_read)"""
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        overlap = max(len(n) for n in self.needles) - 1
+        tail = ""
+        bytes_read = 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            bytes_read += len(chunk)
+            window = tail + decoder.decode(chunk).lower()
+            for needle in self.needles:
+                if needle in window:
+                    return needle, bytes_read
+            tail = window[-overlap:]
+            if bytes_read >= self.max_bytes:
+                break
+        return None, bytes_read
+
+    def probe(self, url):
+        """Check one URL (served from the cache while the verdict is fresh)"""
+        cached = self._cached(url)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        try:
+            with self.session.get(url, timeout=self.timeout, allow_redirects=True,
+                                  stream=True) as response:
+                if response.status_code != 200:
+                    result = ProbeResult(url, False, status=response.status_code,
+                                         final_url=response.url)
+                else:
+                    matched, bytes_read = self._scan(response)
+                    result = ProbeResult(url, matched is not None, status=200,
+                                         matched=matched, final_url=response.url,
+                                         bytes_read=bytes_read)
+        except requests.exceptions.RequestException as e:
+            result = ProbeResult(url, False, error=type(e).__name__)
+        result.elapsed = time.perf_counter() - started
+        self._store(result)
+        return result
+
+    def first_live(self, urls, verbose=True):
+        """
+        Probe all URLs concurrently and return the first live ProbeResult
+        (None if none of them is live). Slower probes are abandoned.
+        """
+        urls = list(dict.fromkeys(u for u in urls if '*' not in u))
+        if not urls:
+            return None
+        pool = ThreadPoolExecutor(max_workers=len(urls))
+        try:
+            futures = [pool.submit(self.probe, url) for url in urls]
+            for future in as_completed(futures):
+                result = future.result()
+                if verbose:
+                    print(f"  {result}")
+                if result.live:
+                    return result
+            return None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def check_all(self, urls):
+        """Probe all URLs concurrently and return every result, in input order"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            return list(pool.map(self.probe, urls))
+
+_default = None
+
+def default_probe():
+    """Shared probe (and verdict cache) for the current process"""
+    global _default
+    if _default is None:
+        _default = UrlProbe()
+    return _default
+
+def find_live_url(urls=None, verbose=True):
+    """First live URL among the candidates (defaults to the common Vercel patterns)"""
+    result = default_probe().first_live(urls or candidate_urls(), verbose=verbose)
+    return result.url if result else None
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    url = find_live_url()
+    print(f"\nLive URL: {url or 'not found'} ({(time.perf_counter() - started) * 1000:.0f} ms)")
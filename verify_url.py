@@ -1,29 +1,17 @@
 """
 Verify and get the working URL
 """
-import requests
-import time
+from deployment_watcher import DeploymentWatcher
+from url_probe import default_probe
 
 REPO_NAME = "ai-video-website"
 
 def verify_url(url):
     """Verify if URL is live and working"""
-    try:
-        response = requests.get(url, timeout=10, allow_redirects=True)
-        if response.status_code == 200:
-            content = response.text.lower()
-            # Check for Ukrainian keywords
-            ukrainian_keywords = ['відео', 'фотографій', 'ai-відео', 'замовлення', 'весілля', 'дні народження']
-            # Check for English keywords
-            english_keywords = ['ai video', 'photographs', 'custom', 'order', 'wedding', 'birthday']
-            
-            if any(kw in content for kw in ukrainian_keywords + english_keywords):
-                return True, url
-            # Also check for Next.js indicators
-            if 'next.js' in content or 'react' in content:
-                return True, url
-    except requests.exceptions.RequestException:
-        pass
+    result = default_probe().probe(url)
+    if result.live:
+        print(f"  matched {result.matched!r} after {result.bytes_read} bytes")
+        return True, url
     return False, None
 
 def main():
@@ -47,11 +35,11 @@ def main():
         print()
         return url
     
-    print("Not ready yet. Waiting 30 seconds and checking again...")
-    time.sleep(30)
-    
-    print(f"\nRe-checking: {standard_url}")
-    is_live, url = verify_url(standard_url)
+    print("Not ready yet. Watching the deployment until it is READY or ERROR...")
+    watcher = DeploymentWatcher(candidates=[standard_url], max_wait=120)
+    url = watcher.watch()
+    watcher.print_report()
+    is_live = url is not None
     
     if is_live:
         print("\n" + "=" * 70)